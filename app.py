@@ -4,13 +4,19 @@ Streamlit MVP Prototype
 """
 
 import streamlit as st
+import hashlib
 import json
 import os
 import tempfile
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 
+from backend.app.models.products import ProductCatalog
+from backend.app.services.ranking import top_k
+from backend.app.services.reference_data import get_registry
 from gemx_llm import (
     LLMConfig,
     generate_farm_summary,
@@ -21,6 +27,18 @@ from gemx_llm import (
 
 PURDUE_CENTER = (40.4237, -86.9212)
 
+# Widens maturity index queries so float rounding at the window edge never
+# drops a product; the exact filter still runs in the score functions.
+MATURITY_QUERY_SLACK = 1e-6
+
+# Herbicide program option -> required product trait. Mirrors the trait
+# checks in calculate_corn_score / calculate_soy_score.
+CORN_HERBICIDE_TRAITS = {"Roundup": "RR2", "Liberty": "LL"}
+SOY_HERBICIDE_TRAITS = {"Dicamba": "XtendFlex", "Enlist": "Enlist E3"}
+
+# Recommendations shown per field tab
+TOP_N_DISPLAY = 5
+
 # Page config
 st.set_page_config(
     page_title="GEMx - Seed Placement Tool",
@@ -30,24 +48,33 @@ st.set_page_config(
 )
 
 # Load data
-@st.cache_data
+# Shared, read-only registry: files are parsed once per process and picked
+# up again on the next rerun after they change on disk
+REFERENCE = get_registry(Path(__file__).parent / "data")
+CORN_PRODUCTS_FILE = "products/corn_hybrids.json"
+SOY_PRODUCTS_FILE = "products/soybean_varieties.json"
+SAMPLE_FIELDS_FILE = "reference/sample_fields.json"
+
+
 def load_data():
-    base_path = Path(__file__).parent / "data"
-    
-    with open(base_path / "products" / "corn_hybrids.json") as f:
-        corn_data = json.load(f)
-    
-    with open(base_path / "products" / "soybean_varieties.json") as f:
-        soy_data = json.load(f)
-    
-    with open(base_path / "reference" / "sample_fields.json") as f:
-        fields_data = json.load(f)
-    
-    return corn_data, soy_data, fields_data
+    return (
+        REFERENCE.get(CORN_PRODUCTS_FILE),
+        REFERENCE.get(SOY_PRODUCTS_FILE),
+        REFERENCE.get(SAMPLE_FIELDS_FILE),
+    )
 
 corn_hybrids, soy_varieties, sample_fields = load_data()
 
 
+def load_catalogs() -> tuple[ProductCatalog, ProductCatalog]:
+    return (
+        REFERENCE.catalog(CORN_PRODUCTS_FILE, "corn"),
+        REFERENCE.catalog(SOY_PRODUCTS_FILE, "soybean"),
+    )
+
+corn_catalog, soy_catalog = load_catalogs()
+
+
 def _safe_import_gis_libs() -> tuple[Any, Any, Any, Any]:
     try:
         import geopandas as gpd  # type: ignore
@@ -452,17 +479,60 @@ def _fields_from_gdf_selection(
     return fields
 
 
-def score_products_for_field(crop: str, selected_field: Dict, management: Dict) -> List[Dict[str, Any]]:
+def _maturity_candidates(crop: str, selected_field: Dict) -> np.ndarray:
+    """Catalog indices that can pass the RM/MG hard filter for this field."""
+    gdd = selected_field["environment"]["gdd_normal"]
+
+    if crop == "Corn":
+        # calculate_corn_score drops RM * 25 > GDD
+        return corn_catalog.maturity_index.range(-np.inf, gdd / 25 + MATURITY_QUERY_SLACK)
+
+    # calculate_soy_score drops |MG - ideal_mg| > 0.8
+    ideal_mg = 3.0 + (gdd - 2800) / 333
+    return soy_catalog.maturity_index.range(
+        ideal_mg - 0.8 - MATURITY_QUERY_SLACK,
+        ideal_mg + 0.8 + MATURITY_QUERY_SLACK,
+    )
+
+
+def _herbicide_trait_mask(crop: str, management: Dict) -> np.ndarray:
+    """Products carrying every trait the herbicide program needs."""
+    catalog = corn_catalog if crop == "Corn" else soy_catalog
+    trait_map = CORN_HERBICIDE_TRAITS if crop == "Corn" else SOY_HERBICIDE_TRAITS
+    program = management.get("herbicide_program") or []
+    required = [trait for option, trait in trait_map.items() if option in program]
+    return catalog.has_traits("herbicide_traits", required)
+
+
+def _candidate_indices(crop: str, selected_field: Dict, management: Dict) -> np.ndarray:
+    """Catalog indices passing the maturity and herbicide trait prefilters."""
+    candidates = _maturity_candidates(crop, selected_field)
+    return candidates[_herbicide_trait_mask(crop, management)[candidates]]
+
+
+def score_products_for_field(
+    crop: str,
+    selected_field: Dict,
+    management: Dict,
+    top_n: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Score and rank products for a field, best first.
+
+    With top_n, only the best top_n are kept, selected with ranking.top_k
+    instead of sorting every result (same order as the full stable sort).
+    """
     results: List[Dict[str, Any]] = []
 
     if crop == "Corn":
-        products = corn_hybrids["hybrids"]
+        catalog = corn_catalog
         score_func = calculate_corn_score
     else:
-        products = soy_varieties["varieties"]
+        catalog = soy_catalog
         score_func = calculate_soy_score
 
-    for product in products:
+    for i in _candidate_indices(crop, selected_field, management):
+        product = catalog[i]
         result = score_func(product, selected_field, management)
         if not result.get("filtered"):
             results.append({
@@ -470,10 +540,69 @@ def score_products_for_field(crop: str, selected_field: Dict, management: Dict)
                 "result": result
             })
 
+    if top_n is not None:
+        best = top_k(np.array([r["result"]["score"] for r in results], dtype=float), top_n)
+        return [results[i] for i in best]
+
     results.sort(key=lambda x: x["result"]["score"], reverse=True)
     return results
 
 
+class RecommendationCache:
+    """LRU cache of ranked results, kept in session state across reruns."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def summary(self) -> str:
+        return f"Recommendation cache: {self.hits} hits / {self.misses} misses"
+
+
+def _get_recommendation_cache() -> RecommendationCache:
+    if "recommendation_cache" not in st.session_state:
+        st.session_state["recommendation_cache"] = RecommendationCache()
+    return st.session_state["recommendation_cache"]
+
+
+def _recommendation_cache_key(crop: str, field: Dict, management: Dict) -> tuple:
+    inputs = json.dumps(
+        {"environment": field.get("environment"), "disease_risk": field.get("disease_risk")},
+        sort_keys=True,
+    )
+    catalog = corn_catalog if crop == "Corn" else soy_catalog
+    return (
+        _get_field_key(field),
+        hashlib.sha1(inputs.encode("utf-8")).hexdigest(),
+        json.dumps(management, sort_keys=True),
+        crop,
+        catalog.version,
+    )
+
+
+def cached_recommendations(crop: str, selected_field: Dict, management: Dict) -> List[Dict[str, Any]]:
+    """Top TOP_N_DISPLAY results for a field, re-scored only when its inputs change."""
+    return _get_recommendation_cache().get_or_compute(
+        _recommendation_cache_key(crop, selected_field, management),
+        lambda: score_products_for_field(crop, selected_field, management, top_n=TOP_N_DISPLAY),
+    )
+
+
 def calculate_corn_score(hybrid: Dict, field: Dict, management: Dict) -> Dict:
     """Calculate fit score for a corn hybrid on a given field."""
     env = field["environment"]
@@ -962,15 +1091,20 @@ def main():
     else:
         st.sidebar.success(f"LLM active: {llm_cfg.provider} / {llm_cfg.model}")
 
+    rec_cache = _get_recommendation_cache()
+    # Filled in once scoring is done, so the counts include this run
+    cache_caption = st.sidebar.empty()
+
     if not selected_fields:
         st.warning("Select at least one field to view recommendations.")
+        cache_caption.caption(rec_cache.summary())
         return
 
     if len(selected_fields) > 1:
         field_summaries_for_llm: List[Dict[str, Any]] = []
         for f in selected_fields:
             mgmt_for_f = _get_management_for_field(f, management)
-            results_for_field = score_products_for_field(crop, f, mgmt_for_f)
+            results_for_field = cached_recommendations(crop, f, mgmt_for_f)
             top = results_for_field[0]["product"] if results_for_field else None
             field_summaries_for_llm.append({
                 "field_name": f.get("name"),
@@ -1141,12 +1275,12 @@ def main():
                 st.subheader(f"🏆 Top {crop} Recommendations")
 
                 management_for_field = _get_management_for_field(selected_field, management)
-                results = score_products_for_field(crop, selected_field, management_for_field)
+                results = cached_recommendations(crop, selected_field, management_for_field)
                 llm_reasons = generate_field_reasons(
                     field=selected_field,
                     crop=crop,
                     management=management_for_field,
-                    ranked_results=results[:5],
+                    ranked_results=results,
                     provider=provider,
                 )
 
@@ -1154,7 +1288,7 @@ def main():
                     st.warning("No products match your criteria. Try adjusting herbicide program.")
                     continue
 
-                for i, item in enumerate(results[:5]):
+                for i, item in enumerate(results):
                     product = item["product"]
                     result = item["result"]
                     rec_id = f"{product.get('brand', '')} {product.get('name', '')}".strip()
@@ -1203,11 +1337,13 @@ def main():
 
                 filtered_count = (
                     (len(corn_hybrids["hybrids"]) if crop == "Corn" else len(soy_varieties["varieties"]))
-                    - len(results)
+                    - len(_candidate_indices(crop, selected_field, management_for_field))
                 )
                 if filtered_count > 0:
                     st.caption(f"ℹ️ {filtered_count} products filtered out due to maturity or trait requirements")
 
+    cache_caption.caption(rec_cache.summary())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,241 @@
+"""
+GEMx headless batch scoring.
+
+Usage:
+    python -m backend.app.cli fields.jsonl --crop corn --output results.csv
+"""
+from pathlib import Path
+from typing import Iterator, Optional
+import argparse
+import csv
+import json
+import sys
+from .models.products import ProductCatalog
+from .models.management import ManagementInputs
+from .services.streaming import read_jsonl, stream_recommendations, iter_rows, write_jsonl
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+DEFAULT_CATALOGS = {
+    "corn": DATA_DIR / "products" / "corn_hybrids_sample.json",
+    "soybean": DATA_DIR / "products" / "soybean_varieties_sample.json",
+}
+MM_PER_INCH = 25.4
+CSV_COLUMNS = ["field", "crop", "rank", "brand", "product", "maturity",
+               "score", "placement", "population"]
+# Arrow types for Parquet output; every column is nullable
+PARQUET_TYPES = {"field": "string", "crop": "string", "rank": "int64", "brand": "string",
+                 "product": "string", "maturity": "double", "score": "double",
+                 "placement": "string", "population": "int64"}
+ACRES_PER_M2 = 1 / 4046.8564224
+
+
+def load_management_profiles(path: Optional[Path]) -> dict[str, ManagementInputs]:
+    """
+    Load management profiles keyed by name.
+    
+    The file may hold a single ManagementInputs object (used as "default")
+    or an object mapping profile names to ManagementInputs.
+    """
+    if path is None:
+        return {"default": ManagementInputs(previous_crop="soybean")}
+    
+    with open(path) as f:
+        data = json.load(f)
+    if "previous_crop" in data:
+        return {"default": ManagementInputs.model_validate(data)}
+    return {name: ManagementInputs.model_validate(p) for name, p in data.items()}
+
+
+def read_geopackage(path: Path, layer: Optional[str] = None) -> Iterator[dict]:
+    """Yield Field records from a GeoPackage layer (requires geopandas)."""
+    try:
+        import geopandas as gpd  # type: ignore
+    except ImportError as e:
+        raise SystemExit("GeoPackage input requires geopandas + fiona installed.") from e
+    
+    gdf = gpd.read_file(path, layer=layer)
+    if gdf.crs is None:
+        gdf = gdf.set_crs("EPSG:4326")
+    gdf = gdf.to_crs("EPSG:4326")
+    # Area calc in a projected CRS (CONUS Albers)
+    areas = gdf.to_crs("EPSG:5070").geometry.area
+    
+    for idx, row in gdf.iterrows():
+        if row.geometry is None or row.geometry.is_empty:
+            continue
+        props = {k: v for k, v in row.items() if k != "geometry"}
+        record = {
+            "id": str(props.get("id") or f"{path.stem}_{idx}"),
+            "name": str(props.get("name") or f"{path.stem} {idx}"),
+            "acres": float(props.get("acres") or round(areas[idx] * ACRES_PER_M2, 1)),
+            "state": str(props.get("state") or ""),
+            "county": props.get("county"),
+            "boundary": row.geometry.__geo_interface__,
+        }
+        if props.get("management_profile"):
+            record["management_profile"] = props["management_profile"]
+        yield record
+
+
+def features_from_environment(env: dict, state: str) -> dict:
+    """Map an app-style "environment" block onto the FieldFeatures schema."""
+    drainage = env.get("drainage_class")
+    return {
+        "soil": {
+            "texture_class": env.get("soil_texture"),
+            "om_pct": env.get("organic_matter"),
+            "ph": env.get("ph"),
+            "cec": env.get("cec"),
+            # SSURGO casing, e.g. "Poorly drained"
+            "drainage_class": drainage.capitalize() if drainage else None,
+            # in/in over a 100 cm profile -> cm of water
+            "aws_0_100": env["awc"] * 100 if env.get("awc") is not None else None,
+            "slope_pct": env.get("slope"),
+        },
+        "weather": {
+            "gdd_mean": env.get("gdd_normal"),
+            "growing_season_precip_mm": (env["precip_normal"] * MM_PER_INCH
+                                         if env.get("precip_normal") is not None else None),
+            "heat_stress_days": env.get("heat_stress_days"),
+        },
+        "state": state,
+    }
+
+
+def read_fields(path: Path, layer: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yield field records from JSON, JSONL/NDJSON or GeoPackage input.
+    
+    App-style records (with "environment" instead of "features", as in
+    data/reference/sample_fields.json) are translated to the Field schema.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".gpkg":
+        records = read_geopackage(path, layer)
+    elif suffix in (".jsonl", ".ndjson"):
+        records = read_jsonl(path)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+        records = iter(data["fields"] if isinstance(data, dict) else data)
+    
+    for record in records:
+        if "environment" in record and "features" not in record:
+            record = dict(record)
+            record["features"] = features_from_environment(record.pop("environment"),
+                                                           record.get("state", ""))
+            record.pop("geometry", None)
+        yield record
+
+
+def apply_profiles(records: Iterator[dict], profiles: dict[str, ManagementInputs],
+                   default_profile: str) -> Iterator[dict]:
+    """Resolve each record's "management_profile" name into a management object."""
+    for record in records:
+        name = record.pop("management_profile", None)
+        if "management" not in record and name is not None:
+            if name not in profiles:
+                raise SystemExit(f"Unknown management profile '{name}' for field {record.get('id')}")
+            if name != default_profile:
+                record["management"] = profiles[name].model_dump(mode="json")
+        yield record
+
+
+def write_rows(rows: Iterator[dict], output: Optional[Path], batch_size: int = 10000) -> int:
+    """Write rows to CSV, Parquet or JSONL by extension (CSV to stdout if no path)."""
+    suffix = output.suffix.lower() if output else ".csv"
+    
+    if suffix == ".parquet":
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError as e:
+            raise SystemExit("Parquet output requires pyarrow installed.") from e
+        
+        # One explicit schema, so batches with all-None or int-valued
+        # columns still match the open writer
+        schema = pa.schema([(c, pa.type_for_alias(PARQUET_TYPES[c])) for c in CSV_COLUMNS])
+        count = 0
+        writer = pq.ParquetWriter(output, schema)
+        batch: list[dict] = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch or count == 0:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        finally:
+            writer.close()
+        return count
+    
+    if suffix in (".jsonl", ".ndjson"):
+        return write_jsonl(rows, output)
+    
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    finally:
+        if output:
+            f.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gemx-score",
+        description="Score field boundaries against a product catalog without the Streamlit UI.",
+    )
+    parser.add_argument("fields", nargs="+", type=Path,
+                        help="Field files (.json, .jsonl/.ndjson or .gpkg)")
+    parser.add_argument("--crop", choices=["corn", "soybean"], required=True)
+    parser.add_argument("--catalog", type=Path, help="Product JSON (defaults to the sample catalog)")
+    parser.add_argument("--management", type=Path, help="Management profile JSON")
+    parser.add_argument("--profile", default="default",
+                        help="Profile for fields that don't name one (default: %(default)s)")
+    parser.add_argument("--layer", help="GeoPackage layer name")
+    parser.add_argument("--output", "-o", type=Path,
+                        help="Output .csv, .parquet or .jsonl (default: CSV to stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = all cores)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Fields per worker task")
+    parser.add_argument("--top-n", type=int, default=5, help="Recommendations per field")
+    parser.add_argument("--data-dir", type=Path, help="Reference data directory")
+    parser.add_argument("--feature-cache", type=Path,
+                        help="SQLite file caching extracted soil/weather features between runs")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    
+    catalog = ProductCatalog.from_json(args.catalog or DEFAULT_CATALOGS[args.crop], args.crop)
+    profiles = load_management_profiles(args.management)
+    if args.profile not in profiles:
+        raise SystemExit(f"Unknown management profile '{args.profile}'")
+    
+    records = (r for path in args.fields for r in read_fields(path, args.layer))
+    sets = stream_recommendations(
+        apply_profiles(records, profiles, args.profile),
+        catalog,
+        profiles[args.profile],
+        data_dir=args.data_dir,
+        workers=args.workers or None,
+        chunk_size=args.chunk_size,
+        top_n=args.top_n,
+        feature_cache=args.feature_cache,
+    )
+    count = write_rows(iter_rows(sets), args.output)
+    print(f"Wrote {count} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
 # GEMx Data Models
-from .products import CornHybrid, SoybeanVariety
+from .products import CornHybrid, SoybeanVariety, ProductCatalog
 from .fields import Field, FieldFeatures, FieldRequirements
 from .recommendations import Recommendation
@@ -72,6 +72,9 @@ class FieldRequirements(BaseModel):
     lodging_risk: float = Field(0.0, ge=0, le=1)
     late_harvest_risk: float = Field(0.0, ge=0, le=1)
     
+    # Composite weighting (fungicide program)
+    disease_weight: float = Field(1.0, ge=0, description="Relative weight of disease tolerance in the composite")
+    
     # Yield environment
     yield_environment: str = Field("medium", description="high, medium, or low")
     
@@ -87,6 +90,6 @@ class Field(BaseModel):
     acres: float
     state: str
     county: Optional[str] = None
-    # boundary: GeoJSON would go here
+    boundary: Optional[dict] = Field(None, description="GeoJSON geometry (EPSG:4326)")
     features: Optional[FieldFeatures] = None
     requirements: Optional[FieldRequirements] = None
@@ -22,6 +22,20 @@ class HerbicideSystem(str, Enum):
     XTEND_FLEX = "xtend_flex"
 
 
+# Product herbicide trait names that satisfy each herbicide system, across
+# the naming conventions used by different seed guides
+HERBICIDE_SYSTEM_TRAITS: dict[HerbicideSystem, tuple[str, ...]] = {
+    HerbicideSystem.CONVENTIONAL: (),
+    HerbicideSystem.ROUNDUP_READY: ("RR", "RR2", "RR2X", "XtendFlex", "Enlist E3", "E3"),
+    HerbicideSystem.LIBERTY_LINK: ("LL", "XtendFlex", "Enlist E3", "E3"),
+    HerbicideSystem.ENLIST: ("Enlist", "Enlist E3", "E3"),
+    HerbicideSystem.XTEND_FLEX: ("XtendFlex",),
+}
+
+# Product list fields that may carry Bt trait packages
+BT_TRAIT_FIELDS = ("bt_traits", "technology")
+
+
 class FungicideProgram(str, Enum):
     NONE = "none"
     AS_NEEDED = "as_needed"
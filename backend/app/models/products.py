@@ -1,7 +1,11 @@
 """
 Product models for corn hybrids and soybean varieties.
 """
-from typing import Optional
+from typing import Optional, Sequence, Union
+from pathlib import Path
+import hashlib
+import json
+import numpy as np
 from pydantic import BaseModel, Field
 
 
@@ -113,3 +117,247 @@ class SoybeanVariety(BaseModel):
                 "herbicide_traits": ["XtendFlex"],
             }
         }
+
+
+class MaturityIndex:
+    """
+    Sorted index over a maturity column for binary-search range queries.
+    
+    Lets hard maturity filters fetch only the products inside a field's
+    window instead of scoring and discarding the rest. Missing (NaN)
+    maturities sort last and never match a range.
+    """
+    
+    def __init__(self, maturity: np.ndarray):
+        self.order = np.argsort(maturity, kind="stable")
+        self.values = maturity[self.order]
+    
+    def range(self, low: float, high: float) -> np.ndarray:
+        """Catalog indices with low <= maturity <= high, in catalog order."""
+        start = np.searchsorted(self.values, low, side="left")
+        stop = np.searchsorted(self.values, high, side="right")
+        return np.sort(self.order[start:stop])
+    
+    def count(self, low: float, high: float) -> int:
+        """Number of products with low <= maturity <= high (0 if high < low)."""
+        return max(int(np.searchsorted(self.values, high, side="right") -
+                       np.searchsorted(self.values, low, side="left")), 0)
+
+
+class ProductCatalog:
+    """
+    Compiled, column-oriented view of a product catalog.
+    
+    Built once from seed guide records or product models. Numeric ratings
+    become float columns with NaN for missing values, strings are interned
+    into code arrays, and list-valued traits are packed into uint64 bitmasks
+    so scoring and filtering can run over whole columns at once.
+    """
+    
+    NAME_KEYS = ("hybrid_name", "variety_name", "name")
+    LIST_KEYS = {"hybrids": "corn", "varieties": "soybean"}
+    
+    def __init__(self, crop: str, records: list[dict], items: Optional[list] = None):
+        self.crop = crop
+        self.items = items if items is not None else records
+        self.names: list[str] = []
+        self.columns: dict[str, np.ndarray] = {}
+        self.categories: dict[str, tuple[list[Optional[str]], np.ndarray]] = {}
+        self.trait_vocab: dict[str, list[str]] = {}
+        self.trait_masks: dict[str, np.ndarray] = {}
+        self._maturity_index: Optional[MaturityIndex] = None
+        self.version = hashlib.sha1(
+            json.dumps(records, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        self._compile([self._flatten(r) for r in records])
+    
+    @classmethod
+    def from_products(cls, products: Sequence[Union[CornHybrid, SoybeanVariety]],
+                      crop: Optional[str] = None) -> "ProductCatalog":
+        """Compile a list of CornHybrid or SoybeanVariety models."""
+        products = list(products)
+        if crop is None:
+            crop = "soybean" if products and isinstance(products[0], SoybeanVariety) else "corn"
+        records = [p.model_dump(mode="json") for p in products]
+        return cls(crop, records, items=products)
+    
+    @classmethod
+    def from_records(cls, records: Sequence[dict], crop: str) -> "ProductCatalog":
+        """Compile raw product dicts (seed guide or app catalog format)."""
+        return cls(crop, list(records))
+    
+    @classmethod
+    def from_json(cls, path: Union[str, Path], crop: Optional[str] = None) -> "ProductCatalog":
+        """
+        Compile a product JSON file.
+        
+        Accepts a bare list of products or a wrapper object keyed by
+        "hybrids" / "varieties" as in data/products.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        return cls.from_data(data, crop, path)
+    
+    @classmethod
+    def from_data(cls, data: Union[list, dict], crop: Optional[str] = None,
+                  source: Union[str, Path] = "product data") -> "ProductCatalog":
+        """Compile already-parsed product JSON (see from_json)."""
+        if isinstance(data, dict):
+            key = next((k for k in cls.LIST_KEYS if k in data), None)
+            if key is None:
+                raise ValueError(f"No product list found in {source}")
+            crop = crop or cls.LIST_KEYS[key]
+            data = data[key]
+        elif crop is None:
+            crop = "corn" if data and "relative_maturity" in data[0] else "soybean"
+        
+        return cls(crop, list(data))
+    
+    @staticmethod
+    def _flatten(record: dict) -> dict:
+        """Lift nested "traits" ratings to top-level columns."""
+        flat = {k: v for k, v in record.items() if k != "traits"}
+        flat.update(record.get("traits") or {})
+        return flat
+    
+    def _compile(self, rows: list[dict]):
+        """Build columns, interned tables and trait bitmasks from flat rows."""
+        n = len(rows)
+        keys = list(dict.fromkeys(k for row in rows for k in row))
+        
+        for row in rows:
+            name = next((row[k] for k in self.NAME_KEYS if row.get(k)), "")
+            self.names.append(str(name))
+        
+        for key in keys:
+            values = [row.get(key) for row in rows]
+            present = [v for v in values if v is not None]
+            
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+                self.columns[key] = np.array(
+                    [np.nan if v is None else v for v in values], dtype=float
+                )
+            elif all(isinstance(v, str) for v in present):
+                table = list(dict.fromkeys(values))
+                lookup = {v: i for i, v in enumerate(table)}
+                codes = np.array([lookup[v] for v in values], dtype=np.int32)
+                self.categories[key] = (table, codes)
+            elif all(isinstance(v, list) for v in present):
+                items = [v or [] for v in values]
+                if all(isinstance(x, str) for item in items for x in item):
+                    vocab = list(dict.fromkeys(x for item in items for x in item))
+                    if len(vocab) > 64:
+                        raise ValueError(f"Too many distinct values for trait mask '{key}'")
+                    self.trait_vocab[key] = vocab
+                    self.trait_masks[key] = np.array(
+                        [self._encode(vocab, item) for item in items], dtype=np.uint64
+                    ).reshape(n)
+                elif all(isinstance(x, (int, float)) for item in items for x in item):
+                    width = max((len(item) for item in items), default=0)
+                    column = np.full((n, width), np.nan)
+                    for i, item in enumerate(items):
+                        column[i, :len(item)] = item
+                    self.columns[key] = column
+    
+    @staticmethod
+    def _encode(vocab: list[str], traits: Sequence[str]) -> int:
+        """Pack a trait list into a bitmask over vocab; unknown traits are ignored."""
+        mask = 0
+        for trait in traits:
+            if trait in vocab:
+                mask |= 1 << vocab.index(trait)
+        return mask
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, index: int):
+        return self.items[index]
+    
+    @property
+    def maturity(self) -> np.ndarray:
+        """Relative maturity (corn) or maturity group (soybean) column."""
+        return self.column("relative_maturity" if self.crop == "corn" else "maturity_group")
+    
+    @property
+    def maturity_index(self) -> MaturityIndex:
+        """Sorted maturity index, built on first use."""
+        if self._maturity_index is None:
+            self._maturity_index = MaturityIndex(self.maturity)
+        return self._maturity_index
+    
+    @property
+    def brands(self) -> list[Optional[str]]:
+        """Interned brand table."""
+        return self.categories.get("brand", ([], None))[0]
+    
+    @property
+    def brand_codes(self) -> np.ndarray:
+        """Per-product index into brands."""
+        return self.categorical("brand")[1]
+    
+    def column(self, name: str) -> np.ndarray:
+        """Float column for a rating; all-NaN if the catalog doesn't carry it."""
+        if name in self.columns:
+            return self.columns[name]
+        return np.full(len(self), np.nan)
+    
+    def categorical(self, name: str) -> tuple[list[Optional[str]], np.ndarray]:
+        """(table, codes) for a string attribute; all-None if the catalog doesn't carry it."""
+        if name in self.categories:
+            return self.categories[name]
+        return [None], np.zeros(len(self), dtype=np.int32)
+    
+    def trait_mask(self, field: str, traits: Sequence[str]) -> Optional[int]:
+        """
+        Bitmask for a set of traits in a list field.
+        
+        Returns None if any trait is absent from the whole catalog, since
+        no product could carry it.
+        """
+        vocab = self.trait_vocab.get(field, [])
+        if any(t not in vocab for t in traits):
+            return None
+        return self._encode(vocab, traits)
+    
+    def has_traits(self, field: str, traits: Sequence[str]) -> np.ndarray:
+        """Boolean mask of products carrying every trait in traits."""
+        required = self.trait_mask(field, traits)
+        if required is None:
+            return np.zeros(len(self), dtype=bool)
+        masks = self.trait_masks.get(field, np.zeros(len(self), dtype=np.uint64))
+        required = np.uint64(required)
+        return (masks & required) == required
+    
+    def has_any_traits(self, field: str, traits: Sequence[str]) -> np.ndarray:
+        """Boolean mask of products carrying at least one trait in traits."""
+        vocab = self.trait_vocab.get(field, [])
+        allowed = self._encode(vocab, traits)
+        if not allowed:
+            return np.zeros(len(self), dtype=bool)
+        return (self.trait_masks[field] & np.uint64(allowed)) != 0
+    
+    def freeze(self) -> "ProductCatalog":
+        """Make every column and the maturity index read-only, for sharing between callers."""
+        arrays = [*self.columns.values(), *(codes for _, codes in self.categories.values()),
+                  *self.trait_masks.values(), self.maturity_index.order, self.maturity_index.values]
+        for array in arrays:
+            array.setflags(write=False)
+        return self
+    
+    def subset(self, indices: np.ndarray) -> "ProductCatalog":
+        """Catalog restricted to indices, sharing interned tables with this one."""
+        indices = np.asarray(indices, dtype=np.intp)
+        sub = object.__new__(ProductCatalog)
+        sub.crop = self.crop
+        sub.items = [self.items[i] for i in indices]
+        sub.names = [self.names[i] for i in indices]
+        sub.columns = {k: v[indices] for k, v in self.columns.items()}
+        sub.categories = {k: (table, codes[indices]) for k, (table, codes) in self.categories.items()}
+        sub.trait_vocab = self.trait_vocab
+        sub.trait_masks = {k: v[indices] for k, v in self.trait_masks.items()}
+        sub._maturity_index = None
+        sub.version = hashlib.sha1(
+            self.version.encode("utf-8") + indices.tobytes()
+        ).hexdigest()[:16]
+        return sub
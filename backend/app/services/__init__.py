@@ -1,3 +1,14 @@
 # GEMx Services
 from .scoring import ScoringEngine
 from .feature_extraction import FeatureExtractor
+from .feature_cache import FeatureCache, CachedFeatureExtractor
+from .score_cache import ComponentScoreCache
+from .ranking import rank_top_k, top_k
+from .batch import BatchScoringRunner
+from .streaming import stream_recommendations
+from .scenarios import ScenarioCube, sweep_scenarios
+from .planting import PlantingSurface, optimize_planting
+from .weather_risk import WeatherYearRisk, weather_year_risk
+from .drydown import DrydownResult, simulate_drydown
+from .seeding_rate import SeedingRateTable, seeding_rate_table
+from .vrs import Prescription, build_prescription
@@ -0,0 +1,135 @@
+"""
+Batch scoring runner - score a whole grower book across CPU cores.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import multiprocessing
+import os
+from ..models.products import ProductCatalog
+from ..models.fields import Field, FieldFeatures
+from ..models.management import ManagementInputs
+from ..models.recommendations import RecommendationSet
+from .scoring import ScoringEngine
+from .feature_extraction import FeatureExtractor, boundary_centroid
+from .feature_cache import FeatureCache, CachedFeatureExtractor
+from .recommendations import recommend_field
+
+
+class _WorkerState:
+    """Per-process scoring context, built once and reused for every task."""
+    
+    def __init__(self, catalog: ProductCatalog, data_dir: Optional[Path], top_n: int,
+                 feature_cache: Optional[Path] = None):
+        self.catalog = catalog
+        self.engine = ScoringEngine()
+        self.extractor = FeatureExtractor(data_dir)
+        self.top_n = top_n
+        # Each process opens its own connection; SQLite handles the locking
+        self.cached = (CachedFeatureExtractor(self.extractor, FeatureCache(feature_cache))
+                       if feature_cache else None)
+    
+    def score(self, field: Field, management: ManagementInputs) -> RecommendationSet:
+        """Derive requirements for one field and rank the catalog against them."""
+        features = field.features
+        if features is None and self.cached is not None and field.boundary:
+            features = self.cached.extract_features(field.boundary, field.state, field.county)
+        if features is None:
+            boundary = field.boundary or {}
+            centroid = boundary_centroid(boundary) if boundary else (0.0, 0.0)
+            features = FieldFeatures(
+                soil=self.extractor.extract_soil_features(boundary),
+                weather=self.extractor.extract_weather_features(centroid, field.state),
+                state=field.state,
+                county=field.county,
+            )
+        requirements = field.requirements or self.extractor.derive_field_requirements(
+            features, management, self.catalog.crop
+        )
+        return recommend_field(
+            self.engine, self.catalog, requirements, management, self.catalog.crop,
+            field.id, field.name, self.top_n,
+        )
+
+
+_worker: Optional[_WorkerState] = None
+
+
+def _init_worker(catalog: ProductCatalog, data_dir: Optional[Path], top_n: int,
+                 feature_cache: Optional[Path]):
+    global _worker
+    _worker = _WorkerState(catalog, data_dir, top_n, feature_cache)
+
+
+def _score_chunk(jobs: list[tuple[Field, ManagementInputs]]) -> list[RecommendationSet]:
+    return [_worker.score(field, management) for field, management in jobs]
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class BatchScoringRunner:
+    """
+    Score many fields against one catalog with a process pool.
+    
+    The catalog and reference data are handed to each worker once through
+    the pool initializer. With the default "fork" start method they are
+    inherited copy-on-write and never pickled; under "spawn" they are
+    pickled once per worker, not once per task. Only field chunks and
+    RecommendationSets cross process boundaries.
+    
+    Input is pulled lazily: at most max_pending chunks are in flight, so
+    a slow consumer stalls reading instead of growing a queue.
+    
+    With feature_cache set to a SQLite path, fields with a boundary but
+    no precomputed features reuse soil/weather extractions from earlier runs.
+    """
+    
+    def __init__(self, catalog: ProductCatalog, data_dir: Optional[Path] = None,
+                 workers: Optional[int] = None, chunk_size: int = 64, top_n: int = 5,
+                 max_pending: Optional[int] = None, feature_cache: Optional[Path] = None):
+        self.catalog = catalog
+        self.data_dir = data_dir
+        self.feature_cache = feature_cache
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.top_n = top_n
+        self.max_pending = max_pending or 2 * self.workers
+    
+    def _context(self):
+        methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    
+    def run(self, jobs: Iterable[tuple[Field, ManagementInputs]]) -> Iterator[RecommendationSet]:
+        """Yield one RecommendationSet per (field, management) job, in input order."""
+        if self.workers <= 1:
+            state = _WorkerState(self.catalog, self.data_dir, self.top_n, self.feature_cache)
+            for field, management in jobs:
+                yield state.score(field, management)
+            return
+        
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context(),
+            initializer=_init_worker,
+            initargs=(self.catalog, self.data_dir, self.top_n, self.feature_cache),
+        ) as pool:
+            pending = deque()
+            for chunk in chunked(jobs, self.chunk_size):
+                pending.append(pool.submit(_score_chunk, chunk))
+                if len(pending) >= self.max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    
+    def run_farm(self, fields: Iterable[Field], management: ManagementInputs,
+                 overrides: Optional[dict[str, ManagementInputs]] = None) -> list[RecommendationSet]:
+        """Score a grower's fields with shared management and per-field overrides."""
+        overrides = overrides or {}
+        return list(self.run((f, overrides.get(f.id, management)) for f in fields))
@@ -0,0 +1,258 @@
+"""
+Daily climate reductions - GDD, heat stress, frost dates and precipitation.
+
+Daily inputs are (year, day, cell) arrays with day as a 0-based day of a
+365-day year (leap days dropped, as PRISM normals do). Temperatures are in
+°F unless celsius=True. Each function is a NumPy reduction over the day
+axis and works unchanged on np.memmap inputs.
+"""
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from ..models.fields import WeatherFeatures
+
+# 0-based day-of-year in a 365-day year
+APR_1 = 90
+MAY_1 = 120
+JUL_1 = 181
+SEP_1 = 243
+OCT_1 = 273
+
+GDD_BASE_F = 50.0
+GDD_CAP_F = 86.0
+HEAT_STRESS_F = 95.0
+FROST_F = 32.0
+
+# Year used to turn climatological day-of-year back into a date
+REFERENCE_YEAR = 2001
+
+
+def c_to_f(celsius: np.ndarray) -> np.ndarray:
+    return np.asarray(celsius, dtype=np.float32) * 1.8 + 32.0
+
+
+def daily_gdd(tmax: np.ndarray, tmin: np.ndarray) -> np.ndarray:
+    """
+    Corn GDD per day (°F, 50/86 method).
+    
+    Both temperatures are clipped to [50, 86] before averaging, so cold
+    nights and extreme highs don't distort the accumulation.
+    """
+    tmax = np.clip(tmax, GDD_BASE_F, GDD_CAP_F)
+    tmin = np.clip(tmin, GDD_BASE_F, GDD_CAP_F)
+    return (tmax + tmin) / 2.0 - GDD_BASE_F
+
+
+def accumulated_gdd(gdd: np.ndarray, start: Union[int, np.ndarray] = MAY_1,
+                    end: Union[int, np.ndarray] = OCT_1) -> np.ndarray:
+    """
+    GDD summed over [start, end) days, for (year, day, cell) daily GDD.
+    
+    start/end may be scalars or per-cell arrays (planting-date-specific
+    windows). Returns (year, cell).
+    """
+    Y, _, C = gdd.shape
+    cumulative = np.zeros((Y, gdd.shape[1] + 1, C), dtype=np.float64)
+    np.cumsum(gdd, axis=1, out=cumulative[:, 1:])
+    start = np.broadcast_to(np.asarray(start, dtype=np.intp), (C,))
+    end = np.broadcast_to(np.asarray(end, dtype=np.intp), (C,))
+    cells = np.arange(C)
+    return cumulative[:, end, cells] - cumulative[:, start, cells]
+
+
+def gdd_by_planting_date(gdd: np.ndarray, planting_days: np.ndarray,
+                         end: Union[int, np.ndarray] = OCT_1) -> np.ndarray:
+    """
+    GDD from each planting day to end, as a (planting date, year, cell) array.
+    
+    end may be a per-cell array; planting on or after end accumulates 0.
+    """
+    Y, _, C = gdd.shape
+    cumulative = np.concatenate(
+        [np.zeros_like(gdd[:, :1], dtype=np.float64), np.cumsum(gdd, axis=1, dtype=np.float64)], axis=1
+    )
+    planting_days = np.asarray(planting_days, dtype=np.intp)
+    end = np.broadcast_to(np.asarray(end, dtype=np.intp), (C,))
+    season = cumulative[:, end, np.arange(C)]
+    return np.maximum(season[None] - np.moveaxis(cumulative[:, planting_days, :], 1, 0), 0.0)
+
+
+def heat_stress_days(tmax: np.ndarray, threshold: float = HEAT_STRESS_F,
+                     start: int = JUL_1, end: int = SEP_1) -> np.ndarray:
+    """Days above threshold in July-August, per (year, cell)."""
+    return (tmax[:, start:end, :] > threshold).sum(axis=1).astype(np.float64)
+
+
+def frost_days(tmin: np.ndarray, threshold: float = FROST_F,
+               midsummer: int = JUL_1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (last spring frost, first fall frost) day-of-year per (year, cell).
+    
+    Spring frosts are searched before midsummer and fall frosts from it
+    on; NaN where a year has none.
+    """
+    spring = tmin[:, :midsummer, :] <= threshold
+    fall = tmin[:, midsummer:, :] <= threshold
+    
+    last = (midsummer - 1 - np.argmax(spring[:, ::-1, :], axis=1)).astype(np.float64)
+    last[~spring.any(axis=1)] = np.nan
+    first = (midsummer + np.argmax(fall, axis=1)).astype(np.float64)
+    first[~fall.any(axis=1)] = np.nan
+    return last, first
+
+
+def growing_season_precip(ppt: np.ndarray, start: int = APR_1, end: int = OCT_1) -> np.ndarray:
+    """April-September precipitation total per (year, cell)."""
+    return ppt[:, start:end, :].sum(axis=1, dtype=np.float64)
+
+
+def yearly_metrics(tmax: np.ndarray, tmin: np.ndarray, ppt: Optional[np.ndarray] = None,
+                   planting_day: Union[int, np.ndarray] = MAY_1, end: int = OCT_1,
+                   celsius: bool = False) -> dict[str, np.ndarray]:
+    """
+    Per-year metrics for one block of cells, each a (year, cell) array.
+    
+    Keys: gdd, heat_days, last_frost, first_frost and, with ppt, ppt_gs.
+    """
+    if celsius:
+        tmax, tmin = c_to_f(tmax), c_to_f(tmin)
+    else:
+        tmax = np.asarray(tmax, dtype=np.float32)
+        tmin = np.asarray(tmin, dtype=np.float32)
+    
+    last, first = frost_days(tmin)
+    metrics = {
+        "gdd": accumulated_gdd(daily_gdd(tmax, tmin), planting_day, end),
+        "heat_days": heat_stress_days(tmax),
+        "last_frost": last,
+        "first_frost": first,
+    }
+    if ppt is not None:
+        metrics["ppt_gs"] = growing_season_precip(np.asarray(ppt, dtype=np.float32))
+    return metrics
+
+
+def yearly_metrics_chunked(tmax: np.ndarray, tmin: np.ndarray, ppt: Optional[np.ndarray] = None,
+                           planting_day: Union[int, np.ndarray] = MAY_1, end: int = OCT_1,
+                           celsius: bool = False, chunk_cells: int = 256) -> dict[str, np.ndarray]:
+    """
+    yearly_metrics over any number of cells, chunk_cells at a time.
+    
+    With memory-mapped daily stacks only one chunk of daily values is
+    resident at once; the (year, cell) outputs are all that grows.
+    """
+    Y, _, C = tmax.shape
+    planting = np.broadcast_to(np.asarray(planting_day), (C,))
+    out: dict[str, np.ndarray] = {}
+    for start in range(0, C, chunk_cells):
+        cells = slice(start, min(start + chunk_cells, C))
+        metrics = yearly_metrics(
+            tmax[:, :, cells], tmin[:, :, cells],
+            None if ppt is None else ppt[:, :, cells],
+            planting[cells], end, celsius,
+        )
+        for name, values in metrics.items():
+            if name not in out:
+                out[name] = np.empty((Y, C), dtype=np.float64)
+            out[name][:, cells] = values
+    return out
+
+
+def summarize_years(yearly: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Collapse per-year metrics into climatology, one value per point.
+    
+    Inputs are (point, year) arrays keyed as yearly_metrics names them
+    (transpose (year, cell) output first); NaN years are skipped, and
+    spread statistics need at least two years.
+    """
+    def stat(values: np.ndarray, fn, min_years: int = 1) -> np.ndarray:
+        result = np.full(values.shape[0], np.nan)
+        ok = (~np.isnan(values)).sum(axis=1) >= min_years
+        if ok.any():
+            result[ok] = fn(values[ok])
+        return result
+    
+    mean = lambda v: np.nanmean(v, axis=1)
+    median = lambda v: np.nanmedian(v, axis=1)
+    std = lambda v: np.nanstd(v, axis=1, ddof=1)
+    
+    summary = {}
+    if "gdd" in yearly:
+        summary["gdd_mean"] = stat(yearly["gdd"], mean)
+        summary["gdd_std"] = stat(yearly["gdd"], std, 2)
+    if "ppt_gs" in yearly:
+        summary["growing_season_precip_mm"] = stat(yearly["ppt_gs"], mean)
+        summary["precip_cv"] = stat(yearly["ppt_gs"], lambda v: std(v) / mean(v), 2)
+    if "heat_days" in yearly:
+        summary["heat_stress_days"] = stat(yearly["heat_days"], mean)
+    if "last_frost" in yearly:
+        summary["last_spring_frost"] = stat(yearly["last_frost"], median)
+    if "first_frost" in yearly:
+        summary["first_fall_frost"] = stat(yearly["first_frost"], median)
+    if "last_frost" in yearly and "first_frost" in yearly:
+        summary["frost_free_days"] = stat(yearly["first_frost"] - yearly["last_frost"], median)
+    return summary
+
+
+def day_to_date(day: float) -> Optional[date]:
+    """Climatological day-of-year as a date in REFERENCE_YEAR."""
+    if day is None or np.isnan(day):
+        return None
+    return date(REFERENCE_YEAR, 1, 1) + timedelta(days=int(round(day)))
+
+
+def date_to_day(value: date) -> int:
+    """Day-of-year of a date's month and day in the 365-day climatological year."""
+    day = 28 if (value.month, value.day) == (2, 29) else value.day
+    return (date(REFERENCE_YEAR, value.month, day) - date(REFERENCE_YEAR, 1, 1)).days
+
+
+def to_weather_features(summary: dict[str, np.ndarray]) -> list[WeatherFeatures]:
+    """One WeatherFeatures per point from summarize_years output."""
+    n = len(next(iter(summary.values()))) if summary else 0
+    
+    def value(name: str, i: int, digits: int) -> Optional[float]:
+        if name not in summary or np.isnan(summary[name][i]):
+            return None
+        return round(float(summary[name][i]), digits)
+    
+    features = []
+    for i in range(n):
+        frost_free = value("frost_free_days", i, 0)
+        features.append(WeatherFeatures(
+            gdd_mean=value("gdd_mean", i, 1),
+            gdd_std=value("gdd_std", i, 1),
+            growing_season_precip_mm=value("growing_season_precip_mm", i, 1),
+            precip_cv=value("precip_cv", i, 4),
+            heat_stress_days=value("heat_stress_days", i, 2),
+            frost_free_days=None if frost_free is None else int(frost_free),
+            last_spring_frost=day_to_date(summary.get("last_spring_frost", [np.nan] * n)[i]),
+            first_fall_frost=day_to_date(summary.get("first_fall_frost", [np.nan] * n)[i]),
+        ))
+    return features
+
+
+def write_year_grids(tmax: np.ndarray, tmin: np.ndarray, ppt: np.ndarray, years: list[int],
+                     shape: tuple[int, int], transform, crs, out_dir: Union[str, Path],
+                     celsius: bool = True, chunk_cells: int = 256):
+    """
+    Reduce daily (year, day, row*col) stacks to the per-year grids PRISMSampler reads.
+    
+    Writes gdd_, ppt_gs_, heat_days_, last_frost_ and first_frost_{year}.tif.
+    """
+    import rasterio
+    
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    metrics = yearly_metrics_chunked(tmax, tmin, ppt, celsius=celsius, chunk_cells=chunk_cells)
+    for name, values in metrics.items():
+        for i, year in enumerate(years):
+            grid = np.where(np.isnan(values[i]), -9999.0, values[i]).reshape(shape).astype(np.float32)
+            with rasterio.open(
+                out_dir / f"{name}_{year}.tif", "w", driver="GTiff", height=shape[0], width=shape[1],
+                count=1, dtype="float32", crs=crs, transform=transform, nodata=-9999.0,
+                tiled=True, compress="deflate",
+            ) as dst:
+                dst.write(grid, 1)
@@ -0,0 +1,132 @@
+"""
+Corn drydown simulation - black-layer date and harvest moisture per hybrid x field.
+
+Each field's daily GDD normals are accumulated once from its planting
+date. A hybrid reaches black layer when the accumulation meets its
+maturity's GDD requirement; after that grain loses one point of moisture
+per drydown_gdd_per_point GDD, faster or slower with the hybrid's drydown
+rating. All hybrid x field lookups are a single searchsorted.
+"""
+from datetime import date
+from typing import NamedTuple, Optional, Sequence, Union
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.management import ManagementInputs
+from .climate import MAY_1, OCT_1, c_to_f, daily_gdd, date_to_day, day_to_date
+from .feature_extraction import FeatureExtractor
+
+# Grain moisture (%) at black layer, the floor drydown approaches in the
+# field, and the moisture elevators pay on
+BLACK_LAYER_MOISTURE = 32.0
+EQUILIBRIUM_MOISTURE = 15.0
+MARKET_MOISTURE = 15.5
+# Used when gdd_rm_conversion.json doesn't set drydown_gdd_per_point
+DEFAULT_GDD_PER_POINT = 30.0
+# Drydown rate change per rating point away from 5 (rating 9 dries 20% faster)
+RATING_EFFECT = 0.05
+# Drying cost, $ per bushel per point removed
+DRYING_COST_PER_POINT = 0.04
+# Points above market moisture at which the drying score reaches 0
+DRYING_SCORE_POINTS = 10.0
+# Target harvest when a field has none: October 15
+DEFAULT_HARVEST_DAY = OCT_1 + 14
+
+
+def planting_days(managements: Sequence[ManagementInputs], default: int = MAY_1) -> np.ndarray:
+    """typical_planting_date as a day-of-year per field, default where unset."""
+    return np.array([
+        default if m.typical_planting_date is None else date_to_day(m.typical_planting_date)
+        for m in managements
+    ], dtype=np.intp)
+
+
+def harvest_days(managements: Sequence[ManagementInputs], default: int = DEFAULT_HARVEST_DAY) -> np.ndarray:
+    """target_harvest_date as a day-of-year per field, default where unset."""
+    return np.array([
+        default if m.target_harvest_date is None else date_to_day(m.target_harvest_date)
+        for m in managements
+    ], dtype=np.intp)
+
+
+class DrydownResult(NamedTuple):
+    """
+    (field, product) drydown outcomes.
+    
+    black_layer_day is NaN where a hybrid never reaches black layer in the
+    season; mature marks black layer by the harvest date. Immature hybrids
+    are reported at black-layer moisture (a lower bound). drying_cost is
+    $/acre; drying_score is the 0-1 term the scorer uses.
+    """
+    products: list[str]
+    black_layer_day: np.ndarray
+    mature: np.ndarray
+    harvest_moisture: np.ndarray
+    drying_cost: np.ndarray
+    drying_score: np.ndarray
+    
+    def black_layer_dates(self, field: int) -> list[Optional[date]]:
+        return [day_to_date(day) for day in self.black_layer_day[field]]
+
+
+def simulate_drydown(extractor: FeatureExtractor, catalog: ProductCatalog,
+                     tmax: np.ndarray, tmin: np.ndarray,
+                     planting_day: Union[int, np.ndarray] = MAY_1,
+                     harvest_day: Union[int, np.ndarray] = DEFAULT_HARVEST_DAY,
+                     celsius: bool = False, yield_bu_ac: Union[float, np.ndarray] = 200.0,
+                     cost_per_point: float = DRYING_COST_PER_POINT) -> DrydownResult:
+    """
+    Simulate every corn hybrid in catalog on every field.
+    
+    tmax/tmin are (day, field) daily normals over a 365-day year;
+    planting_day and harvest_day are scalars or per-field days of year
+    (planting_days / harvest_days). yield_bu_ac scales drying cost to an
+    acre and may be per field.
+    """
+    tmax, tmin = np.asarray(tmax), np.asarray(tmin)
+    if celsius:
+        tmax, tmin = c_to_f(tmax), c_to_f(tmin)
+    gdd = daily_gdd(tmax, tmin)
+    n_days, n_fields = gdd.shape
+    fields = np.arange(n_fields)
+    
+    # cumulative[k] = GDD over days [0, k)
+    cumulative = np.zeros((n_days + 1, n_fields))
+    np.cumsum(gdd, axis=0, out=cumulative[1:])
+    planting = np.broadcast_to(np.asarray(planting_day, dtype=np.intp), (n_fields,))
+    harvest = np.broadcast_to(np.asarray(harvest_day, dtype=np.intp), (n_fields,))
+    start = cumulative[planting, fields]
+    
+    lookup = extractor.maturity_lookups["corn"]
+    required = lookup.required_gdd_array(catalog.maturity)
+    gdd_per_point = float(
+        extractor.gdd_conversion.get("corn", {}).get("drydown_gdd_per_point", DEFAULT_GDD_PER_POINT)
+    )
+    
+    # Offsetting each field's non-decreasing curve past the previous one
+    # makes one sorted array, so a single searchsorted finds the first day
+    # every (field, hybrid) target is met
+    span = cumulative[-1].max() + np.nanmax(required, initial=0.0) + 1.0
+    offsets = fields * span
+    targets = start[:, None] + required[None, :]
+    k = np.searchsorted((cumulative.T + offsets[:, None]).ravel(), (targets + offsets[:, None]).ravel())
+    k = k.reshape(n_fields, len(catalog)) - fields[:, None] * (n_days + 1)
+    black_layer_day = np.where(k <= n_days, k - 1, np.nan).astype(float)
+    
+    after = (cumulative[harvest, fields] - start)[:, None] - required[None, :]
+    mature = after >= 0
+    rating = np.nan_to_num(catalog.column("drydown"), nan=5.0)
+    rate = 1.0 + RATING_EFFECT * (rating - 5.0)
+    points = np.maximum(after, 0.0) / gdd_per_point * rate[None, :]
+    moisture = np.where(mature, np.maximum(EQUILIBRIUM_MOISTURE, BLACK_LAYER_MOISTURE - points),
+                        BLACK_LAYER_MOISTURE)
+    
+    excess = np.maximum(moisture - MARKET_MOISTURE, 0.0)
+    yield_bu_ac = np.broadcast_to(np.asarray(yield_bu_ac, dtype=float), (n_fields,))
+    return DrydownResult(
+        products=list(catalog.names),
+        black_layer_day=black_layer_day,
+        mature=mature,
+        harvest_moisture=moisture,
+        drying_cost=excess * cost_per_point * yield_bu_ac[:, None],
+        drying_score=np.clip(1.0 - excess / DRYING_SCORE_POINTS, 0.0, 1.0),
+    )
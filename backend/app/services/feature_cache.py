@@ -0,0 +1,234 @@
+"""
+Persistent field feature cache - skip re-extraction for unchanged boundaries.
+
+Local SQLite stand-in for the field_*_features tables in DATA_LAYERS.md §4.
+"""
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import hashlib
+import json
+import sqlite3
+import time
+from ..models.fields import SoilFeatures, WeatherFeatures, FieldFeatures
+from .feature_extraction import PLACEHOLDER_VERSION, FeatureExtractor, boundary_centroid
+
+# Coordinate precision used for hashing (~1 cm); keeps the hash stable
+# across GeoJSON round trips that perturb the last float digits
+HASH_PRECISION = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS field_features (
+    boundary_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    source_version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    extracted_at REAL NOT NULL,
+    PRIMARY KEY (boundary_hash, kind)
+)
+"""
+
+
+def boundary_hash(boundary_geojson: dict) -> str:
+    """Canonical hash of a GeoJSON geometry (Feature wrappers and properties ignored)."""
+    geometry = boundary_geojson
+    if geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry") or {}
+    
+    def rounded(coords):
+        if isinstance(coords, (int, float)):
+            return round(float(coords), HASH_PRECISION)
+        return [rounded(c) for c in coords]
+    
+    canonical = json.dumps(
+        {"type": geometry.get("type"), "coordinates": rounded(geometry.get("coordinates") or [])},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def weather_key(boundary_geojson: dict, state: str) -> str:
+    """Cache key for weather features, which also depend on the field's state."""
+    return f"{boundary_hash(boundary_geojson)}:{state}"
+
+
+class FeatureCache:
+    """
+    SQLite store of extracted features keyed by (key, kind), the key being
+    boundary_hash or weather_key.
+    
+    Entries carry the data-source version they were extracted from and a
+    timestamp; reads treat a version mismatch or an entry older than
+    ttl_seconds as a miss.
+    """
+    
+    def __init__(self, path: Union[str, Path] = ":memory:",
+                 ttl_seconds: Optional[float] = None):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        if self.path != ":memory:":
+            # Let several worker processes read while one writes
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+    
+    def _fresh(self, source_version: str, stored_version: str, extracted_at: float) -> bool:
+        if stored_version != source_version:
+            return False
+        return self.ttl_seconds is None or time.time() - extracted_at <= self.ttl_seconds
+    
+    def get(self, key: str, kind: str, source_version: str) -> Optional[dict]:
+        """Cached payload for a key, or None if missing or stale."""
+        row = self.conn.execute(
+            "SELECT source_version, payload, extracted_at FROM field_features "
+            "WHERE boundary_hash = ? AND kind = ?", (key, kind)
+        ).fetchone()
+        if row is None or not self._fresh(source_version, row[0], row[2]):
+            return None
+        return json.loads(row[1])
+    
+    def get_many(self, keys: list[str], kind: str, source_version: str) -> dict[str, dict]:
+        """Fresh payloads for many keys in one query."""
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.conn.execute(
+                "SELECT boundary_hash, source_version, payload, extracted_at FROM field_features "
+                f"WHERE kind = ? AND boundary_hash IN ({','.join('?' * len(batch))})",
+                [kind, *batch],
+            ).fetchall()
+            for key, version, payload, extracted_at in rows:
+                if self._fresh(source_version, version, extracted_at):
+                    found[key] = json.loads(payload)
+        return found
+    
+    def put_many(self, entries: Iterable[tuple[str, dict]], kind: str, source_version: str):
+        """Store (key, payload) pairs in one transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO field_features VALUES (?, ?, ?, ?, ?)",
+                [(key, kind, source_version, json.dumps(payload), now) for key, payload in entries],
+            )
+    
+    def put(self, key: str, kind: str, source_version: str, payload: dict):
+        self.put_many([(key, payload)], kind, source_version)
+    
+    def invalidate(self, kind: Optional[str] = None, keep_version: Optional[str] = None) -> int:
+        """
+        Delete entries, optionally only of one kind and/or only those not
+        extracted from keep_version. Returns the number removed.
+        """
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if keep_version is not None:
+            clauses.append("source_version != ?")
+            params.append(keep_version)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.conn:
+            return self.conn.execute(f"DELETE FROM field_features{where}", params).rowcount
+    
+    def purge_expired(self) -> int:
+        """Delete entries older than the TTL. Returns the number removed."""
+        if self.ttl_seconds is None:
+            return 0
+        with self.conn:
+            return self.conn.execute(
+                "DELETE FROM field_features WHERE extracted_at < ?",
+                (time.time() - self.ttl_seconds,),
+            ).rowcount
+
+
+class CachedFeatureExtractor:
+    """
+    FeatureExtractor front end that consults a FeatureCache first.
+    
+    Soil and weather results are cached separately under the extractor's
+    soil_source_version / weather_source_version, so updating one data
+    source only invalidates its own entries. Soil is keyed on the
+    boundary, weather on the boundary and state. Placeholder features
+    (no data source configured) are never stored.
+    """
+    
+    def __init__(self, extractor: FeatureExtractor, cache: FeatureCache):
+        self.extractor = extractor
+        self.cache = cache
+    
+    def extract_soil_features(self, boundary_geojson: dict) -> SoilFeatures:
+        version = self.extractor.soil_source_version
+        if version == PLACEHOLDER_VERSION:
+            return self.extractor.extract_soil_features(boundary_geojson)
+        key = boundary_hash(boundary_geojson)
+        cached = self.cache.get(key, "soil", version)
+        if cached is not None:
+            return SoilFeatures.model_validate(cached)
+        
+        soil = self.extractor.extract_soil_features(boundary_geojson)
+        self.cache.put(key, "soil", version, soil.model_dump(mode="json"))
+        return soil
+    
+    def extract_weather_features(self, boundary_geojson: dict, state: str) -> WeatherFeatures:
+        version = self.extractor.weather_source_version
+        if version == PLACEHOLDER_VERSION:
+            return self.extractor.extract_weather_features(boundary_centroid(boundary_geojson), state)
+        key = weather_key(boundary_geojson, state)
+        cached = self.cache.get(key, "weather", version)
+        if cached is not None:
+            return WeatherFeatures.model_validate(cached)
+        
+        weather = self.extractor.extract_weather_features(boundary_centroid(boundary_geojson), state)
+        self.cache.put(key, "weather", version, weather.model_dump(mode="json"))
+        return weather
+    
+    def extract_features(self, boundary_geojson: dict, state: str,
+                         county: Optional[str] = None) -> FieldFeatures:
+        """Soil + weather features for a boundary, extracting only what isn't cached."""
+        return FieldFeatures(
+            soil=self.extract_soil_features(boundary_geojson),
+            weather=self.extract_weather_features(boundary_geojson, state),
+            state=state,
+            county=county,
+        )
+    
+    def prefetch(self, boundaries: Iterable[tuple[dict, str]]) -> int:
+        """
+        Warm the cache for many (boundary, state) pairs.
+        
+        Looks up all keys in bulk, extracts only the misses and writes
+        them back in one transaction per kind. Kinds without a data source
+        are skipped. Returns the number extracted.
+        """
+        boundaries = list(boundaries)
+        extracted = 0
+        
+        soil_version = self.extractor.soil_source_version
+        if soil_version != PLACEHOLDER_VERSION:
+            by_key = {boundary_hash(b): b for b, _ in boundaries}
+            have = self.cache.get_many(list(by_key), "soil", soil_version)
+            missing = [k for k in by_key if k not in have]
+            soil = self.extractor.extract_soil_features_many([by_key[k] for k in missing])
+            self.cache.put_many(
+                [(k, s.model_dump(mode="json")) for k, s in zip(missing, soil)], "soil", soil_version
+            )
+            extracted += len(missing)
+        
+        weather_version = self.extractor.weather_source_version
+        if weather_version != PLACEHOLDER_VERSION:
+            by_key = {weather_key(b, state): (b, state) for b, state in boundaries}
+            have = self.cache.get_many(list(by_key), "weather", weather_version)
+            missing = [k for k in by_key if k not in have]
+            weather = self.extractor.extract_weather_features_many(
+                [boundary_centroid(by_key[k][0]) for k in missing], [by_key[k][1] for k in missing]
+            )
+            self.cache.put_many(
+                [(k, w.model_dump(mode="json")) for k, w in zip(missing, weather)], "weather", weather_version
+            )
+            extracted += len(missing)
+        
+        return extracted
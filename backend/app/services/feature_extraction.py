@@ -2,48 +2,116 @@
 Feature extraction from environmental data sources.
 """
 from typing import Optional
-import json
 from pathlib import Path
 from ..models.fields import SoilFeatures, WeatherFeatures, FieldFeatures, FieldRequirements
 from ..models.management import ManagementInputs
+from .maturity import MaturityLookup
+from .modifiers import ManagementModifiers
+from .reference_data import get_registry
+
+DISEASE_BASELINES_FILE = "reference/disease_risk_baselines.json"
+MANAGEMENT_MODIFIERS_FILE = "reference/management_modifiers.json"
+GDD_CONVERSION_FILE = "reference/gdd_rm_conversion.json"
+# Source version of features made up without a soil or weather data source
+PLACEHOLDER_VERSION = "placeholder"
+
+
+def boundary_centroid(geometry: dict) -> tuple[float, float]:
+    """
+    Approximate (lat, lon) centroid of a GeoJSON geometry or Feature.
+    
+    Uses the mean of all vertices, which is close enough for picking
+    weather grid cells at field scale.
+    """
+    if geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry") or {}
+    
+    xs, ys = [], []
+    
+    def walk(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            xs.append(coords[0])
+            ys.append(coords[1])
+        else:
+            for c in coords:
+                walk(c)
+    
+    walk(geometry.get("coordinates") or [])
+    if not xs:
+        raise ValueError("Geometry has no coordinates")
+    return (sum(ys) / len(ys), sum(xs) / len(xs))
 
 
 class FeatureExtractor:
     """Extract and derive field features from data sources."""
     
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, ssurgo_path: Optional[Path] = None,
+                 prism_dir: Optional[Path] = None):
         self.data_dir = data_dir or Path(__file__).parent.parent.parent.parent / "data"
-        self._load_reference_data()
-    
-    def _load_reference_data(self):
-        """Load reference data files."""
-        ref_dir = self.data_dir / "reference"
+        # Identify the data behind extracted features so caches can
+        # invalidate when a source is updated
+        self.soil_source_version = PLACEHOLDER_VERSION
+        self.weather_source_version = PLACEHOLDER_VERSION
+        # Reference tables are parsed once per process and shared
+        self.reference = get_registry(self.data_dir)
         
-        try:
-            with open(ref_dir / "disease_risk_baselines.json") as f:
-                self.disease_baselines = json.load(f)
-        except FileNotFoundError:
-            self.disease_baselines = {}
+        # Real soil extraction when a gSSURGO GeoPackage is available
+        self.ssurgo = None
+        ssurgo_path = ssurgo_path or self.data_dir / "ssurgo" / "gssurgo.gpkg"
+        if Path(ssurgo_path).exists():
+            from .ssurgo import SSURGOExtractor
+            self.ssurgo = SSURGOExtractor(ssurgo_path)
+            self.soil_source_version = self.ssurgo.version
         
-        try:
-            with open(ref_dir / "management_modifiers.json") as f:
-                self.management_modifiers = json.load(f)
-        except FileNotFoundError:
-            self.management_modifiers = {}
-        
-        try:
-            with open(ref_dir / "gdd_rm_conversion.json") as f:
-                self.gdd_conversion = json.load(f)
-        except FileNotFoundError:
-            self.gdd_conversion = {}
+        # Real weather sampling when per-year PRISM grids are available
+        self.prism = None
+        prism_dir = Path(prism_dir or self.data_dir / "prism")
+        if prism_dir.is_dir() and any(prism_dir.iterdir()):
+            from .prism import GRID_PATTERN, PRISMSampler
+            # Other files (readmes, PRISM's .hdr/.prj sidecars alone) leave the placeholders in place
+            if any(GRID_PATTERN.match(path.name) for path in prism_dir.iterdir()):
+                self.prism = PRISMSampler(prism_dir)
+                self.weather_source_version = self.prism.version
+    
+    @property
+    def disease_baselines(self) -> dict:
+        return self.reference.get(DISEASE_BASELINES_FILE)
+    
+    @property
+    def management_modifiers(self) -> dict:
+        return self.reference.get(MANAGEMENT_MODIFIERS_FILE)
+    
+    @property
+    def gdd_conversion(self) -> dict:
+        return self.reference.get(GDD_CONVERSION_FILE)
+    
+    @property
+    def maturity_lookups(self) -> dict[str, MaturityLookup]:
+        return self.reference.derived(
+            GDD_CONVERSION_FILE, "maturity_lookups",
+            lambda data: {crop: MaturityLookup(data, crop) for crop in ("corn", "soybean")},
+        )
+    
+    @property
+    def modifiers(self) -> ManagementModifiers:
+        return self.reference.derived(MANAGEMENT_MODIFIERS_FILE, "engine", ManagementModifiers)
+    
+    @property
+    def reference_versions(self) -> dict[str, str]:
+        """Content versions of the reference tables behind derived requirements."""
+        return {
+            name: self.reference.version(name)
+            for name in (DISEASE_BASELINES_FILE, MANAGEMENT_MODIFIERS_FILE, GDD_CONVERSION_FILE)
+        }
     
     def extract_soil_features(self, boundary_geojson: dict) -> SoilFeatures:
         """
         Extract soil features from SSURGO for a field boundary.
         
-        TODO: Implement actual SSURGO extraction using geopandas/postgis
+        Falls back to typical Corn Belt values when no gSSURGO data is configured.
         """
-        # Placeholder - would query SSURGO data
+        if self.ssurgo is not None:
+            return self.ssurgo.extract(boundary_geojson)
         return SoilFeatures(
             texture_class="Silt loam",
             sand_pct=20.0,
@@ -58,14 +126,21 @@ class FeatureExtractor:
             slope_pct=2.0,
         )
     
+    def extract_soil_features_many(self, boundaries: list[dict]) -> list[SoilFeatures]:
+        """Soil features for many boundaries, sharing spatial queries across the batch."""
+        if self.ssurgo is not None:
+            return self.ssurgo.extract_many(boundaries)
+        return [self.extract_soil_features(b) for b in boundaries]
+    
     def extract_weather_features(self, centroid: tuple[float, float], 
                                   state: str) -> WeatherFeatures:
         """
         Extract weather features from PRISM for a field centroid.
         
-        TODO: Implement actual PRISM extraction using rasterio
+        Falls back to typical Corn Belt values when no PRISM grids are configured.
         """
-        # Placeholder - would query PRISM data
+        if self.prism is not None:
+            return self.prism.extract(centroid)
         return WeatherFeatures(
             gdd_mean=2800.0,
             gdd_std=150.0,
@@ -75,9 +150,22 @@ class FeatureExtractor:
             frost_free_days=165,
         )
     
+    def extract_weather_features_many(self, centroids: list[tuple[float, float]],
+                                      states: list[str]) -> list[WeatherFeatures]:
+        """Weather features for many centroids, reading each raster block once."""
+        if self.prism is not None:
+            return self.prism.extract_many(centroids)
+        return [self.extract_weather_features(c, s) for c, s in zip(centroids, states)]
+    
     def derive_drought_risk(self, soil: SoilFeatures, weather: WeatherFeatures,
-                            irrigation: str) -> float:
-        """Derive drought risk from soil and weather."""
+                            irrigation: Optional[str] = None) -> float:
+        """
+        Derive drought risk from soil and weather.
+        
+        irrigation, if given, applies that practice's drought offset from
+        the modifier table. derive_field_requirements leaves it out and
+        applies every management offset at once.
+        """
         base_risk = 0.3
         
         # Soil factors
@@ -97,10 +185,8 @@ class FeatureExtractor:
             base_risk += 0.1
         
         # Irrigation modifier
-        if irrigation == "pivot":
-            base_risk *= 0.3
-        elif irrigation == "drip":
-            base_risk *= 0.4
+        if irrigation is not None:
+            base_risk += self.modifiers.practice_offset("irrigation", irrigation, "drought_risk")
         
         return min(1.0, max(0.0, base_risk))
     
@@ -114,30 +200,22 @@ class FeatureExtractor:
             # Gray Leaf Spot
             base_gls = self.disease_baselines.get("corn", {}).get(
                 "gray_leaf_spot", {}).get("by_state", {}).get(state, 0.3)
-            
-            if management.previous_crop == "corn":
-                base_gls *= 1.5
-            if management.tillage.value == "no-till":
-                base_gls *= 1.3
-            elif management.tillage.value == "conventional":
-                base_gls *= 0.7
-            
-            risks["gls"] = min(1.0, base_gls)
+            risks["gls"] = base_gls
             
             # Northern Leaf Blight
             base_nclb = self.disease_baselines.get("corn", {}).get(
                 "northern_leaf_blight", {}).get("by_state", {}).get(state, 0.3)
-            risks["nclb"] = min(1.0, base_nclb)
+            risks["nclb"] = base_nclb
             
             # Tar Spot
             base_tar = self.disease_baselines.get("corn", {}).get(
                 "tar_spot", {}).get("by_state", {}).get(state, 0.2)
-            risks["tar_spot"] = min(1.0, base_tar)
+            risks["tar_spot"] = base_tar
             
             # Goss's Wilt
             base_goss = self.disease_baselines.get("corn", {}).get(
                 "gosss_wilt", {}).get("by_state", {}).get(state, 0.2)
-            risks["gosss_wilt"] = min(1.0, base_goss)
+            risks["gosss_wilt"] = base_goss
         
         else:  # soybean
             # SDS
@@ -147,16 +225,12 @@ class FeatureExtractor:
             if soil.drainage_class in ["Poorly drained", "Very poorly drained"]:
                 base_sds *= 1.4
             
-            risks["sds"] = min(1.0, base_sds)
+            risks["sds"] = base_sds
             
             # SCN
             base_scn = self.disease_baselines.get("soybean", {}).get(
                 "soybean_cyst_nematode", {}).get("by_state", {}).get(state, 0.5)
-            
-            if management.soy_frequency_5yr and management.soy_frequency_5yr >= 3:
-                base_scn *= 1.3
-            
-            risks["scn"] = min(1.0, base_scn)
+            risks["scn"] = base_scn
             
             # Phytophthora
             base_phyto = self.disease_baselines.get("soybean", {}).get(
@@ -165,16 +239,12 @@ class FeatureExtractor:
             if soil.drainage_class in ["Poorly drained", "Very poorly drained"]:
                 base_phyto *= 1.5
             
-            risks["phytophthora"] = min(1.0, base_phyto)
+            risks["phytophthora"] = base_phyto
             
             # White Mold
             base_wm = self.disease_baselines.get("soybean", {}).get(
                 "white_mold", {}).get("by_state", {}).get(state, 0.3)
-            
-            if management.row_spacing <= 15:
-                base_wm *= 1.2
-            
-            risks["white_mold"] = min(1.0, base_wm)
+            risks["white_mold"] = base_wm
             
             # IDC
             base_idc = self.disease_baselines.get("soybean", {}).get(
@@ -183,64 +253,29 @@ class FeatureExtractor:
             if soil.ph and soil.ph > 7.5:
                 base_idc *= 1.5
             
-            risks["idc"] = min(1.0, base_idc)
+            risks["idc"] = base_idc
         
-        return risks
+        # Management offsets from management_modifiers.json
+        adjusted = self.modifiers.adjust_for(management, crop, {f"{r}_risk": v for r, v in risks.items()})
+        return {r: adjusted[f"{r}_risk"] for r in risks}
     
     def derive_target_maturity(self, weather: WeatherFeatures, 
                                management: ManagementInputs,
-                               crop: str) -> tuple[float, float, float]:
-        """Derive target maturity range from GDD and management."""
-        
-        if not weather.gdd_mean:
-            # Default ranges if no weather data
-            if crop == "corn":
-                return (105, 110, 115)
-            else:
-                return (2.5, 3.0, 3.5)
-        
-        available_gdd = weather.gdd_mean
-        
-        # Safety margin
-        if crop == "corn":
-            safety = self.gdd_conversion.get("corn", {}).get("safety_margin_gdd", 100)
-            available_gdd -= safety
-            
-            # Find optimal RM
-            gdd_by_rm = self.gdd_conversion.get("corn", {}).get("gdd_by_rm", {})
-            optimal_rm = 100  # default
-            
-            for rm_str, required_gdd in sorted(gdd_by_rm.items(), 
-                                                key=lambda x: int(x[0]), reverse=True):
-                if available_gdd >= required_gdd:
-                    optimal_rm = int(rm_str)
-                    break
-            
-            return (optimal_rm - 3, optimal_rm, optimal_rm + 2)
+                               crop: str, interpolate: bool = False) -> tuple[float, float, float]:
+        """
+        Derive target maturity range from GDD and management.
         
-        else:  # soybean
-            safety = self.gdd_conversion.get("soybean", {}).get("safety_margin_gdd", 150)
-            available_gdd -= safety
-            
-            gdd_by_mg = self.gdd_conversion.get("soybean", {}).get("gdd_by_mg", {})
-            optimal_mg = 3.0  # default
-            
-            for mg_str, required_gdd in sorted(gdd_by_mg.items(),
-                                                key=lambda x: float(x[0]), reverse=True):
-                if available_gdd >= required_gdd:
-                    optimal_mg = float(mg_str)
-                    break
-            
-            return (optimal_mg - 0.5, optimal_mg, optimal_mg + 0.3)
+        With interpolate=True the optimum is continuous between table rows
+        rather than snapped to the latest qualifying RM/MG.
+        """
+        return self.maturity_lookups[crop].target_range(weather.gdd_mean, interpolate)
     
     def derive_field_requirements(self, features: FieldFeatures,
                                    management: ManagementInputs,
                                    crop: str) -> FieldRequirements:
         """Derive complete field requirements from features and management."""
         
-        drought_risk = self.derive_drought_risk(
-            features.soil, features.weather, management.irrigation
-        )
+        drought_risk = self.derive_drought_risk(features.soil, features.weather)
         
         disease_risks = self.derive_disease_risks(
             features.soil, features.weather, management, features.state, crop
@@ -250,10 +285,8 @@ class FeatureExtractor:
             features.weather, management, crop
         )
         
-        # Emergence challenge
+        # Emergence challenge (tillage/seed treatment come from the modifier table)
         emergence = 0.3
-        if management.tillage.value == "no-till":
-            emergence += 0.2
         if features.soil.clay_pct and features.soil.clay_pct > 35:
             emergence += 0.15
         
@@ -270,12 +303,21 @@ class FeatureExtractor:
         else:
             yield_env = "medium"
         
+        # Management offsets for the non-disease requirements; disease
+        # risks already include theirs
+        adjusted = self.modifiers.adjust_for(management, crop, {
+            "drought_risk": drought_risk,
+            "heat_stress_risk": 0.3 if features.weather.heat_stress_days and
+                                features.weather.heat_stress_days > 7 else 0.1,
+            "emergence_challenge": emergence,
+            "frogeye_risk": 0.2,  # Default
+            "standability_need": standability,
+            "lodging_risk": 0.3,  # Default
+            "late_harvest_risk": 0.3,  # Default
+        })
+        
         return FieldRequirements(
             target_maturity_range=target_maturity,
-            drought_risk=drought_risk,
-            heat_stress_risk=0.3 if features.weather.heat_stress_days and 
-                             features.weather.heat_stress_days > 7 else 0.1,
-            emergence_challenge=min(1.0, emergence),
             gls_risk=disease_risks.get("gls", 0.0),
             nclb_risk=disease_risks.get("nclb", 0.0),
             tar_spot_risk=disease_risks.get("tar_spot", 0.0),
@@ -285,10 +327,25 @@ class FeatureExtractor:
             phytophthora_risk=disease_risks.get("phytophthora", 0.0),
             white_mold_risk=disease_risks.get("white_mold", 0.0),
             idc_risk=disease_risks.get("idc", 0.0),
-            frogeye_risk=0.2,  # Default
-            standability_need=min(1.0, standability),
-            lodging_risk=0.3,  # Default
-            late_harvest_risk=0.3,  # Default
+            **adjusted,
+            **self.modifiers.weights_for(management, crop),
             yield_environment=yield_env,
             scn_source_history=management.scn_source_history,
         )
+    
+    def state_baselines(self, crop: str) -> "StateBaselines":
+        """Disease baselines for a crop resolved into per-state arrays (built once)."""
+        from .requirements import StateBaselines
+        return self.reference.derived(
+            DISEASE_BASELINES_FILE, f"state_baselines:{crop}", lambda data: StateBaselines(data, crop)
+        )
+    
+    def derive_field_requirements_many(self, features: list[FieldFeatures],
+                                       managements: list[ManagementInputs],
+                                       crop: str) -> list[FieldRequirements]:
+        """Batch derive_field_requirements, computed column-wise; identical results."""
+        from .requirements import feature_columns, derive_requirement_columns, requirements_from_columns
+        
+        columns = feature_columns(features, managements)
+        derived = derive_requirement_columns(self, columns, crop)
+        return requirements_from_columns(derived, [m.scn_source_history for m in managements])
@@ -0,0 +1,92 @@
+"""
+GDD to maturity lookup - numeric, sorted tables built once per crop.
+"""
+from bisect import bisect_right
+from typing import Optional
+import numpy as np
+
+# Reference-table key, default safety margin (GDD), and the (below, above)
+# offsets that turn an optimal maturity into a (min, optimal, max) window
+CROP_TABLES = {
+    "corn": ("gdd_by_rm", 100, (3, 2)),
+    "soybean": ("gdd_by_mg", 150, (0.5, 0.3)),
+}
+# Optimal maturity when available GDD is below every table row
+FALLBACK_MATURITY = {"corn": 100, "soybean": 3.0}
+# Target range when there is no weather data at all
+NO_WEATHER_RANGE = {"corn": (105, 110, 115), "soybean": (2.5, 3.0, 3.5)}
+
+
+class MaturityLookup:
+    """
+    Available GDD -> optimal maturity for one crop.
+    
+    Snapped mode returns the latest table maturity whose GDD requirement
+    is met, exactly as the original linear scan did, using a binary search
+    over the running minimum of requirements. Interpolated mode returns a
+    continuous maturity between table rows, clamped to the table's range.
+    """
+    
+    def __init__(self, gdd_conversion: dict, crop: str):
+        key, default_safety, (below, above) = CROP_TABLES[crop]
+        crop_table = gdd_conversion.get(crop, {})
+        table = sorted((float(m), float(gdd)) for m, gdd in crop_table.get(key, {}).items())
+        
+        self.crop = crop
+        self.safety_margin = crop_table.get("safety_margin_gdd", default_safety)
+        self.below, self.above = below, above
+        self.fallback = FALLBACK_MATURITY[crop]
+        self.maturity = np.array([m for m, _ in table])
+        self.required_gdd = np.array([g for _, g in table])
+        # Smallest requirement at or beyond each maturity; non-decreasing,
+        # so searchsorted finds the latest maturity whose requirement is met
+        self._reachable = np.minimum.accumulate(self.required_gdd[::-1])[::-1]
+        # Plain lists for the scalar path, where bisect beats NumPy call overhead
+        self._reachable_list = self._reachable.tolist()
+        self._maturity_list = self.maturity.tolist()
+        # Interpolation needs requirements strictly increasing with maturity;
+        # other tables fall back to snapped lookups
+        self._monotone = bool(np.all(np.diff(self.required_gdd) > 0))
+    
+    def optimal(self, available_gdd: float, interpolate: bool = False) -> float:
+        """Optimal maturity for GDD available after the safety margin."""
+        if len(self.maturity) == 0:
+            return self.fallback
+        if interpolate and self._monotone:
+            return float(np.interp(available_gdd, self.required_gdd, self.maturity))
+        idx = bisect_right(self._reachable_list, available_gdd) - 1
+        return self._maturity_list[idx] if idx >= 0 else self.fallback
+    
+    def optimal_array(self, available_gdd: np.ndarray, interpolate: bool = False) -> np.ndarray:
+        available_gdd = np.asarray(available_gdd, dtype=float)
+        if len(self.maturity) == 0:
+            return np.full(available_gdd.shape, float(self.fallback))
+        if interpolate and self._monotone:
+            return np.interp(available_gdd, self.required_gdd, self.maturity)
+        
+        idx = np.searchsorted(self._reachable, available_gdd, side="right") - 1
+        return np.where(idx >= 0, self.maturity[np.maximum(idx, 0)], float(self.fallback))
+    
+    def required_gdd_array(self, maturity: np.ndarray) -> np.ndarray:
+        """GDD a maturity needs, interpolated between table rows (inf with no table)."""
+        maturity = np.asarray(maturity, dtype=float)
+        if len(self.maturity) == 0:
+            return np.full(maturity.shape, np.inf)
+        return np.interp(maturity, self.maturity, self.required_gdd)
+    
+    def target_range(self, gdd_mean: Optional[float],
+                     interpolate: bool = False) -> tuple[float, float, float]:
+        """(min, optimal, max) maturity for a season's mean GDD."""
+        if not gdd_mean:
+            return NO_WEATHER_RANGE[self.crop]
+        optimal = self.optimal(gdd_mean - self.safety_margin, interpolate)
+        return (optimal - self.below, optimal, optimal + self.above)
+    
+    def target_range_array(self, gdd_mean: np.ndarray, interpolate: bool = False) -> np.ndarray:
+        """(N, 3) target ranges; NaN or zero GDD gets the no-weather default."""
+        gdd_mean = np.asarray(gdd_mean, dtype=float)
+        optimal = self.optimal_array(gdd_mean - self.safety_margin, interpolate)
+        ranges = np.stack([optimal - self.below, optimal, optimal + self.above], axis=-1)
+        missing = np.isnan(gdd_mean) | (gdd_mean == 0)
+        ranges[missing] = NO_WEATHER_RANGE[self.crop]
+        return ranges
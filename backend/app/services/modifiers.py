@@ -0,0 +1,206 @@
+"""
+Management modifier engine - data/reference/management_modifiers.json compiled to arrays.
+
+Each top-level category (tillage, rotation, irrigation, ...) maps a
+practice to additive offsets on requirement values (FIELD_TARGETS names
+table targets that offset a differently named field), or for
+WEIGHT_TARGETS to relative changes of a composite component weight.
+Categories are read from the
+ManagementInputs field of the same name; numeric categories with keys
+like "15_inch" are binned (largest listed level not above the field's
+value, or the smallest), and "rotation" is derived from the crop
+history. New practices or categories only need a table edit.
+"""
+from typing import Mapping, Optional, Sequence
+import logging
+import re
+import numpy as np
+from ..models.management import ManagementInputs
+
+logger = logging.getLogger(__name__)
+
+ROTATION = "rotation"
+
+# Non-disease requirement fields the table's offsets apply to (disease
+# risks are adjusted in derive_disease_risks)
+MODIFIED_FIELDS = (
+    "drought_risk", "heat_stress_risk", "emergence_challenge", "frogeye_risk",
+    "standability_need", "lodging_risk", "late_harvest_risk",
+)
+DISEASE_RISK_FIELDS = (
+    "gls_risk", "nclb_risk", "tar_spot_risk", "gosss_wilt_risk", "sds_risk", "scn_risk",
+    "phytophthora_risk", "white_mold_risk", "idc_risk",
+)
+# Table targets that offset a requirement field of another name
+FIELD_TARGETS = {"drought_tolerance_need": "drought_risk"}
+# Table targets that scale a FieldRequirements weight by (1 + summed value)
+WEIGHT_TARGETS = {"disease_tolerance_weight": "disease_weight"}
+CONSUMED_TARGETS = (frozenset(MODIFIED_FIELDS) | frozenset(DISEASE_RISK_FIELDS)
+                    | frozenset(FIELD_TARGETS) | frozenset(WEIGHT_TARGETS))
+# Documented in the table but not modelled by any requirement
+INFORMATIONAL_TARGETS = frozenset({"crw_risk", "erosion_risk", "yield_drag"})
+LEVEL_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)_")
+
+
+def rotation_practice(previous_crop: np.ndarray, crop_2_years_ago: np.ndarray,
+                      soy_frequency_5yr: np.ndarray, crop: str) -> np.ndarray:
+    """Rotation table key per field for the crop being planted."""
+    n = len(previous_crop)
+    practice = np.full(n, "corn_soy_rotation", dtype=object)
+    wheat = (previous_crop == "wheat") | (crop_2_years_ago == "wheat")
+    practice[wheat] = "corn_soy_wheat"
+    if crop == "corn":
+        practice[previous_crop == "corn"] = "corn_on_corn"
+    else:
+        frequent = ~np.isnan(soy_frequency_5yr) & (soy_frequency_5yr >= 3)
+        practice[(previous_crop == "soybean") | frequent] = "soy_on_soy"
+    return practice
+
+
+def _numeric(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype == object:
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    return values.astype(float)
+
+
+def management_columns(managements: Sequence[ManagementInputs]) -> dict[str, np.ndarray]:
+    """One column per ManagementInputs field; enums as their values, None as NaN for numbers."""
+    columns = {}
+    for name in ManagementInputs.model_fields:
+        values = [getattr(m, name) for m in managements]
+        values = [getattr(v, "value", v) for v in values]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        else:
+            columns[name] = np.empty(len(values), dtype=object)
+            for i, v in enumerate(values):
+                columns[name][i] = v
+    return columns
+
+
+class ManagementModifiers:
+    """
+    Additive management offsets as per-category coefficient matrices.
+    
+    offsets() resolves every field's practice in each category to a row
+    index and sums the category rows, giving an (N, targets) matrix in
+    one pass. Unknown practices map to an all-zero row. Targets that no
+    requirement reads (see CONSUMED_TARGETS) and that are not known to be
+    informational are logged at debug level when the table is compiled.
+    """
+    
+    def __init__(self, table: Mapping):
+        self.categories = [c for c, practices in table.items() if isinstance(practices, Mapping)]
+        self.targets = sorted({
+            target
+            for c in self.categories for practice in table[c].values() if isinstance(practice, Mapping)
+            for target, value in practice.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        })
+        self.target_index = {t: i for i, t in enumerate(self.targets)}
+        self.unused_targets = [t for t in self.targets if t not in CONSUMED_TARGETS]
+        unknown = [t for t in self.unused_targets if t not in INFORMATIONAL_TARGETS]
+        if unknown:
+            logger.debug("management_modifiers targets with no effect on requirements: %s", ", ".join(unknown))
+        
+        self.practices: dict[str, list[str]] = {}
+        self.coefficients: dict[str, np.ndarray] = {}
+        self.levels: dict[str, Optional[np.ndarray]] = {}
+        for category in self.categories:
+            practices = [p for p, v in table[category].items() if isinstance(v, Mapping)]
+            coefficients = np.zeros((len(practices) + 1, len(self.targets)))
+            for row, practice in enumerate(practices):
+                for target, value in table[category][practice].items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        coefficients[row, self.target_index[target]] = value
+            matches = [LEVEL_PATTERN.match(p) for p in practices]
+            if practices and all(matches):
+                levels = np.array([float(m.group(1)) for m in matches])
+                order = np.argsort(levels)
+                practices = [practices[i] for i in order]
+                coefficients = np.vstack([coefficients[order], coefficients[-1:]])
+                self.levels[category] = levels[order]
+            else:
+                self.levels[category] = None
+            self.practices[category] = practices
+            self.coefficients[category] = coefficients
+    
+    def practice_codes(self, columns: Mapping[str, np.ndarray], crop: str, n: int) -> dict[str, np.ndarray]:
+        """Row index into each category's coefficient matrix, per field."""
+        def column(name: str, numeric: bool = False) -> np.ndarray:
+            if name in columns:
+                return np.asarray(columns[name])
+            return np.full(n, np.nan) if numeric else np.full(n, None, dtype=object)
+        
+        codes = {}
+        for category in self.categories:
+            unknown = len(self.practices[category])
+            levels = self.levels[category]
+            if levels is not None:
+                values = _numeric(column(category, numeric=True))
+                idx = np.maximum(np.searchsorted(levels, values, side="right") - 1, 0)
+                codes[category] = np.where(np.isnan(values), unknown, idx)
+                continue
+            if category == ROTATION:
+                values = rotation_practice(column("previous_crop"), column("crop_2_years_ago"),
+                                           _numeric(column("soy_frequency_5yr", numeric=True)), crop)
+            else:
+                values = column(category)
+            lookup = {p: i for i, p in enumerate(self.practices[category])}
+            codes[category] = np.array([lookup.get(getattr(v, "value", v), unknown) for v in values],
+                                       dtype=np.intp)
+        return codes
+    
+    def offsets(self, columns: Mapping[str, np.ndarray], crop: str) -> np.ndarray:
+        """(N, targets) summed offsets, accumulated in category order."""
+        n = len(next(iter(columns.values())))
+        codes = self.practice_codes(columns, crop, n)
+        total = np.zeros((n, len(self.targets)))
+        for category in self.categories:
+            total += self.coefficients[category][codes[category]]
+        return total
+    
+    def offsets_for(self, management: ManagementInputs, crop: str) -> dict[str, float]:
+        """Offsets for one field, keyed by target name."""
+        row = self.offsets(management_columns([management]), crop)[0]
+        return dict(zip(self.targets, row.tolist()))
+    
+    def target(self, offsets: np.ndarray, name: str) -> np.ndarray:
+        """Summed offsets on one requirement field, including FIELD_TARGETS aliases (zeros if none)."""
+        total = np.zeros(len(offsets))
+        for target in (name, *(t for t, field in FIELD_TARGETS.items() if field == name)):
+            if target in self.target_index:
+                total = total + offsets[:, self.target_index[target]]
+        return total
+    
+    def weight(self, offsets: np.ndarray, name: str) -> np.ndarray:
+        """Relative weight (1 + summed WEIGHT_TARGETS value, at least 0) for one FieldRequirements weight."""
+        total = np.zeros(len(offsets))
+        for target, field in WEIGHT_TARGETS.items():
+            if field == name and target in self.target_index:
+                total = total + offsets[:, self.target_index[target]]
+        return np.maximum(1.0 + total, 0.0)
+    
+    def adjust(self, values: np.ndarray, offsets: np.ndarray, name: str) -> np.ndarray:
+        """values + offsets, clipped to [0, 1]."""
+        return np.minimum(1.0, np.maximum(0.0, values + self.target(offsets, name)))
+    
+    def practice_offset(self, category: str, practice: Optional[str], name: str) -> float:
+        """One practice's offset on one requirement field (0 for unknown practices)."""
+        if category not in self.practices or practice not in self.practices[category]:
+            return 0.0
+        row = self.coefficients[category][self.practices[category].index(practice)]
+        return float(self.target(row[None, :], name)[0])
+    
+    def adjust_for(self, management: ManagementInputs, crop: str, values: Mapping[str, float]) -> dict[str, float]:
+        """adjust() for one field's requirement values, keyed by field name."""
+        offsets = self.offsets(management_columns([management]), crop)
+        return {name: float(self.adjust(np.array([value], dtype=float), offsets, name)[0])
+                for name, value in values.items()}
+    
+    def weights_for(self, management: ManagementInputs, crop: str) -> dict[str, float]:
+        """weight() of every WEIGHT_TARGETS field for one field."""
+        offsets = self.offsets(management_columns([management]), crop)
+        return {name: float(self.weight(offsets, name)[0]) for name in set(WEIGHT_TARGETS.values())}
@@ -0,0 +1,142 @@
+"""
+Planting date x maturity optimizer - GDD from a grid of planting dates to season end.
+
+Daily temperature normals (or several years of daily data) are reduced
+once to cumulative GDD per field; every candidate planting date then
+reads its available GDD by subtraction, and every catalog maturity is
+checked against every date in one broadcast.
+"""
+from datetime import date
+from typing import NamedTuple, Optional, Sequence
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.fields import FieldRequirements, WeatherFeatures
+from ..models.management import ManagementInputs
+from .climate import APR_1, MAY_1, OCT_1, c_to_f, daily_gdd, gdd_by_planting_date, date_to_day, day_to_date
+from .maturity import MaturityLookup
+from .scoring import ScoringEngine, maturity_fit_array
+
+# Candidate planting dates: every 5 days from April 11 to June 14
+DEFAULT_PLANTING_DAYS = np.arange(APR_1 + 10, MAY_1 + 45, 5)
+
+
+def season_end_days(managements: Sequence[ManagementInputs],
+                    weather: Optional[Sequence[WeatherFeatures]] = None,
+                    default: int = OCT_1) -> np.ndarray:
+    """
+    Last day GDD can accumulate, per field.
+    
+    The field's target_harvest_date if set, else its median first fall
+    frost, else default.
+    """
+    ends = np.full(len(managements), default, dtype=np.intp)
+    for i, management in enumerate(managements):
+        if management.target_harvest_date is not None:
+            ends[i] = date_to_day(management.target_harvest_date)
+        elif weather is not None and weather[i].first_fall_frost is not None:
+            ends[i] = date_to_day(weather[i].first_fall_frost)
+    return ends
+
+
+def typical_planting_days(managements: Sequence[ManagementInputs]) -> np.ndarray:
+    """typical_planting_date as a day-of-year per field (NaN where unset)."""
+    return np.array([
+        np.nan if m.typical_planting_date is None else date_to_day(m.typical_planting_date)
+        for m in managements
+    ], dtype=float)
+
+
+class PlantingSurface(NamedTuple):
+    """
+    Planting date x product surfaces for a batch of fields.
+    
+    Arrays are indexed (field, date) or (field, date, product). windows
+    holds the (min, optimal, max) maturity reachable from each date;
+    feasible marks products whose GDD requirement plus the safety margin
+    fits between planting and season end; scores are 0-100 maturity fit
+    or, when requirements were given, the full composite with that date's
+    maturity fit swapped in.
+    """
+    planting_days: np.ndarray
+    products: list[str]
+    maturity: np.ndarray
+    available_gdd: np.ndarray
+    windows: np.ndarray
+    feasible: np.ndarray
+    scores: np.ndarray
+    current: np.ndarray
+    
+    @property
+    def dates(self) -> list[date]:
+        return [day_to_date(day) for day in self.planting_days]
+    
+    def best_dates(self) -> np.ndarray:
+        """(field, product) index of the best-scoring feasible date; -1 if none is feasible."""
+        scores = np.where(self.feasible, self.scores, -np.inf)
+        best = np.argmax(scores, axis=1)
+        return np.where(self.feasible.any(axis=1), best, -1)
+    
+    def latest_feasible(self) -> np.ndarray:
+        """(field, product) index of the last feasible date; -1 if none is."""
+        D = len(self.planting_days)
+        last = D - 1 - np.argmax(self.feasible[:, ::-1, :], axis=1)
+        return np.where(self.feasible.any(axis=1), last, -1)
+
+
+def optimize_planting(lookup: MaturityLookup, catalog: ProductCatalog,
+                      tmax: np.ndarray, tmin: np.ndarray,
+                      season_end: np.ndarray,
+                      planting_days: Optional[np.ndarray] = None,
+                      celsius: bool = False, interpolate: bool = False,
+                      engine: Optional[ScoringEngine] = None,
+                      requirements: Optional[Sequence[FieldRequirements]] = None,
+                      current_days: Optional[np.ndarray] = None) -> PlantingSurface:
+    """
+    Feasibility and score surface over planting dates for many fields.
+    
+    tmax/tmin are daily (day, field) normals or (year, day, field) daily
+    data; with several years the mean available GDD is used. season_end
+    comes from season_end_days. Pass engine and requirements to score the
+    full composite; current_days (typical_planting_days) marks each
+    field's usual date as its nearest grid index in current.
+    """
+    planting_days = DEFAULT_PLANTING_DAYS if planting_days is None else np.asarray(planting_days, dtype=np.intp)
+    tmax, tmin = np.asarray(tmax), np.asarray(tmin)
+    if tmax.ndim == 2:
+        tmax, tmin = tmax[None], tmin[None]
+    if celsius:
+        tmax, tmin = c_to_f(tmax), c_to_f(tmin)
+    
+    # (date, year, field) -> (field, date)
+    available = gdd_by_planting_date(daily_gdd(tmax, tmin), planting_days, season_end).mean(axis=1).T
+    optimal = lookup.optimal_array(available - lookup.safety_margin, interpolate)
+    windows = np.stack([optimal - lookup.below, optimal, optimal + lookup.above], axis=-1)
+    
+    maturity = catalog.maturity
+    required = lookup.required_gdd_array(maturity)
+    feasible = (required[None, None, :] + lookup.safety_margin) <= available[:, :, None]
+    
+    scores = maturity_fit_array(maturity, windows[:, :, None, :]) * 100
+    if engine is not None and requirements is not None:
+        base = engine.score_matrix(catalog, requirements, lookup.crop)
+        disease_weight = np.array([r.disease_weight for r in requirements])[:, None, None]
+        weight = engine.composite_weights(lookup.crop, disease_weight)["maturity"]
+        scores = base["composite"][:, None, :] + weight * (scores - base["maturity_fit"][:, None, :])
+    
+    current = np.full(available.shape[0], -1, dtype=np.intp)
+    if current_days is not None:
+        current_days = np.asarray(current_days, dtype=float)
+        known = ~np.isnan(current_days)
+        nearest = np.abs(current_days[known, None] - planting_days[None, :]).argmin(axis=1)
+        current[known] = nearest
+    
+    return PlantingSurface(
+        planting_days=planting_days,
+        products=list(catalog.names),
+        maturity=maturity,
+        available_gdd=available,
+        windows=windows,
+        feasible=feasible,
+        scores=scores,
+        current=current,
+    )
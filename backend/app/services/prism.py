@@ -0,0 +1,187 @@
+"""
+PRISM raster sampling - per-year climate grids sampled at field centroids.
+
+Expects one single-band grid per variable per year, named like
+`{variable}_{year}.bil` or `{variable}_{year}.tif`:
+
+    gdd_{year}        Season GDD accumulation (base 50F)
+    ppt_gs_{year}     Growing-season (Apr-Sep) precipitation, mm
+    heat_days_{year}  Days >95F in July-Aug
+    last_frost_{year} / first_frost_{year}  Frost day-of-year (optional)
+
+climate.write_year_grids builds these from daily PRISM stacks.
+
+PRISM's 4 km cells are larger than a field, so each field is sampled at
+the cell containing its centroid.
+"""
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional, Sequence, Union
+import hashlib
+import re
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from ..models.fields import WeatherFeatures
+from .climate import summarize_years, to_weather_features
+
+VARIABLES = ("gdd", "ppt_gs", "heat_days", "last_frost", "first_frost")
+GRID_PATTERN = re.compile(r"^(?P<variable>[a-z_]+)_(?P<year>\d{4})\.(bil|tif|tiff)$", re.IGNORECASE)
+
+
+class _Grid:
+    """One open single-band grid, memory-mapped when stored as raw BIL."""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.dataset = rasterio.open(path)
+        self.nodata = self.dataset.nodata
+        self.block_height, self.block_width = self.dataset.block_shapes[0]
+        self.memmap = self._open_memmap()
+    
+    def _open_memmap(self) -> Optional[np.ndarray]:
+        """Map an uncompressed single-band BIL directly, or None."""
+        header = self.path.with_suffix(".hdr")
+        if self.dataset.driver != "EHdr" or self.dataset.count != 1 or not header.exists():
+            return None
+        fields = {}
+        for line in header.read_text().splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                fields[parts[0].upper()] = parts[1].upper()
+        if fields.get("LAYOUT", "BIL") != "BIL" or int(fields.get("SKIPBYTES", 0)):
+            return None
+        dtype = np.dtype(self.dataset.dtypes[0]).newbyteorder(
+            ">" if fields.get("BYTEORDER", "I") == "M" else "<")
+        return np.memmap(self.path, dtype=dtype, mode="r",
+                         shape=(self.dataset.height, self.dataset.width))
+    
+    def _mask(self, values: np.ndarray) -> np.ndarray:
+        values = values.astype(float)
+        if self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        return values
+    
+    def sample(self, rows: np.ndarray, cols: np.ndarray, blocks: dict) -> np.ndarray:
+        """
+        Values at (row, col) cells; NaN outside the grid or at nodata.
+        
+        blocks maps (block_row, block_col) -> point indices, so each block
+        is read once no matter how many fields fall in it.
+        """
+        out = np.full(len(rows), np.nan)
+        inside = (rows >= 0) & (rows < self.dataset.height) & (cols >= 0) & (cols < self.dataset.width)
+        if self.memmap is not None:
+            out[inside] = self._mask(self.memmap[rows[inside], cols[inside]])
+            return out
+        
+        for (block_row, block_col), idx in blocks.items():
+            idx = idx[inside[idx]]
+            if len(idx) == 0:
+                continue
+            row0, col0 = block_row * self.block_height, block_col * self.block_width
+            window = Window(col0, row0,
+                            min(self.block_width, self.dataset.width - col0),
+                            min(self.block_height, self.dataset.height - row0))
+            block = self.dataset.read(1, window=window)
+            out[idx] = self._mask(block[rows[idx] - row0, cols[idx] - col0])
+        return out
+    
+    def close(self):
+        self.dataset.close()
+
+
+def _block_groups(rows: np.ndarray, cols: np.ndarray, block_shape: tuple[int, int]) -> dict:
+    """(block_row, block_col) -> point indices, in block order so reads walk the file sequentially."""
+    block_h, block_w = block_shape
+    keys = np.stack([rows // block_h, cols // block_w], axis=1)
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    unique, starts = np.unique(keys[order], axis=0, return_index=True)
+    groups = np.split(order, starts[1:])
+    return {tuple(k): g for k, g in zip(unique.tolist(), groups)}
+
+
+class PRISMSampler:
+    """
+    Sample per-year PRISM grids for many field centroids at once.
+    
+    All grids are opened once and kept open. In a batch, points are
+    grouped by the raster block they fall in and each block is read once;
+    raw BIL grids skip block reads entirely and are gathered from a
+    memory map, so only the pages holding requested cells are touched.
+    """
+    
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.grids: dict[str, dict[int, _Grid]] = defaultdict(dict)
+        for path in sorted(self.directory.iterdir()):
+            match = GRID_PATTERN.match(path.name)
+            if match and match["variable"].lower() in VARIABLES:
+                self.grids[match["variable"].lower()][int(match["year"])] = _Grid(path)
+        if not self.grids:
+            raise ValueError(f"No PRISM grids found in {self.directory}")
+        
+        reference = next(iter(next(iter(self.grids.values())).values())).dataset
+        self.transform = reference.transform
+        self._to_grid = None
+        if reference.crs is not None and not reference.crs.is_geographic:
+            from pyproj import Transformer
+            self._to_grid = Transformer.from_crs("EPSG:4326", reference.crs, always_xy=True)
+        
+        for grids in self.grids.values():
+            for grid in grids.values():
+                if grid.dataset.transform != self.transform:
+                    raise ValueError(f"{grid.path.name} is not on the same grid as the other PRISM layers")
+        self.version = self._source_version()
+    
+    def _source_version(self) -> str:
+        stamp = "|".join(
+            f"{g.path.name}:{g.path.stat().st_size}:{g.path.stat().st_mtime_ns}"
+            for grids in self.grids.values() for g in grids.values()
+        )
+        return f"prism:{hashlib.sha1(stamp.encode()).hexdigest()[:16]}"
+    
+    @property
+    def years(self) -> list[int]:
+        return sorted({y for grids in self.grids.values() for y in grids})
+    
+    def _cells(self, centroids: Sequence[tuple[float, float]]) -> tuple[np.ndarray, np.ndarray]:
+        lat, lon = np.asarray(centroids, dtype=float).reshape(-1, 2).T
+        x, y = (lon, lat) if self._to_grid is None else self._to_grid.transform(lon, lat)
+        col, row = ~self.transform @ (np.asarray(x), np.asarray(y))
+        return np.floor(row).astype(np.int64), np.floor(col).astype(np.int64)
+    
+    def sample(self, centroids: Sequence[tuple[float, float]]) -> dict[str, np.ndarray]:
+        """Per-variable (N, years) arrays at each (lat, lon); NaN where missing."""
+        rows, cols = self._cells(centroids)
+        
+        # Grids may differ in block layout (strip BIL next to tiled TIFF), so
+        # points are grouped once per distinct block shape
+        groupings: dict[tuple[int, int], dict] = {}
+        years = self.years
+        out = {}
+        for variable, grids in self.grids.items():
+            values = np.full((len(rows), len(years)), np.nan)
+            for j, year in enumerate(years):
+                if year in grids:
+                    grid = grids[year]
+                    shape = (grid.block_height, grid.block_width)
+                    if shape not in groupings:
+                        groupings[shape] = _block_groups(rows, cols, shape)
+                    values[:, j] = grid.sample(rows, cols, groupings[shape])
+            out[variable] = values
+        return out
+    
+    def extract_many(self, centroids: Sequence[tuple[float, float]]) -> list[WeatherFeatures]:
+        """WeatherFeatures for each (lat, lon) centroid, in order."""
+        if len(centroids) == 0:
+            return []
+        return to_weather_features(summarize_years(self.sample(centroids)))
+    
+    def extract(self, centroid: tuple[float, float]) -> WeatherFeatures:
+        return self.extract_many([centroid])[0]
+    
+    def close(self):
+        for grids in self.grids.values():
+            for grid in grids.values():
+                grid.close()
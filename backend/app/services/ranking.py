@@ -0,0 +1,81 @@
+"""
+Top-N ranking - select the best products without sorting the whole catalog.
+"""
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.fields import FieldRequirements
+from .scoring import ScoringEngine
+
+# Slack added to upper bounds so float rounding never prunes a product
+# whose exact composite ties the cutoff
+BOUND_SLACK = 1e-9
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, via argpartition.
+    
+    Ties are broken by lower index, matching a stable descending sort.
+    """
+    scores = np.asarray(scores, dtype=float)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def composite_upper_bound(engine: ScoringEngine, catalog: ProductCatalog,
+                          requirements: FieldRequirements, crop: str) -> np.ndarray:
+    """
+    Best composite (0-100) each product could reach.
+    
+    Maturity fit and yield potential are exact; stress, disease and
+    agronomic scores are bounded by 1.0, their maximum.
+    """
+    weights = engine.composite_weights(crop, requirements.disease_weight)
+    maturity = engine.maturity_fit_matrix(catalog, [requirements], crop)[0]
+    yield_score = catalog.column("yield_potential") / 9.0
+    rest = weights["stress"] + weights["disease"] + weights["agronomic"]
+    return (weights["maturity"] * maturity + weights["yield"] * yield_score + rest) * 100
+
+
+def rank_top_k(engine: ScoringEngine, catalog: ProductCatalog,
+               requirements: FieldRequirements, crop: str, k: int,
+               prune: bool = True, block_size: int = 256) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k catalog indices and composite scores for a field, best first.
+    
+    With prune=True, products are scored in blocks in descending order of
+    composite_upper_bound, and scoring stops once no remaining product can
+    beat the current k-th score. The result matches a full sort.
+    """
+    if not prune:
+        scores = engine.score_matrix(catalog, [requirements], crop)["composite"][0]
+        best = top_k(scores, k)
+        return best, scores[best]
+    
+    bound = composite_upper_bound(engine, catalog, requirements, crop)
+    order = np.argsort(-bound, kind="stable")
+    best_idx = np.empty(0, dtype=np.intp)
+    best_scores = np.empty(0, dtype=float)
+    
+    for start in range(0, len(order), block_size):
+        block = order[start:start + block_size]
+        if len(best_idx) >= k and bound[block[0]] + BOUND_SLACK < best_scores[-1]:
+            break
+        
+        scores = engine.score_matrix(catalog.subset(block), [requirements], crop)["composite"][0]
+        candidates = np.concatenate([best_idx, block])
+        candidate_scores = np.concatenate([best_scores, scores])
+        # Re-order by catalog index so top_k's tie-break matches a full sort
+        by_index = np.argsort(candidates, kind="stable")
+        candidates, candidate_scores = candidates[by_index], candidate_scores[by_index]
+        keep = top_k(candidate_scores, k)
+        best_idx, best_scores = candidates[keep], candidate_scores[keep]
+    
+    return best_idx, best_scores
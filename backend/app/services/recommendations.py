@@ -0,0 +1,225 @@
+"""
+Recommendation building - turn ranked catalog rows into Recommendation objects.
+"""
+from typing import Optional
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.fields import FieldRequirements
+from ..models.management import ManagementInputs
+from ..models.recommendations import Recommendation, ComponentScores, RecommendationSet
+from .scoring import ScoringEngine
+from .ranking import rank_top_k
+
+COMPONENT_NAMES = ("maturity_fit", "yield_potential", "stress_tolerance",
+                   "disease_tolerance", "agronomics")
+
+SOURCE_QUALITY = {
+    "seed_guide_official": 1.0,
+    "university_trial": 0.9,
+    "aggregated_farmer": 0.8,
+    "estimated": 0.5,
+}
+
+
+def _category(catalog: ProductCatalog, name: str, index: int) -> Optional[str]:
+    """String attribute of one catalog row, or None."""
+    table, codes = catalog.categorical(name)
+    return table[codes[index]]
+
+
+def generate_explanations(catalog: ProductCatalog, index: int,
+                          requirements: FieldRequirements,
+                          crop: str) -> tuple[list[str], list[str]]:
+    """Human-readable strengths and watch-outs for one catalog row."""
+    strengths = []
+    watch_outs = []
+    rating = lambda name: catalog.column(name)[index]
+    
+    # Yield potential
+    if rating("yield_potential") >= 8:
+        strengths.append("Excellent yield potential")
+    elif rating("yield_potential") >= 7:
+        strengths.append("Strong yield potential")
+    
+    # Drought tolerance vs risk
+    if requirements.drought_risk > 0.5:
+        if rating("drought_tolerance") >= 7:
+            strengths.append("Strong drought tolerance for this water-limited environment")
+        elif rating("drought_tolerance") <= 4:
+            watch_outs.append("Below-average drought tolerance in a drought-prone field")
+    
+    # Disease matches
+    if crop == "corn":
+        if requirements.gls_risk > 0.5 and rating("gray_leaf_spot") >= 7:
+            strengths.append("Excellent Gray Leaf Spot tolerance")
+        if requirements.tar_spot_risk > 0.5 and rating("tar_spot") >= 7:
+            strengths.append("Strong Tar Spot tolerance")
+        if requirements.gls_risk > 0.5 and rating("gray_leaf_spot") <= 4:
+            watch_outs.append("Consider fungicide program for Gray Leaf Spot")
+    
+    else:  # soybean
+        if requirements.sds_risk > 0.5 and rating("sds_rating") >= 7:
+            strengths.append("Excellent SDS tolerance")
+        if requirements.scn_risk > 0.5:
+            scn_source = _category(catalog, "scn_source", index)
+            if scn_source == "Peking":
+                strengths.append("Peking SCN resistance (less common, broader spectrum)")
+            elif scn_source == "PI 88788":
+                strengths.append("PI 88788 SCN resistance")
+            elif scn_source == "None":
+                watch_outs.append("No SCN resistance in a field with SCN pressure")
+        
+        if requirements.idc_risk > 0.5:
+            if rating("idc_tolerance") >= 7:
+                strengths.append("Strong IDC tolerance for high-pH soils")
+            elif rating("idc_tolerance") <= 4:
+                watch_outs.append("IDC risk on calcareous soils")
+    
+    # Standability
+    if crop == "corn" and requirements.standability_need > 0.5:
+        avg_stand = (rating("stalk_strength") + rating("root_strength")) / 2
+        if avg_stand >= 7:
+            strengths.append("Excellent standability")
+        elif avg_stand <= 4:
+            watch_outs.append("Monitor for stalk/root issues late season")
+    
+    # Maturity fit
+    _, optimal, _ = requirements.target_maturity_range
+    maturity = float(catalog.maturity[index])
+    
+    if abs(maturity - optimal) <= 1:
+        strengths.append(f"Optimal maturity ({maturity:g}) for this location")
+    elif maturity > optimal:
+        watch_outs.append(f"Slightly full-season ({maturity:g}) - monitor dry-down")
+    
+    return strengths, watch_outs
+
+
+def suggest_placement(score: float) -> str:
+    """Placement label for a composite score."""
+    if score >= 85:
+        return "Best fit - prioritize for this field"
+    elif score >= 75:
+        return "Strong fit - good primary choice"
+    elif score >= 65:
+        return "Moderate fit - consider for average acres"
+    elif score >= 55:
+        return "Marginal fit - use only if preferred traits needed"
+    else:
+        return "Poor fit - consider alternatives"
+
+
+def suggest_population(catalog: ProductCatalog, index: int,
+                       requirements: FieldRequirements,
+                       management: ManagementInputs, crop: str) -> int:
+    """Target population from yield environment, plant type and management."""
+    if crop == "corn":
+        # Base population by yield environment
+        if requirements.yield_environment == "high":
+            base_pop = 34000
+        elif requirements.yield_environment == "medium":
+            base_pop = 32000
+        else:
+            base_pop = 30000
+        
+        # Adjust by ear type
+        ear_type = _category(catalog, "ear_type", index)
+        if ear_type == "Flex":
+            base_pop -= 1000  # Flex ears can compensate
+        elif ear_type == "Fixed":
+            base_pop += 1000  # Fixed ears need more plants
+        
+        # Adjust by drought risk
+        if requirements.drought_risk > 0.6 and management.irrigation == "none":
+            base_pop -= 2000
+        
+        return base_pop
+    
+    else:  # soybean
+        # Base by row spacing
+        if management.row_spacing <= 15:
+            base_pop = 140000
+        elif management.row_spacing <= 20:
+            base_pop = 130000
+        else:
+            base_pop = 120000
+        
+        # Adjust by branching habit
+        branching = _category(catalog, "branching", index)
+        if branching == "Bushy":
+            base_pop -= 10000
+        elif branching == "Erect":
+            base_pop += 10000
+        
+        return base_pop
+
+
+def data_confidence(catalog: ProductCatalog, index: int) -> float:
+    """0-1 confidence from rating completeness and source quality."""
+    if catalog.crop == "corn":
+        critical = ["yield_potential", "drought_tolerance", "stalk_strength"]
+        disease = ["gray_leaf_spot", "northern_leaf_blight"]
+    else:
+        critical = ["yield_potential", "drought_tolerance", "lodging_resistance"]
+        disease = ["sds_rating", "scn_source", "phytophthora_field"]
+    
+    def known(name: str) -> bool:
+        if name in catalog.categories:
+            return _category(catalog, name, index) is not None
+        return not np.isnan(catalog.column(name)[index])
+    
+    critical_score = sum(known(f) for f in critical) / len(critical)
+    disease_score = sum(known(f) for f in disease) / len(disease)
+    source_multiplier = SOURCE_QUALITY.get(_category(catalog, "data_source", index), 0.7)
+    
+    return (0.6 * critical_score + 0.4 * disease_score) * source_multiplier
+
+
+def recommend_field(engine: ScoringEngine, catalog: ProductCatalog,
+                    requirements: FieldRequirements, management: ManagementInputs,
+                    crop: str, field_id: str, field_name: str,
+                    top_n: int = 5) -> RecommendationSet:
+    """
+    Filter, score and rank the catalog for one field.
+    
+    Products outside the maturity window or missing required traits are
+    filtered before scoring; the best top_n survivors, found with
+    rank_top_k, become Recommendations. avg_score is their mean.
+    """
+    indices = engine.candidate_indices(catalog, requirements, management)
+    candidates = catalog.subset(indices)
+    best, _ = rank_top_k(engine, candidates, requirements, crop, top_n)
+    scores = {name: values[0] for name, values in
+              engine.score_matrix(candidates.subset(best), [requirements], crop).items()}
+    
+    recommendations = []
+    for pos, candidate in enumerate(best):
+        index = int(indices[candidate])
+        composite = float(np.clip(scores["composite"][pos], 0, 100))
+        strengths, watch_outs = generate_explanations(catalog, index, requirements, crop)
+        recommendations.append(Recommendation(
+            brand=_category(catalog, "brand", index) or "",
+            product_name=catalog.names[index],
+            maturity=float(catalog.maturity[index]),
+            composite_score=composite,
+            component_scores=ComponentScores(**{
+                name: float(np.clip(scores[name][pos], 0, 100)) for name in COMPONENT_NAMES
+            }),
+            strengths=strengths,
+            watch_outs=watch_outs,
+            placement=suggest_placement(composite),
+            suggested_population=suggest_population(catalog, index, requirements, management, crop),
+            data_confidence=data_confidence(catalog, index),
+        ))
+    
+    evaluated = len(indices)
+    return RecommendationSet(
+        field_id=field_id,
+        field_name=field_name,
+        crop=crop,
+        recommendations=recommendations,
+        top_score=recommendations[0].composite_score if recommendations else 0.0,
+        avg_score=float(np.mean([r.composite_score for r in recommendations])) if recommendations else 0.0,
+        products_evaluated=evaluated,
+        products_filtered=len(catalog) - evaluated,
+    )
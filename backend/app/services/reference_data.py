@@ -0,0 +1,142 @@
+"""
+Reference data registry - parse each data file once per process, reload on change.
+"""
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Union
+import hashlib
+import json
+import threading
+import time
+from ..models.products import ProductCatalog
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} reference data is read-only")
+
+
+class FrozenDict(dict):
+    """dict that refuses mutation; still JSON-serializable and picklable."""
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _read_only
+    
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """list that refuses mutation; still JSON-serializable and picklable."""
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into FrozenDict / FrozenList."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+class ReferenceEntry(NamedTuple):
+    data: Any
+    version: str
+    mtime_ns: int
+    size: int
+    checked_at: float
+
+
+MISSING_VERSION = "missing"
+
+
+class ReferenceRegistry:
+    """
+    Read-only reference files under one data directory.
+    
+    Files are parsed on first use into frozen structures shared by every
+    caller in the process (and inherited by forked workers). At most once
+    per check_interval a file's mtime/size is re-checked; when they change
+    the content hash decides whether to re-parse. New data replaces the
+    old entry in a single assignment, so readers see one version or the
+    other, never a mix.
+    
+    derived() memoizes structures built from a file (catalogs, lookup
+    tables) against the file's version, so they rebuild only on reload.
+    """
+    
+    def __init__(self, data_dir: Union[str, Path], check_interval: float = 1.0):
+        self.data_dir = Path(data_dir)
+        self.check_interval = check_interval
+        self._entries: dict[str, ReferenceEntry] = {}
+        self._derived: dict[tuple[str, str], tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, name: str, previous: Optional[ReferenceEntry]) -> ReferenceEntry:
+        path = self.data_dir / name
+        now = time.monotonic()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return ReferenceEntry(FrozenDict(), MISSING_VERSION, 0, 0, now)
+        
+        if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+            return previous._replace(checked_at=now)
+        
+        raw = path.read_bytes()
+        version = hashlib.sha1(raw).hexdigest()[:16]
+        if previous is not None and previous.version == version:
+            return previous._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size, checked_at=now)
+        return ReferenceEntry(freeze(json.loads(raw)), version, stat.st_mtime_ns, stat.st_size, now)
+    
+    def entry(self, name: str) -> ReferenceEntry:
+        """Current entry for a file path relative to the data directory."""
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            return entry
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or time.monotonic() - entry.checked_at >= self.check_interval:
+                entry = self._load(name, entry)
+                self._entries[name] = entry
+            return entry
+    
+    def get(self, name: str) -> Any:
+        """Frozen parsed contents of a file ({} if it doesn't exist)."""
+        return self.entry(name).data
+    
+    def version(self, name: str) -> str:
+        return self.entry(name).version
+    
+    def versions(self) -> dict[str, str]:
+        """Versions of every file loaded so far."""
+        return {name: self.version(name) for name in list(self._entries)}
+    
+    def derived(self, name: str, key: str, build: Callable[[Any], Any]) -> Any:
+        """build(data) for a file, cached until the file's version changes."""
+        entry = self.entry(name)
+        cached = self._derived.get((name, key))
+        if cached is not None and cached[0] == entry.version:
+            return cached[1]
+        value = build(entry.data)
+        self._derived[(name, key)] = (entry.version, value)
+        return value
+    
+    def catalog(self, name: str, crop: Optional[str] = None) -> ProductCatalog:
+        """Compiled, read-only ProductCatalog for a product file, rebuilt only when it changes."""
+        return self.derived(name, f"catalog:{crop}",
+                            lambda data: ProductCatalog.from_data(data, crop, name).freeze())
+
+
+_registries: dict[Path, ReferenceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(data_dir: Union[str, Path]) -> ReferenceRegistry:
+    """The process-wide registry for a data directory."""
+    key = Path(data_dir).resolve()
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ReferenceRegistry(key)
+        return _registries[key]
@@ -0,0 +1,228 @@
+"""
+Columnar field requirement derivation - many fields per call.
+
+Mirrors FeatureExtractor.derive_field_requirements rule for rule, but
+over arrays of soil, weather and management columns, with the per-state
+disease baselines resolved once into lookup arrays.
+"""
+from typing import Mapping, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from ..models.fields import FieldFeatures, FieldRequirements
+from ..models.management import ManagementInputs
+from .feature_extraction import FeatureExtractor
+from .modifiers import MODIFIED_FIELDS, WEIGHT_TARGETS, management_columns
+
+# (risk key, baseline name, default when a state is missing)
+DISEASE_BASELINES = {
+    "corn": (
+        ("gls", "gray_leaf_spot", 0.3),
+        ("nclb", "northern_leaf_blight", 0.3),
+        ("tar_spot", "tar_spot", 0.2),
+        ("gosss_wilt", "gosss_wilt", 0.2),
+    ),
+    "soybean": (
+        ("sds", "sudden_death_syndrome", 0.3),
+        ("scn", "soybean_cyst_nematode", 0.5),
+        ("phytophthora", "phytophthora", 0.3),
+        ("white_mold", "white_mold", 0.3),
+        ("idc", "iron_deficiency_chlorosis", 0.2),
+    ),
+}
+
+ALL_RISKS = ("gls", "nclb", "tar_spot", "gosss_wilt", "sds", "scn", "phytophthora", "white_mold", "idc")
+
+NUMERIC_COLUMNS = (
+    "sand_pct", "clay_pct", "om_pct", "ph", "aws_0_100", "slope_pct",
+    "gdd_mean", "growing_season_precip_mm", "precip_cv", "heat_stress_days",
+    "row_spacing", "soy_frequency_5yr",
+)
+TEXT_COLUMNS = ("state", "drainage_class", "irrigation", "previous_crop", "tillage")
+
+POORLY_DRAINED = ("Poorly drained", "Very poorly drained")
+
+
+class StateBaselines:
+    """
+    Disease baselines for one crop as per-state arrays.
+    
+    codes() maps state names to row indices once per batch; the last row
+    holds each disease's default for states missing from the table.
+    """
+    
+    def __init__(self, disease_baselines: dict, crop: str):
+        tables = {
+            risk: disease_baselines.get(crop, {}).get(name, {}).get("by_state", {})
+            for risk, name, _ in DISEASE_BASELINES[crop]
+        }
+        self.states = sorted({s for table in tables.values() for s in table})
+        self.index = {s: i for i, s in enumerate(self.states)}
+        self.values = {
+            risk: np.array([tables[risk].get(s, default) for s in self.states] + [default], dtype=float)
+            for risk, _, default in DISEASE_BASELINES[crop]
+        }
+    
+    def codes(self, states: np.ndarray) -> np.ndarray:
+        unknown = len(self.states)
+        return np.array([self.index.get(s, unknown) for s in states], dtype=np.intp)
+    
+    def lookup(self, risk: str, codes: np.ndarray) -> np.ndarray:
+        return self.values[risk][codes]
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else getattr(value, "value", value)
+
+
+def feature_columns(features: Sequence[FieldFeatures],
+                    managements: Sequence[ManagementInputs]) -> dict[str, np.ndarray]:
+    """Flatten features + management into the columns derive_requirement_columns reads."""
+    rows = [{**f.soil.model_dump(), **f.weather.model_dump(), "state": f.state} for f in features]
+    columns = {
+        name: np.array([r[name] for r in rows], dtype=float if name in NUMERIC_COLUMNS else object)
+        for name in NUMERIC_COLUMNS + TEXT_COLUMNS if name in rows[0]
+    } if rows else {}
+    columns.update(management_columns(managements))
+    return columns
+
+
+def _column(columns: Union[pd.DataFrame, Mapping[str, np.ndarray]], name: str, n: int) -> np.ndarray:
+    if name not in columns:
+        return np.full(n, np.nan) if name in NUMERIC_COLUMNS else np.full(n, None, dtype=object)
+    values = columns[name]
+    values = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    if name in NUMERIC_COLUMNS:
+        return np.array([np.nan if v is None else v for v in values], dtype=float) \
+            if values.dtype == object else values.astype(float)
+    return np.array([_text(v) for v in values], dtype=object)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """Python truthiness of optional numbers: None/NaN and 0 are false."""
+    return ~np.isnan(values) & (values != 0)
+
+
+def derive_requirement_columns(extractor: FeatureExtractor, columns: Union[pd.DataFrame, Mapping[str, np.ndarray]],
+                               crop: str) -> dict[str, np.ndarray]:
+    """
+    Requirement columns for a batch of fields.
+    
+    columns holds the soil/weather feature names, state, and
+    ManagementInputs fields by name (missing columns read as None).
+    Management offsets come from the management_modifiers table. Returns
+    one array per FieldRequirements field, plus target_maturity_range as
+    (N, 3).
+    """
+    n = len(columns) if isinstance(columns, pd.DataFrame) else len(next(iter(columns.values())))
+    col = {name: _column(columns, name, n) for name in NUMERIC_COLUMNS + TEXT_COLUMNS}
+    modifiers = extractor.modifiers
+    offsets = modifiers.offsets({
+        name: _column(columns, name, n)
+        for name in set(modifiers.categories) | {"previous_crop", "crop_2_years_ago", "soy_frequency_5yr"}
+    }, crop)
+    out: dict[str, np.ndarray] = {}
+    
+    # Drought (derive_drought_risk)
+    aws, sand = col["aws_0_100"], col["sand_pct"]
+    drought = np.full(n, 0.3)
+    drought += np.where(_truthy(aws) & (aws < 15), 0.2, 0.0)
+    drought -= np.where(_truthy(aws) & ~(aws < 15) & (aws > 25), 0.1, 0.0)
+    drought += np.where(_truthy(sand) & (sand > 50), 0.15, 0.0)
+    precip = col["growing_season_precip_mm"]
+    drought += np.where(_truthy(precip) & (precip < 450), 0.2, 0.0)
+    cv = col["precip_cv"]
+    drought += np.where(_truthy(cv) & (cv > 0.3), 0.1, 0.0)
+    out["drought_risk"] = np.minimum(1.0, np.maximum(0.0, drought))
+    
+    # Disease (derive_disease_risks)
+    baselines = extractor.state_baselines(crop)
+    codes = baselines.codes(col["state"])
+    risks = {risk: np.zeros(n) for risk in ALL_RISKS}
+    poorly_drained = np.isin(col["drainage_class"], POORLY_DRAINED)
+    if crop == "corn":
+        for risk in ("gls", "nclb", "tar_spot", "gosss_wilt"):
+            risks[risk] = baselines.lookup(risk, codes)
+    else:
+        risks["sds"] = baselines.lookup("sds", codes) * np.where(poorly_drained, 1.4, 1.0)
+        risks["scn"] = baselines.lookup("scn", codes)
+        risks["phytophthora"] = baselines.lookup("phytophthora", codes) * np.where(poorly_drained, 1.5, 1.0)
+        risks["white_mold"] = baselines.lookup("white_mold", codes)
+        ph = col["ph"]
+        risks["idc"] = baselines.lookup("idc", codes) * np.where(_truthy(ph) & (ph > 7.5), 1.5, 1.0)
+    for risk, _, _ in DISEASE_BASELINES[crop]:
+        name = f"{risk}_risk"
+        risks[risk] = modifiers.adjust(risks[risk], offsets, name)
+    for risk, values in risks.items():
+        out[f"{risk}_risk"] = values
+    
+    out["target_maturity_range"] = extractor.maturity_lookups[crop].target_range_array(col["gdd_mean"])
+    
+    heat = col["heat_stress_days"]
+    out["heat_stress_risk"] = np.where(_truthy(heat) & (heat > 7), 0.3, 0.1)
+    
+    clay = col["clay_pct"]
+    emergence = np.full(n, 0.3)
+    emergence += np.where(_truthy(clay) & (clay > 35), 0.15, 0.0)
+    out["emergence_challenge"] = emergence
+    
+    slope = col["slope_pct"]
+    standability = np.full(n, 0.3)
+    standability += np.where(_truthy(slope) & (slope > 5), 0.1, 0.0)
+    out["standability_need"] = standability
+    
+    om = col["om_pct"]
+    out["yield_environment"] = np.where(
+        _truthy(om) & (om > 4), "high", np.where(_truthy(om) & (om < 2), "low", "medium")
+    ).astype(object)
+    
+    out["frogeye_risk"] = np.full(n, 0.2)
+    out["lodging_risk"] = np.full(n, 0.3)
+    out["late_harvest_risk"] = np.full(n, 0.3)
+    
+    for name in MODIFIED_FIELDS:
+        out[name] = modifiers.adjust(out[name], offsets, name)
+    for name in set(WEIGHT_TARGETS.values()):
+        out[name] = modifiers.weight(offsets, name)
+    return out
+
+
+def requirements_from_columns(columns: dict[str, np.ndarray],
+                              scn_source_history: Optional[Sequence[list[str]]] = None
+                              ) -> list[FieldRequirements]:
+    """Materialize derive_requirement_columns output as FieldRequirements models."""
+    n = len(columns["drought_risk"])
+    scalar = [name for name in columns if name != "target_maturity_range"]
+    histories = scn_source_history if scn_source_history is not None else [[] for _ in range(n)]
+    return [
+        FieldRequirements(
+            target_maturity_range=tuple(float(v) for v in columns["target_maturity_range"][i]),
+            scn_source_history=list(histories[i] or []),
+            **{name: columns[name][i].item() if hasattr(columns[name][i], "item") else columns[name][i]
+               for name in scalar},
+        )
+        for i in range(n)
+    ]
+
+
+def distinct_requirement_rows(derived: dict[str, np.ndarray],
+                              histories: Sequence[list[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (first row of each distinct requirement vector, row -> distinct index).
+    
+    Lets callers score the catalog once per distinct vector and gather.
+    """
+    scalar = sorted(name for name in derived if name != "target_maturity_range")
+    rows = zip(
+        *(derived[name].tolist() for name in scalar),
+        map(tuple, derived["target_maturity_range"].tolist()),
+        map(tuple, histories),
+    )
+    seen: dict[tuple, int] = {}
+    first = []
+    index = np.empty(len(histories), dtype=np.intp)
+    for i, key in enumerate(rows):
+        if key not in seen:
+            seen[key] = len(first)
+            first.append(i)
+        index[i] = seen[key]
+    return np.array(first, dtype=np.intp), index
@@ -0,0 +1,103 @@
+"""
+What-if management scenarios - score one field under every combination of practices.
+"""
+from itertools import product
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+from ..models.products import ProductCatalog
+from ..models.fields import FieldFeatures, FieldRequirements
+from ..models.management import ManagementInputs
+from .scoring import ScoringEngine
+from .feature_extraction import FeatureExtractor
+from .requirements import (feature_columns, derive_requirement_columns, distinct_requirement_rows,
+                           requirements_from_columns)
+
+
+class ScenarioCube(NamedTuple):
+    """
+    Scores for one field under each management scenario.
+    
+    scores maps "composite" and each ComponentScores field to a
+    (scenario, product) array. Scenarios that derive identical
+    requirements share a row of requirements; requirement_index maps
+    each scenario to it. eligible marks products carrying the traits
+    each scenario's herbicide/Bt program needs.
+    """
+    settings: list[dict[str, Any]]
+    scenarios: list[ManagementInputs]
+    products: list[str]
+    requirements: list[FieldRequirements]
+    requirement_index: np.ndarray
+    scores: dict[str, np.ndarray]
+    eligible: np.ndarray
+    
+    def to_frame(self, score: str = "composite", eligible_only: bool = False) -> pd.DataFrame:
+        """Scenario x product table, indexed by the swept settings."""
+        values = self.scores[score]
+        if eligible_only:
+            values = np.where(self.eligible, values, np.nan)
+        names = list(self.settings[0]) if self.settings else []
+        if names:
+            index = pd.MultiIndex.from_tuples([tuple(s[n] for n in names) for s in self.settings], names=names)
+        else:
+            index = pd.RangeIndex(len(self.settings), name="scenario")
+        return pd.DataFrame(values, index=index, columns=self.products)
+
+
+def management_scenarios(base: ManagementInputs, options: Mapping[str, Sequence[Any]]
+                         ) -> tuple[list[ManagementInputs], list[dict[str, Any]]]:
+    """
+    Cartesian product of option values applied over a base management.
+    
+    options maps ManagementInputs field names to the values to try; the
+    last field varies fastest. Each scenario is validated like user input,
+    so enum fields accept their string values.
+    """
+    unknown = set(options) - set(ManagementInputs.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown management fields: {', '.join(sorted(unknown))}")
+    names = list(options)
+    settings = [dict(zip(names, values)) for values in product(*(options[name] for name in names))]
+    base_values = base.model_dump()
+    return [ManagementInputs(**{**base_values, **setting}) for setting in settings], settings
+
+
+def sweep_scenarios(extractor: FeatureExtractor, engine: ScoringEngine, catalog: ProductCatalog,
+                    features: FieldFeatures, base: ManagementInputs,
+                    options: Mapping[str, Sequence[Any]], crop: Optional[str] = None) -> ScenarioCube:
+    """
+    Score the catalog for one field under every combination of management options.
+    
+    Requirements for all scenarios are derived in one columnar pass, and
+    the catalog is scored once per distinct requirement vector, so
+    practices that don't move any risk (for this crop) cost nothing extra.
+    
+    Example: options={"tillage": ["no-till", "conventional"],
+    "previous_crop": ["corn", "soybean"], "fungicide_program": ["none", "routine"]}
+    gives an 8 x n_products cube. Fungicide programs move the cube through
+    the modifier table's disease_tolerance_weight, which scales the disease
+    risks (and so the disease component of the composite).
+    """
+    crop = crop or catalog.crop
+    scenarios, settings = management_scenarios(base, options)
+    derived = derive_requirement_columns(extractor, feature_columns([features] * len(scenarios), scenarios), crop)
+    histories = [m.scn_source_history for m in scenarios]
+    
+    first, index = distinct_requirement_rows(derived, histories)
+    distinct = requirements_from_columns(
+        {name: values[first] for name, values in derived.items()}, [histories[i] for i in first]
+    )
+    matrix = engine.score_matrix(catalog, distinct, crop)
+    
+    return ScenarioCube(
+        settings=settings,
+        scenarios=scenarios,
+        products=list(catalog.names),
+        requirements=distinct,
+        requirement_index=index,
+        scores={name: values[index] for name, values in matrix.items()},
+        eligible=np.array([engine.trait_filter(catalog, m) for m in scenarios], dtype=bool).reshape(
+            len(scenarios), len(catalog)
+        ),
+    )
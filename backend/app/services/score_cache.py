@@ -0,0 +1,84 @@
+"""
+Component score cache - re-rank cached scores when weights change.
+"""
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.fields import FieldRequirements
+from .scoring import ScoringEngine
+
+# Column order of cached component matrices, paired with the weight keys
+# used by ScoringEngine.default_weights
+COMPONENTS = ("maturity_fit", "yield_potential", "stress_tolerance",
+              "disease_tolerance", "agronomics")
+WEIGHT_KEYS = ("maturity", "yield", "stress", "disease", "agronomic")
+
+
+def weight_vector(weights: dict[str, float]) -> np.ndarray:
+    """Order a weights dict to match the COMPONENTS columns."""
+    return np.array([weights[k] for k in WEIGHT_KEYS], dtype=float)
+
+
+def requirements_key(requirements: FieldRequirements) -> str:
+    """Stable content hash of a FieldRequirements."""
+    return hashlib.sha1(requirements.model_dump_json().encode("utf-8")).hexdigest()
+
+
+class ComponentScoreCache:
+    """
+    LRU cache of per-product component scores for a field.
+    
+    Entries are keyed on (field requirements, catalog version, crop). The
+    composite is a linear combination of the components, so a weight change
+    re-ranks with one matrix-vector product instead of re-running the scorers.
+    """
+    
+    def __init__(self, engine: Optional[ScoringEngine] = None, max_entries: int = 1024):
+        self.engine = engine or ScoringEngine()
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, np.ndarray] = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def clear(self):
+        """Drop all cached entries."""
+        self._entries.clear()
+    
+    def components(self, catalog: ProductCatalog, requirements: FieldRequirements,
+                   crop: str) -> np.ndarray:
+        """(n_products, 5) component scores (0-100), columns ordered as COMPONENTS."""
+        key = (requirements_key(requirements), catalog.version, crop)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            return cached
+        
+        scores = self.engine.score_matrix(catalog, [requirements], crop)
+        matrix = np.stack([scores[name][0] for name in COMPONENTS], axis=1)
+        matrix.setflags(write=False)
+        
+        self._entries[key] = matrix
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return matrix
+    
+    def composite(self, catalog: ProductCatalog, requirements: FieldRequirements,
+                  crop: str, weights: Optional[dict[str, float]] = None) -> np.ndarray:
+        """
+        Composite scores (0-100) under the given weights.
+        
+        Defaults to the engine's current default_weights for the crop, so
+        edits to those take effect without invalidating the cache. The
+        field's disease_weight applies either way.
+        """
+        weights = self.engine.composite_weights(crop, requirements.disease_weight, weights)
+        return self.components(catalog, requirements, crop) @ weight_vector(weights)
+    
+    def rank(self, catalog: ProductCatalog, requirements: FieldRequirements,
+             crop: str, weights: Optional[dict[str, float]] = None) -> np.ndarray:
+        """Catalog indices ordered by composite score, best first."""
+        scores = self.composite(catalog, requirements, crop, weights)
+        return np.argsort(-scores, kind="stable")
@@ -1,10 +1,11 @@
 """
 GEMx Scoring Engine - Core recommendation logic.
 """
-from typing import Union, Optional
-from ..models.products import CornHybrid, SoybeanVariety
+from typing import Union, Optional, Sequence
+import numpy as np
+from ..models.products import CornHybrid, SoybeanVariety, ProductCatalog
 from ..models.fields import FieldRequirements
-from ..models.management import ManagementInputs
+from ..models.management import ManagementInputs, HERBICIDE_SYSTEM_TRAITS, BT_TRAIT_FIELDS
 from ..models.recommendations import Recommendation, ComponentScores, RecommendationSet
 
 
@@ -18,10 +19,153 @@ def weighted_average(values: list[float], weights: list[float]) -> float:
     return sum(v * w for v, w in zip(values, weights)) / total_weight
 
 
+def weighted_average_arrays(terms: list[tuple[np.ndarray, np.ndarray]],
+                            default: float = 0.8) -> np.ndarray:
+    """
+    Vectorized weighted average over broadcastable (score, weight) pairs.
+    
+    A weight of 0 marks a term as absent. Cells with no terms at all get
+    ``default``, mirroring the "no scores" fallback of the scalar scorers.
+    """
+    numerator = 0.0
+    denominator = 0.0
+    for values, weights in terms:
+        numerator = numerator + np.where(weights > 0, values * weights, 0.0)
+        denominator = denominator + weights
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, default)
+
+
+def match_tolerance_to_risk_array(tolerance: np.ndarray, risk: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ScoringEngine.match_tolerance_to_risk.
+    
+    NaN tolerances are treated as unknown ratings (0.5), like None in the
+    scalar version. Inputs broadcast against each other.
+    """
+    tolerance = np.asarray(tolerance, dtype=float)
+    risk = np.asarray(risk, dtype=float)
+    nt = tolerance / 9.0
+    
+    low = 0.7 + (0.3 * nt)
+    mid = np.where(nt >= risk,
+                   0.85 + (0.15 * (nt - risk)),
+                   np.maximum(0.3, 0.85 - ((risk - nt) * 1.5)))
+    high = np.where(nt >= 0.7,
+                    0.9 + (0.1 * (nt - 0.7) / 0.3),
+                    np.maximum(0.2, 0.9 - ((0.7 - nt) * 2.0)))
+    
+    matched = np.where(risk < 0.3, low, np.where(risk < 0.7, mid, high))
+    return np.where(np.isnan(nt), 0.5, matched)
+
+
+def maturity_fit_array(maturity: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+    """
+    Vectorized score_maturity_fit (0-1).
+    
+    ranges holds (min, optimal, max) on its last axis; the rest of its
+    shape broadcasts against maturity.
+    """
+    min_m, opt_m, max_m = ranges[..., 0], ranges[..., 1], ranges[..., 2]
+    below = (opt_m - maturity) / np.maximum(opt_m - min_m, 1)
+    above = (maturity - opt_m) / np.maximum(max_m - opt_m, 1)
+    distance = np.where(maturity <= opt_m, below, above)
+    return np.where((maturity < min_m) | (maturity > max_m),
+                    0.0, 1.0 - (0.3 * distance))
+
+
+class ToleranceRiskTable:
+    """
+    Quantized lookup table for match_tolerance_to_risk.
+    
+    Rows are the integer ratings 0-9 and columns are cells of a uniform
+    risk grid over [0, 1]. Each cell stores the value at its left node and
+    the slope up to its right node, so lookups are one gather plus a linear
+    interpolation. steps must be a multiple of 10 so the 0.3 / 0.7 risk
+    thresholds fall on grid nodes; the only error then comes from the
+    continuous kinks of the mid-risk branch and is bounded by
+    ``error_bound`` (0.375 / steps, i.e. < 4e-4 at the default 1000 steps).
+    Non-integer ratings and out-of-range risks fall back to the exact
+    function.
+    """
+    
+    MAX_RATING = 9
+    
+    def __init__(self, steps: int = 1000):
+        if steps <= 0 or steps % 10:
+            raise ValueError(f"steps must be a positive multiple of 10, got {steps}")
+        self.steps = steps
+        self.error_bound = 0.375 / steps
+        self.nodes = np.arange(steps + 1) / steps
+        
+        ratings = np.arange(self.MAX_RATING + 1, dtype=float)[:, None]
+        left = self.nodes[None, :-1]
+        # Approach each right node from inside the cell so the thresholds'
+        # jumps never leak into the cell before them
+        right = np.nextafter(self.nodes[None, 1:], -np.inf)
+        self.base = match_tolerance_to_risk_array(ratings, left)
+        self.slope = (match_tolerance_to_risk_array(ratings, right) - self.base) / (right - left)
+        
+        self._base_rows = self.base.tolist()
+        self._slope_rows = self.slope.tolist()
+        self._node_list = self.nodes.tolist()
+    
+    def _cell(self, risk: float) -> int:
+        """Grid cell containing risk, corrected for float rounding."""
+        k = min(int(risk * self.steps), self.steps - 1)
+        if risk < self._node_list[k]:
+            k -= 1
+        elif k < self.steps - 1 and risk >= self._node_list[k + 1]:
+            k += 1
+        return k
+    
+    def lookup(self, tolerance_rating: Optional[int], risk_level: float) -> float:
+        """Table version of match_tolerance_to_risk for one rating/risk pair."""
+        if tolerance_rating is None:
+            return 0.5
+        if (tolerance_rating != int(tolerance_rating) or
+                not 0 <= tolerance_rating <= self.MAX_RATING or not 0 <= risk_level <= 1):
+            return float(match_tolerance_to_risk_array(tolerance_rating, risk_level))
+        
+        row = int(tolerance_rating)
+        k = self._cell(risk_level)
+        return (self._base_rows[row][k] +
+                self._slope_rows[row][k] * (risk_level - self._node_list[k]))
+    
+    def lookup_array(self, tolerance: np.ndarray, risk: np.ndarray) -> np.ndarray:
+        """Vectorized lookup; NaN tolerances mean unknown (0.5). Inputs broadcast."""
+        tolerance, risk = np.broadcast_arrays(np.asarray(tolerance, dtype=float),
+                                              np.asarray(risk, dtype=float))
+        rows = np.nan_to_num(tolerance, nan=-1.0)
+        in_table = ((rows == np.floor(rows)) & (rows >= 0) & (rows <= self.MAX_RATING) &
+                    (risk >= 0) & (risk <= 1))
+        rows = np.where(in_table, rows, 0).astype(np.intp)
+        
+        cells = np.clip(np.floor(np.where(in_table, risk, 0) * self.steps),
+                        0, self.steps - 1).astype(np.intp)
+        cells -= risk < self.nodes[cells]
+        cells += (cells < self.steps - 1) & (risk >= self.nodes[np.minimum(cells + 1, self.steps)])
+        cells = np.clip(cells, 0, self.steps - 1)
+        
+        values = self.base[rows, cells] + self.slope[rows, cells] * (risk - self.nodes[cells])
+        if not in_table.all():
+            values = np.where(in_table, values, match_tolerance_to_risk_array(tolerance, risk))
+        return values
+
+
+def _requirement_column(requirements: Sequence[FieldRequirements], attr: str) -> np.ndarray:
+    """Collect a FieldRequirements attribute as an (n_fields, 1) column."""
+    return np.array([getattr(r, attr) for r in requirements], dtype=float)[:, None]
+
+
 class ScoringEngine:
     """Main scoring engine for product recommendations."""
     
-    def __init__(self):
+    def __init__(self, tolerance_table: Optional[ToleranceRiskTable] = None):
+        # When set, tolerance/risk matching reads from the quantized table
+        # instead of evaluating the branches exactly
+        self.tolerance_table = tolerance_table
         self.default_weights = {
             "corn": {
                 "maturity": 0.15,
@@ -39,6 +183,21 @@ class ScoringEngine:
             }
         }
     
+    def composite_weights(self, crop: str, disease_weight: Union[float, np.ndarray] = 1.0,
+                          weights: Optional[dict] = None) -> dict:
+        """
+        Component weights for a field, from weights or default_weights.
+        
+        The disease weight is scaled by the field's disease_weight and the
+        rest rescaled so the total, and the 0-100 scale, are unchanged.
+        Array disease_weight gives array weights.
+        """
+        weights = weights or self.default_weights[crop]
+        total = sum(weights.values())
+        scaled = dict(weights, disease=weights["disease"] * disease_weight)
+        factor = total / sum(scaled.values())
+        return {name: value * factor for name, value in scaled.items()}
+    
     def score_maturity_fit(self, product_maturity: float, 
                           target_range: tuple[float, float, float]) -> float:
         """Score how well product maturity fits the field."""
@@ -57,6 +216,9 @@ class ScoringEngine:
     def match_tolerance_to_risk(self, tolerance_rating: Optional[int], 
                                 risk_level: float) -> float:
         """Match a 1-9 tolerance rating to a 0-1 risk level."""
+        if self.tolerance_table is not None:
+            return self.tolerance_table.lookup(tolerance_rating, risk_level)
+        
         if tolerance_rating is None:
             return 0.5  # Unknown = average
         
@@ -255,7 +417,7 @@ class ScoringEngine:
             disease_score = self.score_disease_tolerance_soybean(product, requirements)
             agronomic_score = self.score_agronomics_soybean(product, requirements)
         
-        weights = self.default_weights[crop]
+        weights = self.composite_weights(crop, requirements.disease_weight)
         
         composite = (
             weights["maturity"] * maturity_score +
@@ -274,3 +436,213 @@ class ScoringEngine:
         )
         
         return composite * 100, component_scores
+    
+    def _match_array(self, tolerance: np.ndarray, risk: np.ndarray) -> np.ndarray:
+        """Vectorized match_tolerance_to_risk, through the lookup table if set."""
+        if self.tolerance_table is not None:
+            return self.tolerance_table.lookup_array(tolerance, risk)
+        return match_tolerance_to_risk_array(tolerance, risk)
+    
+    def score_matrix(self, products: Union[ProductCatalog, Sequence[Union[CornHybrid, SoybeanVariety]]],
+                     requirements: Sequence[FieldRequirements],
+                     crop: str, drying: Optional[np.ndarray] = None) -> dict[str, np.ndarray]:
+        """
+        Score every product against every field in one vectorized pass.
+        
+        Returns (n_fields, n_products) arrays on the same 0-100 scale as
+        calculate_composite_score: "composite" plus one array per
+        ComponentScores field. Pass a compiled ProductCatalog to avoid
+        re-extracting columns on every call. For corn, drying takes a
+        (n_fields, n_products) simulate_drydown drying_score, which
+        replaces the flat drydown rating in agronomics.
+        """
+        catalog = products
+        if not isinstance(catalog, ProductCatalog):
+            catalog = ProductCatalog.from_products(products, crop)
+        maturity_score = self.maturity_fit_matrix(catalog, requirements, crop)
+        yield_score = np.broadcast_to(
+            catalog.column("yield_potential")[None, :] / 9.0, maturity_score.shape
+        )
+        stress_score = self._stress_matrix(catalog, requirements)
+        
+        if crop == "corn":
+            disease_score = self._disease_matrix_corn(catalog, requirements)
+            agronomic_score = self._agronomics_matrix_corn(catalog, requirements, drying)
+        else:
+            disease_score = self._disease_matrix_soybean(catalog, requirements)
+            agronomic_score = self._agronomics_matrix_soybean(catalog, requirements)
+        
+        components = {
+            "maturity_fit": maturity_score,
+            "yield_potential": yield_score,
+            "stress_tolerance": np.broadcast_to(stress_score, maturity_score.shape),
+            "disease_tolerance": np.broadcast_to(disease_score, maturity_score.shape),
+            "agronomics": np.broadcast_to(agronomic_score, maturity_score.shape),
+        }
+        weights = self.composite_weights(crop, _requirement_column(requirements, "disease_weight"))
+        composite = (
+            weights["maturity"] * components["maturity_fit"] +
+            weights["yield"] * components["yield_potential"] +
+            weights["stress"] * components["stress_tolerance"] +
+            weights["disease"] * components["disease_tolerance"] +
+            weights["agronomic"] * components["agronomics"]
+        )
+        
+        scores = {name: values * 100 for name, values in components.items()}
+        scores["composite"] = composite * 100
+        return scores
+    
+    def maturity_fit_matrix(self, catalog: ProductCatalog,
+                            requirements: Sequence[FieldRequirements], crop: str) -> np.ndarray:
+        """Vectorized score_maturity_fit."""
+        maturity_attr = "relative_maturity" if crop == "corn" else "maturity_group"
+        maturity = catalog.column(maturity_attr)[None, :]
+        ranges = np.array([r.target_maturity_range for r in requirements], dtype=float)
+        return maturity_fit_array(maturity, ranges[:, None, :])
+    
+    def _stress_matrix(self, catalog: ProductCatalog, 
+                       requirements: Sequence[FieldRequirements]) -> np.ndarray:
+        """Vectorized score_stress_tolerance."""
+        drought_risk = _requirement_column(requirements, "drought_risk")
+        emergence = _requirement_column(requirements, "emergence_challenge")
+        
+        return weighted_average_arrays([
+            (self._match_array(catalog.column("drought_tolerance"),
+                                           drought_risk),
+             np.where(drought_risk > 0.2, drought_risk, 0.0)),
+            (self._match_array(catalog.column("emergence_vigor"),
+                                           emergence),
+             np.where(emergence > 0.3, emergence * 0.7, 0.0)),
+        ])
+    
+    def _disease_terms(self, catalog: ProductCatalog, requirements: Sequence[FieldRequirements],
+                       pairs: list[tuple[str, str]]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Build (score, weight) terms for rating/risk pairs, skipping unknown ratings."""
+        terms = []
+        for rating_attr, risk_attr in pairs:
+            rating = catalog.column(rating_attr)[None, :]
+            risk = _requirement_column(requirements, risk_attr)
+            weight = np.where(~np.isnan(rating) & (risk > 0.1), risk, 0.0)
+            terms.append((self._match_array(rating, risk), weight))
+        return terms
+    
+    def _disease_matrix_corn(self, catalog: ProductCatalog,
+                             requirements: Sequence[FieldRequirements]) -> np.ndarray:
+        """Vectorized score_disease_tolerance_corn."""
+        return weighted_average_arrays(self._disease_terms(catalog, requirements, [
+            ("gray_leaf_spot", "gls_risk"),
+            ("northern_leaf_blight", "nclb_risk"),
+            ("tar_spot", "tar_spot_risk"),
+            ("gosss_wilt", "gosss_wilt_risk"),
+        ]))
+    
+    def _disease_matrix_soybean(self, catalog: ProductCatalog,
+                                requirements: Sequence[FieldRequirements]) -> np.ndarray:
+        """Vectorized score_disease_tolerance_soybean."""
+        terms = self._disease_terms(catalog, requirements, [
+            ("sds_rating", "sds_risk"),
+            ("phytophthora_field", "phytophthora_risk"),
+            ("white_mold", "white_mold_risk"),
+            ("frogeye_leaf_spot", "frogeye_risk"),
+        ])
+        
+        # SCN depends only on (source, field history), so score each distinct
+        # source once per field and gather
+        distinct, source_idx = catalog.categorical("scn_source")
+        scn_risk = _requirement_column(requirements, "scn_risk")
+        scn_by_source = np.array([
+            [self.score_scn_resistance(s, r.scn_risk, r.scn_source_history) for s in distinct]
+            for r in requirements
+        ], dtype=float).reshape(len(requirements), len(distinct))
+        terms.append((scn_by_source[:, source_idx],
+                      np.where(scn_risk > 0.3, scn_risk * 1.5, 0.0)))
+        
+        idc_rating = catalog.column("idc_tolerance")[None, :]
+        idc_risk = _requirement_column(requirements, "idc_risk")
+        terms.append((self._match_array(idc_rating, idc_risk),
+                      np.where((idc_risk > 0.3) & (np.nan_to_num(idc_rating) > 0),
+                               idc_risk * 1.5, 0.0)))
+        
+        return weighted_average_arrays(terms)
+    
+    def _agronomics_matrix_corn(self, catalog: ProductCatalog,
+                                requirements: Sequence[FieldRequirements],
+                                drying: Optional[np.ndarray] = None) -> np.ndarray:
+        """Vectorized score_agronomics_corn, optionally with simulated drying cost."""
+        standability_need = _requirement_column(requirements, "standability_need")
+        late_harvest = _requirement_column(requirements, "late_harvest_risk")
+        
+        stalk = np.nan_to_num(catalog.column("stalk_strength"), nan=5) / 9.0
+        root = np.nan_to_num(catalog.column("root_strength"), nan=5) / 9.0
+        drydown = np.nan_to_num(catalog.column("drydown"))[None, :]
+        test_weight = np.nan_to_num(catalog.column("test_weight"))[None, :]
+        
+        drydown_term = (drydown / 9.0,
+                        np.where((late_harvest > 0.3) & (drydown > 0), late_harvest * 0.8, 0.0))
+        if drying is not None:
+            # Simulated harvest moisture applies to every field, weighted
+            # at least as much as a late-harvest field's rating term
+            drydown_term = (drying, np.broadcast_to(np.maximum(late_harvest, 0.3) * 0.8, drying.shape))
+        
+        return weighted_average_arrays([
+            (((stalk + root) / 2)[None, :],
+             np.where(standability_need > 0.3, standability_need, 0.0)),
+            drydown_term,
+            (test_weight / 9.0, np.where(test_weight > 0, 0.3, 0.0)),
+        ])
+    
+    def _agronomics_matrix_soybean(self, catalog: ProductCatalog,
+                                   requirements: Sequence[FieldRequirements]) -> np.ndarray:
+        """Vectorized score_agronomics_soybean."""
+        lodging_risk = _requirement_column(requirements, "lodging_risk")
+        lodging = np.nan_to_num(catalog.column("lodging_resistance"))[None, :]
+        
+        return weighted_average_arrays([
+            (lodging / 9.0,
+             np.where((lodging_risk > 0.3) & (lodging > 0), lodging_risk, 0.0)),
+        ])
+    
+    def trait_filter(self, catalog: ProductCatalog,
+                     management: ManagementInputs) -> np.ndarray:
+        """
+        Boolean mask of products carrying the traits a management program needs.
+        
+        Each requirement is one bitwise AND over the catalog's trait masks.
+        """
+        keep = np.ones(len(catalog), dtype=bool)
+        
+        herbicide_traits = HERBICIDE_SYSTEM_TRAITS.get(management.herbicide_system, ())
+        if herbicide_traits:
+            keep &= catalog.has_any_traits("herbicide_traits", herbicide_traits)
+        
+        if management.bt_requirement:
+            has_bt = np.zeros(len(catalog), dtype=bool)
+            for field in BT_TRAIT_FIELDS:
+                has_bt |= catalog.has_any_traits(field, [management.bt_requirement])
+            keep &= has_bt
+        
+        return keep
+    
+    def score_candidates(self, catalog: ProductCatalog, requirements: FieldRequirements,
+                         crop: str, management: Optional[ManagementInputs] = None
+                         ) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Score only the products that pass the hard constraints.
+        
+        Uses the catalog's maturity index so out-of-window products (which
+        would score 0 on maturity fit) are never touched, and drops products
+        missing required traits before any scoring runs. Returns the catalog
+        indices of the candidates and their 1-D score arrays.
+        """
+        indices = self.candidate_indices(catalog, requirements, management)
+        scores = self.score_matrix(catalog.subset(indices), [requirements], crop)
+        return indices, {name: values[0] for name, values in scores.items()}
+    
+    def candidate_indices(self, catalog: ProductCatalog, requirements: FieldRequirements,
+                          management: Optional[ManagementInputs] = None) -> np.ndarray:
+        """Catalog indices inside the maturity window and carrying the required traits."""
+        min_m, _, max_m = requirements.target_maturity_range
+        indices = catalog.maturity_index.range(min_m, max_m)
+        if management is not None:
+            indices = indices[self.trait_filter(catalog, management)[indices]]
+        return indices
@@ -0,0 +1,234 @@
+"""
+Economic optimum seeding rate - yield response curves and price sweeps.
+
+Yield response to seeding rate s (thousand seeds/acre) is a cubic
+a + b*s + c*s^2 + d*s^3, optionally flat beyond a plateau rate; the
+quadratic-plateau form is the d = 0 case with the plateau at the vertex.
+Net return price*Y(s) - seed_cost*s peaks where Y'(s) = seed_cost/price,
+a quadratic with closed-form roots, so the optimum for every field x
+product x seed cost x grain price is found by evaluating the roots and
+the rate bounds in one broadcast.
+"""
+from typing import NamedTuple, Sequence, Union
+import numpy as np
+import pandas as pd
+from ..models.products import ProductCatalog
+from ..models.fields import FieldRequirements
+
+# Agronomic optimum corn population (plants/acre) from yield level
+# (bu/acre), the cubic of docs/PREVIOUS_ALGORITHM.md section 5.1
+POPULATION_CURVE = (-0.000148, 0.106349, 2.830688, 22666.67)
+EAR_TYPE_ADJUSTMENT = {"Flex": -1000, "Fixed": 1000}
+SOYBEAN_BRANCHING_ADJUSTMENT = {"Bushy": -10000, "Erect": 10000}
+# Soybean optimum by row spacing: (max inches, plants/acre)
+SOYBEAN_ROW_POPULATION = ((15, 140000), (20, 130000), (float("inf"), 120000))
+
+# Attainable yield (bu/acre) by yield environment, before the product's
+# yield potential adjustment of YIELD_POTENTIAL_EFFECT per rating point from 7
+YIELD_LEVELS = {
+    "corn": {"high": 230.0, "medium": 200.0, "low": 160.0},
+    "soybean": {"high": 70.0, "medium": 60.0, "low": 48.0},
+}
+YIELD_POTENTIAL_EFFECT = 0.02
+
+# Relative yield loss at zero population; lower is a flatter response
+CURVATURE = {"corn": 0.8, "soybean": 0.5}
+EAR_TYPE_CURVATURE = {"Flex": 0.6, "Fixed": 1.0}
+
+# Seeding rate limits, thousand seeds/acre
+RATE_BOUNDS = {"corn": (18.0, 40.0), "soybean": (80.0, 180.0)}
+
+
+class ResponseCurves(NamedTuple):
+    """
+    Yield response per (field, product).
+    
+    coefficients is (field, product, 4): a, b, c, d for rates in thousand
+    seeds/acre. Yield is flat beyond plateau (inf for none).
+    """
+    coefficients: np.ndarray
+    plateau: np.ndarray
+    
+    def yield_at(self, rate: np.ndarray) -> np.ndarray:
+        """Yield at rate (thousand seeds/acre), broadcast over trailing axes."""
+        extra = np.ndim(rate) - 2
+        a, b, c, d = (self.coefficients[..., i].reshape(self.plateau.shape + (1,) * max(extra, 0))
+                      for i in range(4))
+        plateau = self.plateau.reshape(self.plateau.shape + (1,) * max(extra, 0))
+        s = np.minimum(rate, plateau)
+        return a + s * (b + s * (c + s * d))
+
+
+def quadratic_plateau(max_yield: np.ndarray, optimum: np.ndarray,
+                      curvature: Union[float, np.ndarray]) -> ResponseCurves:
+    """
+    Y(s) = max_yield * (1 - curvature * (1 - s/optimum)^2) up to optimum, flat after.
+    
+    optimum is the agronomic optimum in thousand seeds/acre.
+    """
+    max_yield, optimum, curvature = np.broadcast_arrays(
+        np.asarray(max_yield, dtype=float), np.asarray(optimum, dtype=float),
+        np.asarray(curvature, dtype=float),
+    )
+    coefficients = np.stack([
+        max_yield * (1.0 - curvature),
+        2.0 * curvature * max_yield / optimum,
+        -curvature * max_yield / optimum ** 2,
+        np.zeros_like(max_yield),
+    ], axis=-1)
+    return ResponseCurves(coefficients, optimum.copy())
+
+
+def cubic(coefficients: np.ndarray) -> ResponseCurves:
+    """Curves from fitted (field, product, 4) cubic coefficients, no plateau."""
+    coefficients = np.asarray(coefficients, dtype=float)
+    return ResponseCurves(coefficients, np.full(coefficients.shape[:-1], np.inf))
+
+
+def _categorical(catalog: ProductCatalog, name: str) -> np.ndarray:
+    table, codes = catalog.categories.get(name, ([None], np.zeros(len(catalog), dtype=np.int32)))
+    return np.array(table, dtype=object)[codes]
+
+
+def agronomic_optimum(catalog: ProductCatalog, requirements: Sequence[FieldRequirements],
+                      row_spacing: Union[float, np.ndarray] = 30.0) -> np.ndarray:
+    """
+    (field, product) agronomic optimum population, plants/acre.
+    
+    Corn follows POPULATION_CURVE at the field's attainable yield, shifted
+    by ear type; soybean follows row spacing, shifted by branching habit.
+    Products carrying a population_range are held inside it.
+    """
+    if catalog.crop == "corn":
+        level = attainable_yield(catalog, requirements)
+        x3, x2, x1, b = POPULATION_CURVE
+        optimum = ((x3 * level + x2) * level + x1) * level + b
+        adjust = np.array([EAR_TYPE_ADJUSTMENT.get(e, 0) for e in _categorical(catalog, "ear_type")],
+                          dtype=float)
+    else:
+        spacing = np.broadcast_to(np.asarray(row_spacing, dtype=float), (len(requirements),))
+        base = np.select([spacing <= limit for limit, _ in SOYBEAN_ROW_POPULATION],
+                         [float(pop) for _, pop in SOYBEAN_ROW_POPULATION])
+        optimum = np.repeat(base[:, None], len(catalog), axis=1)
+        adjust = np.array([SOYBEAN_BRANCHING_ADJUSTMENT.get(b, 0) for b in _categorical(catalog, "branching")],
+                          dtype=float)
+    optimum = optimum + adjust[None, :]
+    
+    population_range = catalog.columns.get("population_range")
+    if population_range is not None and population_range.ndim == 2 and population_range.shape[1] >= 2:
+        low, high = population_range[:, 0], population_range[:, 1]
+        optimum = np.where(np.isnan(low), optimum, np.maximum(optimum, low))
+        optimum = np.where(np.isnan(high), optimum, np.minimum(optimum, high))
+    return optimum
+
+
+def attainable_yield(catalog: ProductCatalog, requirements: Sequence[FieldRequirements]) -> np.ndarray:
+    """(field, product) plateau yield from yield environment and yield potential."""
+    levels = YIELD_LEVELS[catalog.crop]
+    base = np.array([levels.get(r.yield_environment, levels["medium"]) for r in requirements], dtype=float)
+    potential = np.nan_to_num(catalog.column("yield_potential"), nan=7.0)
+    return base[:, None] * (1.0 + YIELD_POTENTIAL_EFFECT * (potential - 7.0))[None, :]
+
+
+def response_curves(catalog: ProductCatalog, requirements: Sequence[FieldRequirements],
+                    row_spacing: Union[float, np.ndarray] = 30.0) -> ResponseCurves:
+    """Quadratic-plateau curves for every field x product from catalog traits."""
+    curvature = np.full(len(catalog), CURVATURE[catalog.crop])
+    if catalog.crop == "corn":
+        curvature = np.array([EAR_TYPE_CURVATURE.get(e, c) for e, c in
+                              zip(_categorical(catalog, "ear_type"), curvature)])
+    return quadratic_plateau(
+        attainable_yield(catalog, requirements),
+        agronomic_optimum(catalog, requirements, row_spacing) / 1000.0,
+        curvature[None, :],
+    )
+
+
+class SeedingRateTable(NamedTuple):
+    """
+    Economic optimum per (field, product, seed cost, grain price).
+    
+    rate is plants/acre; seed_costs are $ per thousand seeds and
+    grain_prices $ per bushel. net_return is $/acre after seed.
+    """
+    seed_costs: np.ndarray
+    grain_prices: np.ndarray
+    rate: np.ndarray
+    yield_: np.ndarray
+    net_return: np.ndarray
+    
+    def table(self, field: int, product: int, value: str = "rate") -> pd.DataFrame:
+        """Seed cost x grain price sensitivity table for one field and product."""
+        return pd.DataFrame(
+            getattr(self, value)[field, product],
+            index=pd.Index(self.seed_costs, name="seed_cost"),
+            columns=pd.Index(self.grain_prices, name="grain_price"),
+        )
+
+
+def economic_optimum(curves: ResponseCurves, seed_costs: Sequence[float], grain_prices: Sequence[float],
+                     bounds: tuple[float, float]) -> SeedingRateTable:
+    """
+    Profit-maximizing rate for every curve at every seed cost x grain price.
+    
+    Candidates are the rate bounds and the roots of Y'(s) = cost/price
+    inside them (capped at the plateau, past which seed only costs);
+    the best candidate by net return wins.
+    """
+    seed_costs = np.asarray(seed_costs, dtype=float)
+    grain_prices = np.asarray(grain_prices, dtype=float)
+    low, high = bounds
+    ratio = seed_costs[:, None] / grain_prices[None, :]
+    
+    # (field, product, 1, 1) against (cost, price)
+    a, b, c, d = (curves.coefficients[..., i][..., None, None] for i in range(4))
+    upper = np.minimum(high, curves.plateau)[..., None, None]
+    upper = np.maximum(upper, low)
+    
+    # Y'(s) = b + 2c s + 3d s^2 = ratio
+    with np.errstate(invalid="ignore", divide="ignore"):
+        linear = (ratio - b) / (2.0 * c)
+        disc = (2.0 * c) ** 2 - 12.0 * d * (b - ratio)
+        root = np.sqrt(disc)
+        plus = (-2.0 * c + root) / (6.0 * d)
+        minus = (-2.0 * c - root) / (6.0 * d)
+    cubic_term = d != 0
+    roots = [np.where(cubic_term, plus, linear), np.where(cubic_term, minus, np.nan)]
+    
+    shape = np.broadcast_shapes(upper.shape, ratio.shape)
+    candidates = [np.broadcast_to(upper, shape)]
+    for r in roots:
+        r = np.broadcast_to(r, shape)
+        candidates.append(np.where(np.isfinite(r) & (r > low) & (r < upper), r, np.nan))
+    
+    # Keep a running best rather than stacking every candidate
+    prices = grain_prices[None, None, None, :]
+    costs = seed_costs[None, None, :, None]
+    rate = np.full(shape, float(low))
+    best_yield = np.broadcast_to(curves.yield_at(rate), shape).copy()
+    best_return = prices * best_yield - costs * rate
+    for s in candidates:
+        yields = curves.yield_at(s)
+        returns = np.where(np.isnan(s), -np.inf, prices * yields - costs * s)
+        better = returns > best_return
+        np.copyto(rate, s, where=better)
+        np.copyto(best_yield, yields, where=better)
+        np.copyto(best_return, returns, where=better)
+    
+    return SeedingRateTable(
+        seed_costs=seed_costs,
+        grain_prices=grain_prices,
+        rate=rate * 1000.0,
+        yield_=best_yield,
+        net_return=best_return,
+    )
+
+
+def seeding_rate_table(catalog: ProductCatalog, requirements: Sequence[FieldRequirements],
+                       seed_costs: Sequence[float], grain_prices: Sequence[float],
+                       row_spacing: Union[float, np.ndarray] = 30.0) -> SeedingRateTable:
+    """Economic optimum seeding rates for a book of fields x the catalog, across prices."""
+    return economic_optimum(
+        response_curves(catalog, requirements, row_spacing), seed_costs, grain_prices,
+        RATE_BOUNDS[catalog.crop],
+    )
@@ -0,0 +1,274 @@
+"""
+SSURGO soil extraction - area-weighted map unit properties per field boundary.
+
+Reads a gSSURGO GeoPackage (map unit polygons plus the muaggatt,
+component, chorizon and chtexturegrp tables). FileGDB downloads can be
+converted with `ogr2ogr -f GPKG gSSURGO_IA.gpkg gSSURGO_IA.gdb`.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Sequence, Union
+import hashlib
+import sqlite3
+import numpy as np
+import shapely
+from shapely.geometry import shape
+from ..models.fields import SoilFeatures
+
+# Area-weighted means (SoilFeatures field -> per-mukey column)
+NUMERIC_PROPERTIES = ("sand_pct", "silt_pct", "clay_pct", "om_pct", "ph", "cec",
+                      "aws_0_100", "slope_pct")
+# Area-weighted modes
+CATEGORICAL_PROPERTIES = ("texture_class", "drainage_class", "hydro_group")
+# Worst case over the field, least to most severe
+FLOOD_ORDER = ("None", "Very rare", "Rare", "Occasional", "Frequent", "Very frequent")
+
+# Surface horizon properties, component-percent weighted within a map unit
+HORIZON_COLUMNS = {
+    "sand_pct": "sandtotal_r",
+    "silt_pct": "silttotal_r",
+    "clay_pct": "claytotal_r",
+    "om_pct": "om_r",
+    "ph": "ph1to1h2o_r",
+    "cec": "cec7_r",
+}
+
+# Envelope sizes (bytes) by GeoPackage header envelope indicator
+_GPKG_ENVELOPE = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+
+def gpkg_to_wkb(blob: bytes) -> bytes:
+    """Strip the GeoPackage binary header, leaving standard WKB."""
+    if blob[:2] != b"GP":
+        return blob
+    return blob[8 + _GPKG_ENVELOPE[(blob[3] >> 1) & 0x07]:]
+
+
+class SSURGOExtractor:
+    """
+    Area-weighted SSURGO properties for field boundaries.
+    
+    Map unit properties are resolved once per mukey at construction.
+    Candidate polygons come from the GeoPackage's R-tree, so only polygons
+    near the requested fields are ever read; parsed polygons stay in an
+    LRU cache for neighbouring fields. Layers without an R-tree are loaded
+    once into an in-memory STRtree instead.
+    
+    extract_many() intersects a whole batch of boundaries with their
+    candidate polygons in single vectorized shapely calls.
+    """
+    
+    def __init__(self, path: Union[str, Path], layer: str = "mupolygon",
+                 max_cached_polygons: int = 200_000):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        self.max_cached_polygons = max_cached_polygons
+        self._polygons: OrderedDict[int, tuple] = OrderedDict()
+        
+        row = self.conn.execute(
+            "SELECT g.table_name, g.column_name, s.organization, s.organization_coordsys_id "
+            "FROM gpkg_geometry_columns g JOIN gpkg_spatial_ref_sys s ON s.srs_id = g.srs_id "
+            "WHERE lower(g.table_name) = lower(?)", (layer,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"No geometry layer '{layer}' in {self.path}")
+        self.table, self.geom_column, org, code = row
+        self.crs = f"{org}:{code}"
+        self.pk = next(r[1] for r in self.conn.execute(f'PRAGMA table_info("{self.table}")') if r[5])
+        self.rtree = f"rtree_{self.table}_{self.geom_column}"
+        if not self._has_table(self.rtree):
+            self.rtree = None
+            self._tree = None
+        
+        self._transformer = None
+        if self.crs.upper() != "EPSG:4326":
+            from pyproj import Transformer
+            self._transformer = Transformer.from_crs("EPSG:4326", self.crs, always_xy=True)
+        
+        self._load_mapunits()
+        self.version = self._source_version()
+    
+    def _has_table(self, name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE lower(name) = lower(?)", (name,)
+        ).fetchone() is not None
+    
+    def _source_version(self) -> str:
+        """Survey-area save dates when present, else file size/mtime."""
+        if self._has_table("sacatalog"):
+            dates = [r[0] for r in self.conn.execute("SELECT saverest FROM sacatalog ORDER BY areasymbol")]
+            digest = hashlib.sha1("|".join(map(str, dates)).encode()).hexdigest()[:16]
+        else:
+            stat = self.path.stat()
+            digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+        return f"gssurgo:{digest}"
+    
+    def _load_mapunits(self):
+        """Build per-mukey property arrays (row i <-> self.mukeys[i])."""
+        horizons: dict[str, list] = {}
+        if self._has_table("component") and self._has_table("chorizon"):
+            texture_join = texture_col = ""
+            if self._has_table("chtexturegrp"):
+                texture_join = ("LEFT JOIN chtexturegrp t ON t.chkey = h.chkey "
+                                "AND t.rvindicator = 'Yes'")
+                texture_col = ", t.texdesc"
+            query = (
+                f"SELECT c.mukey, c.comppct_r, {', '.join('h.' + c for c in HORIZON_COLUMNS.values())}"
+                f"{texture_col or ', NULL'} FROM component c "
+                f"JOIN chorizon h ON h.cokey = c.cokey {texture_join} "
+                "WHERE h.hzdept_r = 0"
+            )
+            for mukey, pct, *values in self.conn.execute(query):
+                horizons.setdefault(str(mukey), []).append((pct or 0.0, values))
+        
+        aggregates = {}
+        if self._has_table("muaggatt"):
+            for mukey, drainage, hydro, aws, flood, slope in self.conn.execute(
+                "SELECT mukey, drclassdcd, hydgrpdcd, aws0100wta, flodfreqdcd, slopegradwta FROM muaggatt"
+            ):
+                aggregates[str(mukey)] = (drainage, hydro, aws, flood, slope)
+        
+        self.mukeys = sorted(set(horizons) | set(aggregates))
+        self.mukey_index = {k: i for i, k in enumerate(self.mukeys)}
+        M = len(self.mukeys)
+        
+        self.numeric = np.full((M, len(NUMERIC_PROPERTIES)), np.nan)
+        categories = {name: [None] * M for name in CATEGORICAL_PROPERTIES}
+        flood = np.zeros(M, dtype=np.int8)
+        
+        for i, mukey in enumerate(self.mukeys):
+            components = horizons.get(mukey, [])
+            if components:
+                pct = np.array([c[0] for c in components], dtype=float)
+                values = np.array([c[1][:len(HORIZON_COLUMNS)] for c in components], dtype=float)
+                valid = ~np.isnan(values)
+                weight = (pct[:, None] * valid).sum(axis=0)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    self.numeric[i, :len(HORIZON_COLUMNS)] = (
+                        np.where(valid, values, 0.0) * pct[:, None]).sum(axis=0) / weight
+                # Dominant component's surface texture
+                categories["texture_class"][i] = max(components, key=lambda c: c[0])[1][-1]
+            
+            if mukey in aggregates:
+                drainage, hydro, aws, flood_freq, slope = aggregates[mukey]
+                self.numeric[i, NUMERIC_PROPERTIES.index("aws_0_100")] = np.nan if aws is None else aws
+                self.numeric[i, NUMERIC_PROPERTIES.index("slope_pct")] = np.nan if slope is None else slope
+                categories["drainage_class"][i] = drainage
+                categories["hydro_group"][i] = hydro
+                flood[i] = FLOOD_ORDER.index(flood_freq) if flood_freq in FLOOD_ORDER else -1
+            else:
+                flood[i] = -1
+        
+        # Categorical columns as (table, codes); code -1 = missing
+        self.categories = {}
+        for name, values in categories.items():
+            table = sorted({v for v in values if v is not None})
+            lookup = {v: j for j, v in enumerate(table)}
+            codes = np.array([lookup.get(v, -1) for v in values], dtype=np.int32)
+            self.categories[name] = (table, codes)
+        self.flood_rank = flood
+    
+    def _read_polygons(self, fids: Sequence[int]) -> None:
+        """Parse polygons not already cached (fid -> (geometry, mukey row))."""
+        missing = [f for f in fids if f not in self._polygons]
+        for start in range(0, len(missing), 500):
+            batch = missing[start:start + 500]
+            rows = self.conn.execute(
+                f'SELECT "{self.pk}", mukey, "{self.geom_column}" FROM "{self.table}" '
+                f'WHERE "{self.pk}" IN ({",".join("?" * len(batch))})', batch
+            ).fetchall()
+            geoms = shapely.from_wkb([gpkg_to_wkb(r[2]) for r in rows])
+            for (fid, mukey, _), geom in zip(rows, geoms):
+                self._polygons[fid] = (geom, self.mukey_index.get(str(mukey), -1))
+        for f in fids:
+            self._polygons.move_to_end(f)
+        while len(self._polygons) > max(self.max_cached_polygons, len(fids)):
+            self._polygons.popitem(last=False)
+    
+    def _candidates(self, geoms: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(field index, polygon geometry, mukey row) for every bbox overlap."""
+        if self.rtree is None:
+            if self._tree is None:
+                rows = self.conn.execute(
+                    f'SELECT mukey, "{self.geom_column}" FROM "{self.table}"').fetchall()
+                self._all_geoms = shapely.from_wkb([gpkg_to_wkb(r[1]) for r in rows])
+                self._all_mukeys = np.array([self.mukey_index.get(str(r[0]), -1) for r in rows])
+                self._tree = shapely.STRtree(self._all_geoms)
+            field_idx, poly_idx = self._tree.query(geoms)
+            return field_idx, self._all_geoms[poly_idx], self._all_mukeys[poly_idx]
+        
+        field_idx, fids = [], []
+        query = f'SELECT id FROM "{self.rtree}" WHERE minx <= ? AND maxx >= ? AND miny <= ? AND maxy >= ?'
+        for i, (minx, miny, maxx, maxy) in enumerate(shapely.bounds(geoms)):
+            hits = [r[0] for r in self.conn.execute(query, (maxx, minx, maxy, miny))]
+            field_idx.extend([i] * len(hits))
+            fids.extend(hits)
+        self._read_polygons(list(dict.fromkeys(fids)))
+        polygons = [self._polygons[f] for f in fids]
+        return (
+            np.array(field_idx, dtype=np.intp),
+            np.array([p[0] for p in polygons], dtype=object),
+            np.array([p[1] for p in polygons], dtype=np.intp),
+        )
+    
+    def _to_layer_crs(self, boundaries: Sequence[dict]) -> np.ndarray:
+        geoms = np.array([
+            shape(b.get("geometry") if b.get("type") == "Feature" else b) for b in boundaries
+        ], dtype=object)
+        if self._transformer is not None:
+            geoms = shapely.transform(geoms, lambda xy: np.column_stack(
+                self._transformer.transform(xy[:, 0], xy[:, 1])))
+        return geoms
+    
+    def extract_many(self, boundaries: Sequence[dict]) -> list[SoilFeatures]:
+        """SoilFeatures for each GeoJSON boundary (EPSG:4326), in order."""
+        N = len(boundaries)
+        if N == 0:
+            return []
+        geoms = self._to_layer_crs(boundaries)
+        shapely.prepare(geoms)
+        
+        field_idx, polygons, rows = self._candidates(geoms)
+        hit = shapely.intersects(geoms[field_idx], polygons) & (rows >= 0)
+        field_idx, polygons, rows = field_idx[hit], polygons[hit], rows[hit]
+        area = shapely.area(shapely.intersection(geoms[field_idx], polygons))
+        # Neighbours that only share an edge must not set the worst flood class
+        overlap = area > 0
+        field_idx, rows, area = field_idx[overlap], rows[overlap], area[overlap]
+        
+        # Area-weighted means, ignoring map units missing a property
+        values = self.numeric[rows]
+        weights = area[:, None] * ~np.isnan(values)
+        totals = np.zeros((N, values.shape[1]))
+        sums = np.zeros((N, values.shape[1]))
+        np.add.at(totals, field_idx, weights)
+        np.add.at(sums, field_idx, np.nan_to_num(values) * weights)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(totals > 0, sums / totals, np.nan)
+        
+        # Area-weighted modes
+        modes = {}
+        for name, (table, codes) in self.categories.items():
+            piece_codes = codes[rows]
+            known = piece_codes >= 0
+            cells = np.zeros((N, max(len(table), 1)))
+            np.add.at(cells, (field_idx[known], piece_codes[known]), area[known])
+            best = cells.argmax(axis=1)
+            modes[name] = [table[b] if cells[i, b] > 0 else None for i, b in enumerate(best)]
+        
+        worst = np.full(N, -1, dtype=np.int8)
+        np.maximum.at(worst, field_idx, self.flood_rank[rows])
+        
+        results = []
+        for i in range(N):
+            numeric = {name: (None if np.isnan(v) else round(float(v), 3))
+                       for name, v in zip(NUMERIC_PROPERTIES, means[i])}
+            results.append(SoilFeatures(
+                **numeric,
+                **{name: modes[name][i] for name in CATEGORICAL_PROPERTIES},
+                flood_freq=FLOOD_ORDER[worst[i]] if worst[i] >= 0 else None,
+            ))
+        return results
+    
+    def extract(self, boundary_geojson: dict) -> SoilFeatures:
+        return self.extract_many([boundary_geojson])[0]
@@ -0,0 +1,84 @@
+"""
+Streaming field pipeline - score JSONL field inventories with bounded memory.
+"""
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional, Union
+import json
+from ..models.products import ProductCatalog
+from ..models.fields import Field
+from ..models.management import ManagementInputs
+from ..models.recommendations import RecommendationSet
+from .batch import BatchScoringRunner
+
+
+def read_jsonl(source: Union[str, Path, IO[str]]) -> Iterator[dict]:
+    """Yield one dict per non-blank line of a JSONL/NDJSON file."""
+    if isinstance(source, (str, Path)):
+        with open(source) as f:
+            yield from read_jsonl(f)
+        return
+    
+    for line_no, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_no}: {e}") from e
+
+
+def parse_field_record(record: dict,
+                       default_management: ManagementInputs) -> tuple[Field, ManagementInputs]:
+    """
+    Split a field record into a Field and its management.
+    
+    Records follow the Field schema, optionally with a "management" object;
+    fields without one use default_management.
+    """
+    record = dict(record)
+    management = record.pop("management", None)
+    field = Field.model_validate(record)
+    if management is None:
+        return field, default_management
+    return field, ManagementInputs.model_validate(management)
+
+
+def stream_recommendations(records: Iterable[dict], catalog: ProductCatalog,
+                           default_management: ManagementInputs,
+                           data_dir: Optional[Path] = None,
+                           workers: Optional[int] = 1, chunk_size: int = 64,
+                           top_n: int = 5, max_pending: Optional[int] = None,
+                           feature_cache: Optional[Path] = None
+                           ) -> Iterator[RecommendationSet]:
+    """
+    Lazily score field records, yielding RecommendationSets in input order.
+    
+    Records are parsed as they are pulled, and at most max_pending chunks
+    are scored ahead of the consumer, so memory stays flat no matter how
+    many fields the input holds.
+    """
+    runner = BatchScoringRunner(catalog, data_dir=data_dir, workers=workers,
+                                chunk_size=chunk_size, top_n=top_n, max_pending=max_pending,
+                                feature_cache=feature_cache)
+    jobs = (parse_field_record(r, default_management) for r in records)
+    yield from runner.run(jobs)
+
+
+def iter_rows(recommendation_sets: Iterable[RecommendationSet]) -> Iterator[dict]:
+    """Flatten RecommendationSets into CSV-style rows as they arrive."""
+    for recommendation_set in recommendation_sets:
+        yield from recommendation_set.to_csv_rows()
+
+
+def write_jsonl(rows: Iterable[dict], destination: Union[str, Path, IO[str]]) -> int:
+    """Write rows as JSONL, returning the number written."""
+    if isinstance(destination, (str, Path)):
+        with open(destination, "w") as f:
+            return write_jsonl(rows, f)
+    
+    count = 0
+    for row in rows:
+        destination.write(json.dumps(row) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,378 @@
+"""
+Variable rate seeding - 10 m productivity rasters and population prescriptions.
+
+Implements the grid pipeline of docs/VARIABLE_RATE_SEEDING.md: input
+layers (multi-year yield, TWI, NCCPI, forecast probabilities) are
+reprojected onto a 10 m grid in the field's UTM zone and clipped to its
+boundary, combined into a 0-1 productivity index, and mapped cell by cell
+to a seeding rate. Every step is a whole-array operation; cells outside
+the boundary or without data are NaN in float rasters and
+POPULATION_NODATA in the population raster.
+"""
+from typing import NamedTuple, Optional, Sequence, Union
+import warnings
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.features import geometry_mask
+from rasterio.transform import from_origin
+from rasterio.warp import Resampling, reproject, transform_bounds, transform_geom
+from rasterio.windows import Window, from_bounds, transform as window_transform
+from .feature_extraction import boundary_centroid
+from .seeding_rate import POPULATION_CURVE
+
+RESOLUTION_M = 10.0
+SQ_M_PER_ACRE = 4046.86
+POPULATION_NODATA = 0
+
+# Stability classes (YieldLayer.stability): CV below STABLE_CV is stable,
+# above VARIABLE_CV variable, moderate between; NO_STABILITY marks no data
+MODERATE, STABLE_HIGH, STABLE_LOW, VARIABLE = 0, 1, 2, 3
+NO_STABILITY = -1
+STABLE_CV = 0.10
+VARIABLE_CV = 0.20
+MIN_YIELD_YEARS = 3
+
+# Population bounds (seeds/acre) and planter rounding step
+POPULATION_LIMITS = {"corn": (24000, 38000), "soybean": (90000, 160000)}
+POPULATION_STEP = {"corn": 100, "soybean": 500}
+
+# TWI (wet, dry) penalty slopes outside the 0.4-0.6 normalized optimum
+TWI_PENALTY = {"corn": (0.3, 0.15), "soybean": (0.25, 0.2)}
+
+NCCPI_KEYS = {"corn": "nccpi3corn", "soybean": "nccpi3soy"}
+
+
+class FieldGrid(NamedTuple):
+    """A field's 10 m grid: UTM CRS, affine transform, shape, and boundary mask."""
+    crs: CRS
+    transform: rasterio.Affine
+    shape: tuple[int, int]
+    mask: np.ndarray
+    
+    @property
+    def cell_acres(self) -> float:
+        return abs(self.transform.a * self.transform.e) / SQ_M_PER_ACRE
+    
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        height, width = self.shape
+        west, north = self.transform.c, self.transform.f
+        return west, north + height * self.transform.e, west + width * self.transform.a, north
+
+
+class RasterSource(NamedTuple):
+    """A single-band array with its georeferencing, ready to align to a grid."""
+    data: np.ndarray
+    transform: rasterio.Affine
+    crs: CRS
+    nodata: Optional[float] = None
+    
+    @classmethod
+    def read(cls, path, band: int = 1) -> "RasterSource":
+        with rasterio.open(path) as src:
+            return cls(src.read(band), src.transform, src.crs, src.nodata)
+
+
+def utm_crs(lon: float, lat: float) -> CRS:
+    """WGS84 UTM zone containing a point."""
+    zone = int((lon + 180) // 6) + 1
+    return CRS.from_epsg((32600 if lat >= 0 else 32700) + zone)
+
+
+def field_grid(boundary: dict, resolution: float = RESOLUTION_M) -> FieldGrid:
+    """Grid snapped to resolution over a WGS84 GeoJSON boundary, with its inside mask."""
+    geometry = boundary.get("geometry", boundary) if boundary.get("type") == "Feature" else boundary
+    lat, lon = boundary_centroid(geometry)
+    crs = utm_crs(lon, lat)
+    projected = transform_geom("EPSG:4326", crs, geometry)
+    
+    coords = np.array([c for ring in _rings(projected) for c in ring], dtype=float)
+    west = np.floor(coords[:, 0].min() / resolution) * resolution
+    south = np.floor(coords[:, 1].min() / resolution) * resolution
+    east = np.ceil(coords[:, 0].max() / resolution) * resolution
+    north = np.ceil(coords[:, 1].max() / resolution) * resolution
+    shape = (max(int(round((north - south) / resolution)), 1), max(int(round((east - west) / resolution)), 1))
+    transform = from_origin(west, north, resolution, resolution)
+    mask = geometry_mask([projected], out_shape=shape, transform=transform, invert=True)
+    return FieldGrid(crs, transform, shape, mask)
+
+
+def _rings(geometry: dict) -> list:
+    if geometry["type"] == "Polygon":
+        return geometry["coordinates"]
+    return [ring for polygon in geometry["coordinates"] for ring in polygon]
+
+
+def align(source: RasterSource, grid: FieldGrid,
+          resampling: Resampling = Resampling.bilinear) -> np.ndarray:
+    """Reproject a layer onto the grid; NaN outside the boundary and where the source has no data."""
+    out = np.full(grid.shape, np.nan, dtype=np.float32)
+    data, transform = _clip(source, grid)
+    if data.size == 0:
+        return out
+    data = data.astype(np.float32)
+    if source.nodata is not None and not np.isnan(source.nodata):
+        data = np.where(data == source.nodata, np.nan, data)
+    reproject(
+        data, out,
+        src_transform=transform, src_crs=source.crs, src_nodata=np.nan,
+        dst_transform=grid.transform, dst_crs=grid.crs, dst_nodata=np.nan,
+        resampling=resampling,
+    )
+    out[~grid.mask] = np.nan
+    return out
+
+
+def _clip(source: RasterSource, grid: FieldGrid, pad: int = 2) -> tuple[np.ndarray, rasterio.Affine]:
+    """The part of a (possibly regional) source covering the grid, so reproject never warps the rest."""
+    west, south, east, north = transform_bounds(grid.crs, source.crs, *grid.bounds)
+    window = from_bounds(west, south, east, north, source.transform)
+    height, width = source.data.shape
+    row0 = max(int(np.floor(min(window.row_off, window.row_off + window.height))) - pad, 0)
+    col0 = max(int(np.floor(min(window.col_off, window.col_off + window.width))) - pad, 0)
+    row1 = min(int(np.ceil(max(window.row_off, window.row_off + window.height))) + pad, height)
+    col1 = min(int(np.ceil(max(window.col_off, window.col_off + window.width))) + pad, width)
+    if row1 <= row0 or col1 <= col0:
+        return source.data[:0, :0], source.transform
+    window = Window(col0, row0, col1 - col0, row1 - row0)
+    return source.data[row0:row1, col0:col1], window_transform(window, source.transform)
+
+
+def normalize_0_1(values: np.ndarray) -> np.ndarray:
+    """Min-max scale ignoring NaN; a flat layer becomes 0.5."""
+    if np.isnan(values).all():
+        return values.copy()
+    low, high = np.nanmin(values), np.nanmax(values)
+    if high - low <= 0:
+        return np.where(np.isnan(values), np.nan, 0.5).astype(values.dtype)
+    return (values - low) / (high - low)
+
+
+class YieldLayer(NamedTuple):
+    """Multi-year yield statistics on the grid (section 1.2); stability is NO_STABILITY without data."""
+    mean_yield: np.ndarray
+    yield_std: np.ndarray
+    yield_cv: np.ndarray
+    relative_yield: np.ndarray
+    stability: np.ndarray
+    years: list[int]
+    field_avg_yield: float
+
+
+def yield_layer(yields: dict[int, np.ndarray], min_years: int = MIN_YIELD_YEARS) -> YieldLayer:
+    """
+    Per-cell mean, spread and stability class from aligned yearly yield rasters.
+    
+    Cells with fewer than min_years of data are NaN.
+    """
+    years = sorted(yields)
+    stack = np.stack([yields[y] for y in years]).astype(np.float32)
+    enough = (~np.isnan(stack)).sum(axis=0) >= min(min_years, len(years))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_yield = np.where(enough, np.nanmean(stack, axis=0), np.nan)
+        yield_std = np.where(enough, np.nanstd(stack, axis=0), np.nan)
+        field_avg = float(np.nanmean(mean_yield))
+    yield_cv = yield_std / np.where(mean_yield > 0, mean_yield, 1)
+    relative_yield = mean_yield / field_avg
+    
+    stability = np.select(
+        [np.isnan(yield_cv), yield_cv < STABLE_CV, yield_cv > VARIABLE_CV],
+        [NO_STABILITY, np.where(relative_yield > 1.0, STABLE_HIGH, STABLE_LOW), VARIABLE],
+        MODERATE,
+    ).astype(np.int8)
+    return YieldLayer(mean_yield, yield_std, yield_cv, relative_yield, stability, years, field_avg)
+
+
+class Forecast(NamedTuple):
+    """
+    Long-range forecast inputs (section 1.5).
+    
+    Probabilities may be scalars or rasters aligned to the grid.
+    """
+    precip_outlook: str = "normal"
+    drought_probability: Union[float, np.ndarray] = 0.0
+    excess_moisture_prob: Union[float, np.ndarray] = 0.0
+
+
+def twi_modifier(twi: np.ndarray, crop: str) -> np.ndarray:
+    """Productivity multiplier penalizing wet and dry TWI extremes, 0.7-1.0."""
+    twi = normalize_0_1(twi)
+    wet, dry = TWI_PENALTY[crop]
+    penalty = np.where(twi > 0.6, (twi - 0.6) * wet, 0.0) + np.where(twi < 0.4, (0.4 - twi) * dry, 0.0)
+    return np.clip(1.0 - penalty, 0.7, 1.0)
+
+
+def forecast_adjustment(forecast: Forecast, twi: np.ndarray) -> np.ndarray:
+    """
+    Season outlook x landscape position multiplier, 0.85-1.10.
+    
+    A dry outlook penalizes low-TWI (droughty) cells; a wet one penalizes
+    high-TWI cells.
+    """
+    twi = normalize_0_1(twi)
+    drought = np.broadcast_to(forecast.drought_probability, twi.shape)
+    excess = np.broadcast_to(forecast.excess_moisture_prob, twi.shape)
+    dry = (forecast.precip_outlook == "below_normal") | (drought > 0.4)
+    wet = ~dry & ((forecast.precip_outlook == "above_normal") | (excess > 0.4))
+    adjustment = 1.0 - np.where(dry, (1 - twi) * drought * 0.15, 0.0) - np.where(wet, twi * excess * 0.12, 0.0)
+    return np.clip(adjustment, 0.85, 1.10)
+
+
+def productivity_raster(base: np.ndarray, twi: Optional[np.ndarray], crop: str,
+                        forecast: Optional[Forecast] = None) -> np.ndarray:
+    """
+    0-1 productivity from a base layer with TWI and forecast modifiers (sections 1.6, 2).
+    
+    base is relative yield from yield_layer, or NCCPI when there is no
+    yield history. Cells where TWI is missing keep the base value.
+    """
+    productivity = normalize_0_1(np.asarray(base, dtype=np.float32))
+    if twi is not None:
+        productivity = productivity * np.where(np.isnan(twi), 1.0, twi_modifier(twi, crop))
+        if forecast is not None:
+            productivity = productivity * np.where(np.isnan(twi), 1.0, forecast_adjustment(forecast, twi))
+    return normalize_0_1(productivity)
+
+
+def curve_population(productivity: np.ndarray, field_avg_yield: float,
+                     curve: Sequence[float] = POPULATION_CURVE, crop: str = "corn") -> np.ndarray:
+    """
+    Population from each cell's yield potential through a cubic curve (section 3.1).
+    
+    Productivity 0 is 70% of the field average yield, 1 is 130%.
+    """
+    x3, x2, x1, b = (float(c) for c in curve)
+    # float64 whatever the raster dtype, so rounding to the planter step is stable
+    cell_yield = field_avg_yield * (0.7 + np.asarray(productivity, dtype=float) * 0.6)
+    population = ((x3 * cell_yield + x2) * cell_yield + x1) * cell_yield + b
+    return _finish(population, crop)
+
+
+def linear_population(productivity: np.ndarray, base_population: float, spread: float,
+                      crop: str) -> np.ndarray:
+    """base_population at productivity 0.5, +/- spread at 1 and 0 (section 3.2)."""
+    return _finish(base_population + (np.asarray(productivity, dtype=float) - 0.5) * 2 * spread, crop)
+
+
+def stability_adjustment(population: np.ndarray, layer: YieldLayer) -> np.ndarray:
+    """+5% on stable-high cells, up to -10% on variable ones by CV (section 1.3)."""
+    cv_penalty = np.clip((np.nan_to_num(layer.yield_cv) - 0.15) * 0.5, 0, 0.10)
+    factor = np.where(layer.stability == STABLE_HIGH, 1.05,
+                      np.where(layer.stability == VARIABLE, 1.0 - cv_penalty, 1.0))
+    return population * factor
+
+
+def drought_reduction(population: np.ndarray, forecast: Forecast) -> np.ndarray:
+    """Field-wide 3-8% cut when drought probability exceeds 0.5 (section 1.5)."""
+    drought = np.broadcast_to(forecast.drought_probability, population.shape)
+    return population * np.where(drought > 0.5, 1.0 - (0.03 + (drought - 0.5) * 0.1), 1.0)
+
+
+def _finish(population: np.ndarray, crop: str) -> np.ndarray:
+    """Clip to crop limits and round to the planter step, keeping NaN."""
+    low, high = POPULATION_LIMITS[crop]
+    step = POPULATION_STEP[crop]
+    return np.round(np.clip(population, low, high) / step) * step
+
+
+class Prescription(NamedTuple):
+    """A field's productivity and population rasters with summary stats."""
+    field_id: str
+    crop: str
+    product: Optional[str]
+    grid: FieldGrid
+    productivity: np.ndarray
+    population: np.ndarray
+    acres: float
+    total_seeds: float
+    avg_population: float
+    min_population: int
+    max_population: int
+    population_std: float
+    layers_used: list[str]
+    
+    def write_geotiff(self, path) -> None:
+        """Population raster as a tiled GeoTIFF, POPULATION_NODATA outside the field."""
+        height, width = self.grid.shape
+        with rasterio.open(
+            path, "w", driver="GTiff", height=height, width=width, count=1, dtype="int32",
+            crs=self.grid.crs, transform=self.grid.transform, nodata=POPULATION_NODATA,
+            tiled=True, compress="deflate",
+        ) as dst:
+            dst.write(self.population, 1)
+
+
+def build_prescription(field_id: str, boundary: dict, crop: str,
+                       yields: Optional[dict[int, RasterSource]] = None,
+                       twi: Optional[RasterSource] = None,
+                       nccpi: Optional[RasterSource] = None,
+                       forecast: Optional[Forecast] = None,
+                       base_population: Optional[float] = None,
+                       population_spread: Optional[float] = None,
+                       curve: Optional[Sequence[float]] = None,
+                       product: Optional[str] = None,
+                       resolution: float = RESOLUTION_M) -> Prescription:
+    """
+    Productivity and population rasters for one field.
+    
+    Yield history drives productivity when given, NCCPI otherwise (one of
+    them is required). Corn with yield history uses the population curve
+    (curve, default POPULATION_CURVE); otherwise base_population +/-
+    population_spread is mapped linearly.
+    """
+    grid = field_grid(boundary, resolution)
+    layers_used = []
+    layer = None
+    if yields:
+        layer = yield_layer({year: align(source, grid) for year, source in yields.items()})
+        base = layer.relative_yield
+        layers_used.append("yield_history")
+    elif nccpi is not None:
+        base = align(nccpi, grid)
+        layers_used.append(NCCPI_KEYS[crop])
+    else:
+        raise ValueError("A prescription needs yield history or an NCCPI layer")
+    
+    twi_grid = None
+    if twi is not None:
+        twi_grid = align(twi, grid)
+        layers_used.append("twi")
+    if forecast is not None and twi_grid is not None:
+        layers_used.append("forecast")
+    productivity = productivity_raster(base, twi_grid, crop, forecast)
+    
+    if crop == "corn" and layer is not None and (curve is not None or base_population is None):
+        curve = POPULATION_CURVE if curve is None else curve
+        population = curve_population(productivity, layer.field_avg_yield, curve, crop)
+    else:
+        if base_population is None:
+            raise ValueError("base_population is required without a corn yield curve")
+        low, high = POPULATION_LIMITS[crop]
+        spread = population_spread if population_spread is not None else (high - low) / 4
+        population = linear_population(productivity, base_population, spread, crop)
+    if layer is not None:
+        population = _finish(stability_adjustment(population, layer), crop)
+    if forecast is not None:
+        population = _finish(drought_reduction(population, forecast), crop)
+    
+    valid = ~np.isnan(population)
+    seeds = np.where(valid, population, POPULATION_NODATA).astype(np.int32)
+    values = population[valid]
+    acres = float(valid.sum() * grid.cell_acres)
+    return Prescription(
+        field_id=field_id,
+        crop=crop,
+        product=product,
+        grid=grid,
+        productivity=productivity,
+        population=seeds,
+        acres=acres,
+        total_seeds=float(values.sum() * grid.cell_acres),
+        avg_population=float(values.mean()) if values.size else 0.0,
+        min_population=int(values.min()) if values.size else 0,
+        max_population=int(values.max()) if values.size else 0,
+        population_std=float(values.std()) if values.size else 0.0,
+        layers_used=layers_used,
+    )
@@ -0,0 +1,122 @@
+"""
+Weather-year risk scoring - score the catalog against every historical season.
+
+Requirements are derived once per (field, year) from that year's GDD,
+precipitation and heat days, deduplicated, and scored in one batch; the
+per-year composites are then reduced to a mean, a low percentile and the
+probability that each product fails to reach maturity.
+"""
+from typing import Mapping, NamedTuple, Optional, Sequence
+import warnings
+import numpy as np
+from ..models.products import ProductCatalog
+from ..models.fields import FieldFeatures
+from ..models.management import ManagementInputs
+from .scoring import ScoringEngine
+from .feature_extraction import FeatureExtractor
+from .requirements import (feature_columns, derive_requirement_columns, distinct_requirement_rows,
+                           requirements_from_columns)
+
+# Per-year metrics (PRISMSampler.sample / yearly_metrics names) and the
+# feature column each replaces; precip_cv and the rest stay climatological
+YEARLY_COLUMNS = {
+    "gdd": "gdd_mean",
+    "ppt_gs": "growing_season_precip_mm",
+    "heat_days": "heat_stress_days",
+}
+
+
+def nan_percentile(values: np.ndarray, q: float) -> np.ndarray:
+    """
+    np.nanpercentile over axis 1 (linear interpolation), fully vectorized.
+    
+    NumPy's version loops over every other index in Python; here one sort
+    pushes NaNs to the end and each row's valid count sets its position.
+    """
+    ordered = np.sort(values, axis=1)
+    count = (~np.isnan(values)).sum(axis=1, keepdims=True)
+    position = np.maximum(count - 1, 0) * (q / 100.0)
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, np.maximum(count - 1, 0))
+    low = np.take_along_axis(ordered, lower, axis=1)[:, 0]
+    high = np.take_along_axis(ordered, upper, axis=1)[:, 0]
+    result = low + (high - low) * (position - lower)[:, 0]
+    return np.where(count[:, 0] > 0, result, np.nan)
+
+
+class WeatherYearRisk(NamedTuple):
+    """
+    Per-product weather risk for a batch of fields.
+    
+    years holds the year index behind each row of yearly (resampled when
+    samples was set). mean, low and maturity_failure are (field, product);
+    yearly is the (field, year, product) composite, NaN for years with no
+    GDD data.
+    """
+    years: np.ndarray
+    products: list[str]
+    yearly: np.ndarray
+    mean: np.ndarray
+    low: np.ndarray
+    maturity_failure: np.ndarray
+    requirement_rows: int
+
+
+def weather_year_risk(extractor: FeatureExtractor, engine: ScoringEngine, catalog: ProductCatalog,
+                      features: Sequence[FieldFeatures], managements: Sequence[ManagementInputs],
+                      yearly: Mapping[str, np.ndarray], crop: Optional[str] = None,
+                      samples: Optional[int] = None, seed: int = 0,
+                      percentile: float = 10.0) -> WeatherYearRisk:
+    """
+    Score every field against each of its historical weather years.
+    
+    yearly maps YEARLY_COLUMNS keys to (field, year) arrays, as returned by
+    PRISMSampler.sample; "gdd" is required. By default every year is used;
+    with samples, that many years are drawn with replacement (the same
+    draws for every field, keeping fields' years aligned). A product fails
+    a year when the season's GDD falls short of what its maturity needs.
+    """
+    crop = crop or catalog.crop
+    gdd = np.asarray(yearly["gdd"], dtype=float)
+    n_fields, n_years = gdd.shape
+    years = np.arange(n_years) if samples is None else \
+        np.random.default_rng(seed).integers(0, n_years, samples)
+    Y = len(years)
+    
+    # One row per (field, year), field-major
+    columns = {name: np.repeat(values, Y, axis=0) for name, values in feature_columns(features, managements).items()}
+    for key, name in YEARLY_COLUMNS.items():
+        if key in yearly:
+            columns[name] = np.asarray(yearly[key], dtype=float)[:, years].reshape(-1)
+    derived = derive_requirement_columns(extractor, columns, crop)
+    histories = columns["scn_source_history"]
+    
+    first, index = distinct_requirement_rows(derived, histories)
+    distinct = requirements_from_columns(
+        {name: values[first] for name, values in derived.items()}, [histories[i] for i in first]
+    )
+    composite = engine.score_matrix(catalog, distinct, crop)["composite"][index]
+    composite = composite.reshape(n_fields, Y, len(catalog))
+    
+    season_gdd = gdd[:, years]
+    valid = ~np.isnan(season_gdd)[:, :, None]
+    composite = np.where(valid, composite, np.nan)
+    required = extractor.maturity_lookups[crop].required_gdd_array(catalog.maturity)
+    failed = np.where(valid, season_gdd[:, :, None] < required[None, None, :], np.nan)
+    
+    # Fields with no usable years come back NaN rather than warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(composite, axis=1)
+        maturity_failure = np.nanmean(failed, axis=1)
+    low = nan_percentile(composite, percentile)
+    
+    return WeatherYearRisk(
+        years=years,
+        products=list(catalog.names),
+        yearly=composite,
+        mean=mean,
+        low=low,
+        maturity_failure=maturity_failure,
+        requirement_rows=len(distinct),
+    )
@@ -0,0 +1,35 @@
+"""Shared fixtures: the reference-backed extractor and hand-written catalogs per crop."""
+import pytest
+from backend.app.models.products import ProductCatalog
+from backend.app.services import FeatureExtractor, ScoringEngine
+from .helpers import PRODUCTS, REQUIREMENTS
+
+
+@pytest.fixture(scope="session")
+def extractor() -> FeatureExtractor:
+    return FeatureExtractor()
+
+
+@pytest.fixture
+def engine() -> ScoringEngine:
+    return ScoringEngine()
+
+
+@pytest.fixture(params=["corn", "soybean"])
+def crop(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def products(crop):
+    return PRODUCTS[crop]
+
+
+@pytest.fixture
+def catalog(crop, products) -> ProductCatalog:
+    return ProductCatalog.from_products(products, crop)
+
+
+@pytest.fixture
+def requirements(crop):
+    return REQUIREMENTS[crop]()
@@ -0,0 +1,148 @@
+"""Hand-written products, field requirements and synthetic inputs shared by the tests."""
+import random
+from typing import Optional
+import numpy as np
+from backend.app.models.products import CornHybrid, SoybeanVariety
+from backend.app.models.fields import FieldFeatures, FieldRequirements, SoilFeatures, WeatherFeatures
+from backend.app.models.management import ManagementInputs, TillageSystem
+
+
+def corn_hybrid(name: str, rm: float, yield_potential: int = 7, **ratings) -> CornHybrid:
+    return CornHybrid(brand=ratings.pop("brand", "A"), hybrid_name=name, relative_maturity=rm,
+                      yield_potential=yield_potential, **ratings)
+
+
+def soybean_variety(name: str, mg: float, yield_potential: int = 7, **ratings) -> SoybeanVariety:
+    return SoybeanVariety(brand=ratings.pop("brand", "A"), variety_name=name, maturity_group=mg,
+                          yield_potential=yield_potential, **ratings)
+
+
+# Missing ratings, 1/9 extremes, maturities inside, on the edges of and
+# outside the target windows below
+CORN_PRODUCTS = [
+    corn_hybrid("H95", 95, 5, drought_tolerance=3, emergence_vigor=9, gray_leaf_spot=2, test_weight=6,
+                bt_traits=["VT2P"], herbicide_traits=["RR"]),
+    corn_hybrid("H102", 102, 8, drought_tolerance=None, emergence_vigor=None, gray_leaf_spot=None,
+                northern_leaf_blight=7, drydown=8, stalk_strength=6, ear_type="Flex",
+                bt_traits=["SmartStax"], herbicide_traits=["RR", "LL"]),
+    corn_hybrid("H105", 105, 9, drought_tolerance=9, emergence_vigor=1, gray_leaf_spot=9, northern_leaf_blight=1,
+                tar_spot=5, gosss_wilt=9, drydown=3, stalk_strength=9, root_strength=2, test_weight=9,
+                brand="B", ear_type="Fixed", bt_traits=["Qrome", "AM"], herbicide_traits=["RR", "LL", "Enlist"]),
+    corn_hybrid("H108", 108, 6, drought_tolerance=6, gray_leaf_spot=5, tar_spot=None, gosss_wilt=4, drydown=None,
+                brand="B", bt_traits=["AM"]),
+    corn_hybrid("H110", 110, 7, drought_tolerance=7, emergence_vigor=6, gray_leaf_spot=6, northern_leaf_blight=6,
+                tar_spot=6, gosss_wilt=6, drydown=6, stalk_strength=6, root_strength=6, test_weight=6,
+                brand="C", ear_type="Semi-flex", bt_traits=["VT2P"], herbicide_traits=["RR"]),
+    corn_hybrid("H113", 113, 3, drought_tolerance=1, emergence_vigor=5, northern_leaf_blight=9, tar_spot=1,
+                root_strength=9, brand="C", herbicide_traits=["Enlist"]),
+    corn_hybrid("H118", 118, 8, drought_tolerance=8, gray_leaf_spot=8, drydown=9, test_weight=None,
+                bt_traits=["SmartStax"], herbicide_traits=["LL"]),
+]
+
+SOYBEAN_PRODUCTS = [
+    soybean_variety("V10", 1.0, 6, drought_tolerance=4, sds_rating=3, scn_source="PI 88788", white_mold=7,
+                    herbicide_traits=["XtendFlex"]),
+    soybean_variety("V25", 2.5, 8, drought_tolerance=None, sds_rating=None, scn_source="Peking",
+                    phytophthora_field=8, lodging_resistance=7, idc_tolerance=6, herbicide_traits=["Enlist E3"]),
+    soybean_variety("V28", 2.8, 9, drought_tolerance=9, emergence_vigor=1, sds_rating=9, scn_source=None,
+                    phytophthora_field=1, white_mold=9, frogeye_leaf_spot=5, lodging_resistance=None,
+                    idc_tolerance=9, brand="B", herbicide_traits=["RR2X"]),
+    soybean_variety("V30", 3.0, 7, drought_tolerance=7, emergence_vigor=7, sds_rating=7, scn_source="None",
+                    white_mold=None, frogeye_leaf_spot=8, lodging_resistance=9, brand="B",
+                    herbicide_traits=["XtendFlex", "LL"]),
+    soybean_variety("V33", 3.3, 5, drought_tolerance=2, sds_rating=5, scn_source="Other", phytophthora_field=5,
+                    idc_tolerance=None, lodging_resistance=3),
+    soybean_variety("V36", 3.6, 4, drought_tolerance=5, emergence_vigor=9, scn_source="Hartwig", frogeye_leaf_spot=2,
+                    idc_tolerance=1, brand="C", herbicide_traits=["LL"]),
+]
+
+
+def corn_requirements() -> list[FieldRequirements]:
+    """Risks on, just under and just over the scorer's 0.1 / 0.2 / 0.3 / 0.7 thresholds."""
+    return [
+        FieldRequirements(target_maturity_range=(102, 105, 107), drought_risk=0.2, emergence_challenge=0.3,
+                          gls_risk=0.1, nclb_risk=0.3, tar_spot_risk=0.7, gosss_wilt_risk=0.0,
+                          standability_need=0.3, late_harvest_risk=0.3),
+        FieldRequirements(target_maturity_range=(110, 113, 115), drought_risk=0.9, emergence_challenge=0.8,
+                          gls_risk=0.75, nclb_risk=0.5, tar_spot_risk=0.29, gosss_wilt_risk=0.31,
+                          standability_need=0.6, late_harvest_risk=0.9, yield_environment="high"),
+        FieldRequirements(target_maturity_range=(95, 98, 100), drought_risk=0.0, emergence_challenge=0.0,
+                          yield_environment="low"),
+        FieldRequirements(target_maturity_range=(105, 108, 110), drought_risk=0.5, emergence_challenge=0.5,
+                          gls_risk=0.5, nclb_risk=0.5, tar_spot_risk=0.5, gosss_wilt_risk=0.5,
+                          standability_need=0.5, late_harvest_risk=0.5),
+        FieldRequirements(target_maturity_range=(105, 110, 115), drought_risk=1.0, emergence_challenge=0.31,
+                          gls_risk=1.0, nclb_risk=0.69, tar_spot_risk=0.71, gosss_wilt_risk=0.11,
+                          standability_need=0.31, late_harvest_risk=0.31),
+    ]
+
+
+def soybean_requirements() -> list[FieldRequirements]:
+    """Soybean counterparts, including SCN source histories and IDC."""
+    return [
+        FieldRequirements(target_maturity_range=(2.0, 2.5, 2.8), drought_risk=0.2, emergence_challenge=0.3,
+                          sds_risk=0.1, scn_risk=0.3, phytophthora_risk=0.3, white_mold_risk=0.7,
+                          idc_risk=0.3, frogeye_risk=0.2, lodging_risk=0.3),
+        FieldRequirements(target_maturity_range=(2.5, 3.0, 3.3), drought_risk=0.8, emergence_challenge=0.6,
+                          sds_risk=0.6, scn_risk=0.9, phytophthora_risk=0.75, white_mold_risk=0.2,
+                          idc_risk=0.6, frogeye_risk=0.5, lodging_risk=0.5,
+                          scn_source_history=["PI 88788", "PI 88788", "Peking"]),
+        FieldRequirements(target_maturity_range=(0.5, 1.0, 1.3), drought_risk=0.0, emergence_challenge=0.0,
+                          scn_source_history=["Peking"]),
+        FieldRequirements(target_maturity_range=(3.0, 3.5, 3.8), drought_risk=0.5, emergence_challenge=0.5,
+                          sds_risk=0.5, scn_risk=0.31, phytophthora_risk=0.5, white_mold_risk=0.5,
+                          idc_risk=0.31, frogeye_risk=0.11, lodging_risk=0.31,
+                          scn_source_history=["Other", "PI 88788"]),
+    ]
+
+
+PRODUCTS = {"corn": CORN_PRODUCTS, "soybean": SOYBEAN_PRODUCTS}
+REQUIREMENTS = {"corn": corn_requirements, "soybean": soybean_requirements}
+
+
+def daily_normals(n_fields: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """(day, field) daily max/min temperature normals (°F) with a sinusoidal season."""
+    rng = np.random.default_rng(seed)
+    day = np.arange(365)[:, None]
+    mean, amplitude = rng.uniform(45, 55, n_fields), rng.uniform(20, 30, n_fields)
+    tmax = mean + 10 + amplitude * np.sin((day - 105) / 365 * 2 * np.pi)
+    return tmax, tmax - 20
+
+
+def field_batch(states: list[str], n: int, seed: int = 0) -> tuple[list[FieldFeatures], list[ManagementInputs]]:
+    """
+    Seeded fields covering every derivation branch, for batch-vs-per-field parity.
+    
+    Soil and weather values are missing or zero some of the time to
+    exercise the per-field path's truthiness checks.
+    """
+    rng = random.Random(seed)
+    
+    def maybe(f) -> Optional[float]:
+        return None if rng.random() < 0.15 else (0 if rng.random() < 0.05 else f())
+    
+    features, managements = [], []
+    for _ in range(n):
+        soil = SoilFeatures(
+            sand_pct=maybe(lambda: rng.uniform(5, 80)), clay_pct=maybe(lambda: rng.uniform(5, 50)),
+            om_pct=maybe(lambda: rng.uniform(0.5, 6)), ph=maybe(lambda: rng.uniform(5, 8.5)),
+            aws_0_100=maybe(lambda: rng.choice([15, 25, rng.uniform(5, 35)])),
+            slope_pct=maybe(lambda: rng.uniform(0, 10)),
+            drainage_class=rng.choice([None, "Poorly drained", "Very poorly drained", "Well drained"]),
+        )
+        weather = WeatherFeatures(
+            gdd_mean=maybe(lambda: rng.choice([2500.0, rng.uniform(2000, 3400)])),
+            growing_season_precip_mm=maybe(lambda: rng.uniform(300, 800)),
+            precip_cv=maybe(lambda: rng.uniform(0.1, 0.5)), heat_stress_days=maybe(lambda: rng.uniform(0, 15)),
+        )
+        features.append(FieldFeatures(soil=soil, weather=weather, state=rng.choice(states)))
+        managements.append(ManagementInputs(
+            previous_crop=rng.choice(["corn", "soybean", "wheat"]), tillage=rng.choice(list(TillageSystem)),
+            irrigation=rng.choice(["none", "pivot", "drip", "flood"]), row_spacing=rng.choice([7, 15, 20, 30, 36]),
+            crop_2_years_ago=rng.choice([None, "wheat", "corn"]),
+            seed_treatment=rng.choice(["none", "basic", "premium"]),
+            fungicide_program=rng.choice(["none", "as_needed", "routine"]),
+            soy_frequency_5yr=rng.choice([None, 0, 1, 3, 5]),
+            scn_source_history=rng.choice([[], ["PI 88788"], ["PI 88788", "Peking"]]),
+        ))
+    return features, managements
@@ -0,0 +1,91 @@
+"""Process-pool batch runner: input order, failing fields and the bounded number of chunks in flight."""
+import pytest
+from backend.app.models.fields import Field
+from backend.app.models.management import ManagementInputs
+from backend.app.models.products import ProductCatalog
+from backend.app.services.batch import BatchScoringRunner, chunked
+from .helpers import CORN_PRODUCTS, corn_requirements
+
+MANAGEMENT = ManagementInputs(previous_crop="soybean")
+
+
+@pytest.fixture
+def catalog() -> ProductCatalog:
+    return ProductCatalog.from_products(CORN_PRODUCTS, "corn")
+
+
+def _field(i: int, **overrides) -> Field:
+    requirements = corn_requirements()
+    values = dict(id=f"F{i}", name=f"Field {i}", acres=40, state="IA", requirements=requirements[i % len(requirements)])
+    values.update(overrides)
+    return Field(**values)
+
+
+def _jobs(n: int, bad: tuple[int, ...] = ()):
+    for i in range(n):
+        if i in bad:
+            # No features or requirements, and a boundary with nothing to extract from
+            yield _field(i, requirements=None, boundary={"type": "Polygon", "coordinates": []}), MANAGEMENT
+        else:
+            yield _field(i), MANAGEMENT
+
+
+class _Counted:
+    """Iterator wrapper recording how many items have been pulled."""
+    
+    def __init__(self, items):
+        self.items, self.pulled = iter(items), 0
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        item = next(self.items)
+        self.pulled += 1
+        return item
+
+
+def test_chunked():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_parallel_results_match_serial_in_input_order(catalog):
+    serial = list(BatchScoringRunner(catalog, workers=1).run(_jobs(23)))
+    parallel = list(BatchScoringRunner(catalog, workers=3, chunk_size=2, max_pending=2).run(_jobs(23)))
+    assert [r.field_id for r in parallel] == [f"F{i}" for i in range(23)]
+    assert all(r.recommendations for r in serial)
+    assert [r.model_dump() for r in parallel] == [r.model_dump() for r in serial]
+    
+    fields = [_field(i) for i in range(4)]
+    override = ManagementInputs(previous_crop="corn", tillage="no-till")
+    farm = BatchScoringRunner(catalog, workers=1).run_farm(fields, MANAGEMENT, {"F2": override})
+    expected = BatchScoringRunner(catalog, workers=1).run(
+        (f, override if f.id == "F2" else MANAGEMENT) for f in fields
+    )
+    assert [r.model_dump() for r in farm] == [r.model_dump() for r in expected]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failing_field_raises_after_earlier_results(catalog, workers):
+    results, stream = [], BatchScoringRunner(catalog, workers=workers, chunk_size=3).run(_jobs(12, bad=(7,)))
+    with pytest.raises(ValueError, match="no coordinates"):
+        for result in stream:
+            results.append(result.field_id)
+    # Serially every earlier field is yielded; in parallel the failing field's whole chunk is lost
+    expected = 7 if workers == 1 else 6
+    assert results == [f"F{i}" for i in range(expected)]
+
+
+def test_input_is_pulled_at_most_max_pending_chunks_ahead(catalog):
+    chunk_size, max_pending = 2, 3
+    jobs = _Counted(_jobs(40))
+    runner = BatchScoringRunner(catalog, workers=2, chunk_size=chunk_size, max_pending=max_pending)
+    ahead = []
+    for consumed, _ in enumerate(runner.run(jobs), start=1):
+        ahead.append(jobs.pulled - consumed)
+    assert consumed == jobs.pulled == 40
+    # Nothing is yielded until max_pending chunks are submitted, and the
+    # lead never grows past that while the input lasts
+    assert ahead[0] == chunk_size * max_pending - 1
+    assert max(ahead) <= chunk_size * max_pending - 1
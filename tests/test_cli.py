@@ -0,0 +1,32 @@
+"""Batch CLI output writers."""
+import pyarrow.parquet as pq
+import pytest
+from backend.app.cli import CSV_COLUMNS, write_rows
+
+
+def _row(i, **overrides):
+    row = {"field": f"F{i}", "crop": "corn", "rank": 1, "brand": "A", "product": "A H1",
+           "maturity": 105, "score": 80, "placement": "Best fit", "population": 32000}
+    row.update(overrides)
+    return row
+
+
+def test_parquet_batches_share_one_schema(tmp_path):
+    # First batch has integer maturity/score; later ones have floats and all-None columns
+    rows = ([_row(i) for i in range(3)] +
+            [_row(i, maturity=104.5, score=77.25, population=None, brand=None) for i in range(3, 6)] +
+            [_row(6, placement=None)])
+    output = tmp_path / "out.parquet"
+    assert write_rows(iter(rows), output, batch_size=3) == len(rows)
+    
+    table = pq.read_table(output)
+    assert table.column_names == CSV_COLUMNS
+    assert table.num_rows == len(rows)
+    assert table.column("maturity").to_pylist()[3] == pytest.approx(104.5)
+    assert table.column("population").null_count == 3
+
+
+def test_empty_parquet_has_schema(tmp_path):
+    output = tmp_path / "empty.parquet"
+    assert write_rows(iter([]), output) == 0
+    assert pq.read_table(output).column_names == CSV_COLUMNS
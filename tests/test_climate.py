@@ -0,0 +1,74 @@
+"""Daily climate reductions on small hand-computed cases."""
+import numpy as np
+from backend.app.services.climate import (JUL_1, MAY_1, accumulated_gdd, daily_gdd, frost_days, heat_stress_days,
+                                          summarize_years, yearly_metrics, yearly_metrics_chunked)
+
+
+def test_daily_gdd_clips_both_temperatures():
+    tmax = np.array([40.0, 70.0, 95.0, 100.0, 86.0])
+    tmin = np.array([30.0, 40.0, 60.0, 90.0, 50.0])
+    # (50+50)/2, (70+50)/2, (86+60)/2, (86+86)/2, (86+50)/2, each less 50
+    np.testing.assert_array_equal(daily_gdd(tmax, tmin), [0.0, 10.0, 23.0, 36.0, 18.0])
+
+
+def test_accumulated_gdd_per_cell_windows():
+    # One year, 6 days, 3 cells; cell c gains c + 1 GDD a day, plus the day index
+    gdd = (np.arange(6)[:, None] + np.arange(1, 4)[None, :]).astype(float)[None]
+    start = np.array([0, 2, 5])
+    end = np.array([6, 4, 5])
+    # cell 0: 1+2+3+4+5+6; cell 1: days 2-3 -> 4+5; cell 2: empty window
+    np.testing.assert_array_equal(accumulated_gdd(gdd, start, end), [[21.0, 9.0, 0.0]])
+    np.testing.assert_array_equal(accumulated_gdd(gdd, 1, 3), [[5.0, 7.0, 9.0]])
+
+
+def test_frost_days_with_and_without_frost():
+    tmin = np.full((2, 365, 2), 50.0)
+    tmin[0, [30, 100], 0] = 32.0   # last spring frost on day 100
+    tmin[0, [280, 300], 0] = 20.0  # first fall frost on day 280
+    tmin[0, JUL_1, 1] = 31.0       # midsummer counts as fall
+    last, first = frost_days(tmin)
+    np.testing.assert_array_equal(last, [[100.0, np.nan], [np.nan, np.nan]])
+    np.testing.assert_array_equal(first, [[280.0, JUL_1], [np.nan, np.nan]])
+
+
+def test_heat_stress_days_window():
+    tmax = np.full((1, 365, 1), 90.0)
+    tmax[0, [JUL_1 - 1, JUL_1, JUL_1 + 10, 242, 243], 0] = 96.0
+    # Day 243 is September 1, outside the window, as is June 30
+    np.testing.assert_array_equal(heat_stress_days(tmax), [[3.0]])
+
+
+def test_chunked_metrics_match_single_block():
+    rng = np.random.default_rng(0)
+    tmax = rng.uniform(40, 100, (3, 365, 37)).astype(np.float32)
+    tmin = tmax - rng.uniform(10, 30, tmax.shape).astype(np.float32)
+    ppt = rng.uniform(0, 10, tmax.shape).astype(np.float32)
+    planting = rng.integers(MAY_1 - 20, MAY_1 + 30, 37)
+    expected = yearly_metrics(tmax, tmin, ppt, planting)
+    for chunk in (1, 5, 37, 100):
+        chunked = yearly_metrics_chunked(tmax, tmin, ppt, planting, chunk_cells=chunk)
+        assert chunked.keys() == expected.keys()
+        for name in expected:
+            np.testing.assert_array_equal(chunked[name], expected[name], err_msg=name)
+    
+    celsius = yearly_metrics_chunked((tmax - 32) / 1.8, (tmin - 32) / 1.8, ppt, planting,
+                                     celsius=True, chunk_cells=8)
+    np.testing.assert_allclose(celsius["gdd"], expected["gdd"], rtol=1e-5)
+
+
+def test_summarize_years_skips_nan_and_needs_two_years():
+    yearly = {
+        "gdd": np.array([[2500.0, 2700.0, np.nan], [2600.0, np.nan, np.nan], [np.nan] * 3]),
+        "ppt_gs": np.array([[400.0, 600.0, 500.0], [450.0, np.nan, np.nan], [np.nan] * 3]),
+        "last_frost": np.array([[100.0, 110.0, 130.0], [np.nan, 105.0, np.nan], [np.nan] * 3]),
+        "first_frost": np.array([[300.0, 280.0, 290.0], [np.nan, 285.0, np.nan], [np.nan] * 3]),
+    }
+    summary = summarize_years(yearly)
+    np.testing.assert_array_equal(summary["gdd_mean"], [2600.0, 2600.0, np.nan])
+    # Sample standard deviation of (2500, 2700); one year is not enough
+    np.testing.assert_allclose(summary["gdd_std"], [np.sqrt(20000.0), np.nan, np.nan])
+    np.testing.assert_allclose(summary["precip_cv"], [100.0 / 500.0, np.nan, np.nan])
+    np.testing.assert_array_equal(summary["last_spring_frost"], [110.0, 105.0, np.nan])
+    # Median over years of (first - last) = (200, 170, 160), not 290 - 110
+    np.testing.assert_array_equal(summary["frost_free_days"], [170.0, 180.0, np.nan])
+    assert "heat_stress_days" not in summary
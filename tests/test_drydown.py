@@ -0,0 +1,62 @@
+"""Drydown simulation against a day-by-day reference loop."""
+from datetime import date, timedelta
+import numpy as np
+from backend.app.models.management import ManagementInputs
+from backend.app.models.products import ProductCatalog
+from backend.app.services.climate import MAY_1, daily_gdd
+from backend.app.services.drydown import (BLACK_LAYER_MOISTURE, EQUILIBRIUM_MOISTURE, RATING_EFFECT,
+                                          harvest_days, planting_days, simulate_drydown)
+from backend.app.services.scoring import ScoringEngine
+from .helpers import CORN_PRODUCTS, corn_requirements, daily_normals
+
+
+def test_drydown_matches_daily_loop(extractor):
+    catalog = ProductCatalog.from_products(CORN_PRODUCTS, "corn")
+    tmax, tmin = daily_normals(40)
+    managements = [
+        ManagementInputs(previous_crop="soybean",
+                         typical_planting_date=date(2024, 4, 11 + i % 20) if i % 2 else None,
+                         target_harvest_date=date(2024, 9, 20) + timedelta(days=i % 30) if i % 3 else None)
+        for i in range(40)
+    ]
+    planting, harvest = planting_days(managements), harvest_days(managements)
+    assert planting[0] == MAY_1
+    result = simulate_drydown(extractor, catalog, tmax, tmin, planting, harvest)
+    assert result.mature.any() and not result.mature.all()
+    
+    gdd = daily_gdd(tmax, tmin)
+    required = extractor.maturity_lookups["corn"].required_gdd_array(catalog.maturity)
+    per_point = extractor.gdd_conversion["corn"].get("drydown_gdd_per_point", 30.0)
+    rating = np.nan_to_num(catalog.column("drydown"), nan=5.0)
+    for f in range(40):
+        for p in range(len(catalog)):
+            total, black_layer = 0.0, np.nan
+            for day in range(planting[f], 365):
+                total += gdd[day, f]
+                if total >= required[p] - 1e-9:
+                    black_layer = day
+                    break
+            np.testing.assert_equal(result.black_layer_day[f, p], black_layer)
+            
+            after = gdd[planting[f]:harvest[f], f].sum() - required[p]
+            assert result.mature[f, p] == (after >= 0)
+            moisture = BLACK_LAYER_MOISTURE
+            if after >= 0:
+                points = after / per_point * (1 + RATING_EFFECT * (rating[p] - 5))
+                moisture = max(EQUILIBRIUM_MOISTURE, BLACK_LAYER_MOISTURE - points)
+            assert abs(result.harvest_moisture[f, p] - moisture) < 1e-6
+
+
+def test_drying_score_replaces_drydown_rating(extractor):
+    catalog = ProductCatalog.from_products(CORN_PRODUCTS, "corn")
+    tmax, tmin = daily_normals(len(corn_requirements()), seed=1)
+    result = simulate_drydown(extractor, catalog, tmax, tmin)
+    assert ((result.drying_score >= 0) & (result.drying_score <= 1)).all()
+    assert (result.drying_cost >= 0).all()
+    
+    engine = ScoringEngine()
+    requirements = corn_requirements()
+    plain = engine.score_matrix(catalog, requirements, "corn")
+    drying = engine.score_matrix(catalog, requirements, "corn", drying=result.drying_score)
+    np.testing.assert_array_equal(plain["disease_tolerance"], drying["disease_tolerance"])
+    assert not np.array_equal(plain["agronomics"], drying["agronomics"])
@@ -0,0 +1,128 @@
+"""FeatureCache hits, TTL expiry and source-version invalidation."""
+import pytest
+from backend.app.models.fields import SoilFeatures, WeatherFeatures
+from backend.app.services import feature_cache
+from backend.app.services.feature_cache import CachedFeatureExtractor, FeatureCache, boundary_hash
+from backend.app.services.feature_extraction import PLACEHOLDER_VERSION
+
+STATE_GDD = {"IA": 2700.0, "MN": 2300.0}
+
+
+def _square(x: float) -> dict:
+    return {"type": "Polygon", "coordinates": [[[x, 42.0], [x + 0.01, 42.0], [x + 0.01, 42.01], [x, 42.0]]]}
+
+
+class CountingExtractor:
+    """Extractor stand-in whose outputs depend on the boundary and state, counting every extraction."""
+    
+    def __init__(self, soil_version: str = "ssurgo:1", weather_version: str = "prism:1"):
+        self.soil_source_version = soil_version
+        self.weather_source_version = weather_version
+        self.soil_calls = 0
+        self.weather_calls = 0
+    
+    def extract_soil_features(self, boundary_geojson: dict) -> SoilFeatures:
+        self.soil_calls += 1
+        return SoilFeatures(clay_pct=boundary_geojson["coordinates"][0][0][0] + 100)
+    
+    def extract_weather_features(self, centroid: tuple[float, float], state: str) -> WeatherFeatures:
+        self.weather_calls += 1
+        return WeatherFeatures(gdd_mean=STATE_GDD[state], growing_season_precip_mm=centroid[1] + 600)
+    
+    def extract_soil_features_many(self, boundaries: list[dict]) -> list[SoilFeatures]:
+        return [self.extract_soil_features(b) for b in boundaries]
+    
+    def extract_weather_features_many(self, centroids, states) -> list[WeatherFeatures]:
+        return [self.extract_weather_features(c, s) for c, s in zip(centroids, states)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(feature_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_repeat_extraction_hits(tmp_path):
+    extractor = CountingExtractor()
+    cached = CachedFeatureExtractor(extractor, FeatureCache(tmp_path / "features.sqlite"))
+    first = cached.extract_features(_square(-93.0), "IA")
+    # A reopened cache still holds the entries
+    cached = CachedFeatureExtractor(extractor, FeatureCache(tmp_path / "features.sqlite"))
+    assert cached.extract_features(_square(-93.0), "IA") == first
+    assert (extractor.soil_calls, extractor.weather_calls) == (1, 1)
+    assert first.soil.clay_pct == pytest.approx(7.0) and first.weather.gdd_mean == 2700.0
+
+
+def test_weather_is_keyed_on_state():
+    extractor = CountingExtractor()
+    cached = CachedFeatureExtractor(extractor, FeatureCache())
+    assert cached.extract_weather_features(_square(-93.0), "IA").gdd_mean == 2700.0
+    assert cached.extract_weather_features(_square(-93.0), "MN").gdd_mean == 2300.0
+    assert cached.extract_weather_features(_square(-93.0), "IA").gdd_mean == 2700.0
+    assert extractor.weather_calls == 2
+    # Soil does not depend on the state
+    cached.extract_features(_square(-93.0), "IA")
+    cached.extract_features(_square(-93.0), "MN")
+    assert extractor.soil_calls == 1
+
+
+def test_ttl_expiry(clock):
+    extractor = CountingExtractor()
+    cache = FeatureCache(ttl_seconds=60)
+    cached = CachedFeatureExtractor(extractor, cache)
+    cached.extract_soil_features(_square(-93.0))
+    clock[0] += 60
+    cached.extract_soil_features(_square(-93.0))
+    assert extractor.soil_calls == 1
+    clock[0] += 1
+    cached.extract_soil_features(_square(-93.0))
+    assert extractor.soil_calls == 2
+    # The re-extraction reset the entry's age
+    clock[0] += 30
+    assert cache.purge_expired() == 0
+    clock[0] += 31
+    assert cache.purge_expired() == 1
+
+
+def test_source_version_change_invalidates_only_that_kind():
+    extractor = CountingExtractor()
+    cache = FeatureCache()
+    cached = CachedFeatureExtractor(extractor, cache)
+    cached.extract_features(_square(-93.0), "IA")
+    
+    extractor.weather_source_version = "prism:2"
+    cached.extract_features(_square(-93.0), "IA")
+    assert (extractor.soil_calls, extractor.weather_calls) == (1, 2)
+    assert cache.invalidate(kind="weather", keep_version="prism:2") == 0
+    
+    extractor.soil_source_version = "ssurgo:2"
+    cached.extract_features(_square(-93.0), "IA")
+    assert (extractor.soil_calls, extractor.weather_calls) == (2, 2)
+    assert cache.get(boundary_hash(_square(-93.0)), "soil", "ssurgo:1") is None
+
+
+def test_placeholder_features_are_not_stored():
+    extractor = CountingExtractor(soil_version=PLACEHOLDER_VERSION, weather_version="prism:1")
+    cache = FeatureCache()
+    cached = CachedFeatureExtractor(extractor, cache)
+    for _ in range(2):
+        cached.extract_features(_square(-93.0), "IA")
+    assert (extractor.soil_calls, extractor.weather_calls) == (2, 1)
+    assert cache.conn.execute("SELECT DISTINCT kind FROM field_features").fetchall() == [("weather",)]
+
+
+def test_prefetch_extracts_only_misses():
+    extractor = CountingExtractor()
+    cached = CachedFeatureExtractor(extractor, FeatureCache())
+    cached.extract_features(_square(-93.0), "IA")
+    fields = [(_square(-93.0), "IA"), (_square(-93.0), "MN"), (_square(-94.0), "IA")]
+    # Soil misses: -94; weather misses: (-93, MN), (-94, IA)
+    assert cached.prefetch(fields) == 3
+    assert cached.prefetch(fields) == 0
+    for boundary, state in fields:
+        cached.extract_features(boundary, state)
+    assert (extractor.soil_calls, extractor.weather_calls) == (2, 3)
+    
+    extractor.soil_source_version = PLACEHOLDER_VERSION
+    assert cached.prefetch([(_square(-95.0), "IA")]) == 1
@@ -0,0 +1,58 @@
+"""MaturityLookup against the original linear scan of the GDD tables."""
+import numpy as np
+import pytest
+from backend.app.services.maturity import MaturityLookup
+
+KEYS = {"corn": ("gdd_by_rm", int, 100, (3, 2), 100), "soybean": ("gdd_by_mg", float, 150, (0.5, 0.3), 3.0)}
+
+
+def linear_scan(gdd_conversion: dict, gdd_mean, crop: str):
+    """Target range as FeatureExtractor.derive_target_maturity computed it before the lookup tables."""
+    if not gdd_mean:
+        return (105, 110, 115) if crop == "corn" else (2.5, 3.0, 3.5)
+    key, cast, margin, (below, above), optimal = KEYS[crop]
+    available = gdd_mean - gdd_conversion[crop].get("safety_margin_gdd", margin)
+    for maturity, required in sorted(gdd_conversion[crop][key].items(), key=lambda x: cast(x[0]), reverse=True):
+        if available >= required:
+            optimal = cast(maturity)
+            break
+    return (optimal - below, optimal, optimal + above)
+
+
+GDD = [None, 0, 0.0] + list(np.arange(1800, 3800, 0.5)) + [2200.0, 2300, 2650, 3350, 3450]
+
+
+@pytest.mark.parametrize("crop", ["corn", "soybean"])
+def test_lookup_matches_linear_scan(extractor, crop):
+    lookup = extractor.maturity_lookups[crop]
+    expected = [linear_scan(extractor.gdd_conversion, g, crop) for g in GDD]
+    assert [lookup.target_range(g) for g in GDD] == expected
+    
+    ranges = lookup.target_range_array(np.array([np.nan if g is None else g for g in GDD], dtype=float))
+    np.testing.assert_array_equal(ranges, np.array(expected, dtype=float))
+
+
+def test_non_monotone_table_matches_linear_scan():
+    table = {"corn": {"gdd_by_rm": {"95": 2300, "100": 2450, "105": 2400, "110": 2700}, "safety_margin_gdd": 50}}
+    lookup = MaturityLookup(table, "corn")
+    gdd = np.arange(2200, 2900, 5.0)
+    expected = np.array([linear_scan(table, g, "corn") for g in gdd], dtype=float)
+    np.testing.assert_array_equal(lookup.target_range_array(gdd), expected)
+    # Interpolation needs a monotone table, so this one stays snapped
+    np.testing.assert_array_equal(lookup.target_range_array(gdd, interpolate=True), expected)
+
+
+def test_interpolated_optimum_is_continuous(extractor):
+    lookup = extractor.maturity_lookups["corn"]
+    available = np.linspace(lookup.required_gdd[0], lookup.required_gdd[-1], 500)
+    optimal = lookup.optimal_array(available, interpolate=True)
+    assert np.all(np.diff(optimal) >= 0)
+    np.testing.assert_allclose(lookup.required_gdd_array(optimal), available)
+
+
+@pytest.mark.parametrize("crop", ["corn", "soybean"])
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_empty_table_falls_back(crop, interpolate):
+    lookup = MaturityLookup({crop: {}}, crop)
+    assert lookup.optimal(2600.0, interpolate) == lookup.fallback
+    np.testing.assert_array_equal(lookup.optimal_array(np.array([2000.0, 2600.0]), interpolate), lookup.fallback)
@@ -0,0 +1,91 @@
+"""management_modifiers.json entries reach the derived requirements."""
+import logging
+import numpy as np
+import pytest
+from backend.app.models.fields import FieldFeatures, SoilFeatures, WeatherFeatures
+from backend.app.models.management import ManagementInputs
+from backend.app.services.modifiers import CONSUMED_TARGETS, ROTATION, ManagementModifiers
+from backend.app.services.requirements import derive_requirement_columns, feature_columns
+
+# Crop history that resolves to each rotation practice, and the
+# zero-offset practice it is compared against
+ROTATION_HISTORY = {
+    "corn_on_corn": ("corn", {"previous_crop": "corn"}),
+    "soy_on_soy": ("soybean", {"previous_crop": "soybean"}),
+    "corn_soy_wheat": ("soybean", {"previous_crop": "wheat"}),
+}
+ROTATION_BASELINE = {"corn": {"previous_crop": "soybean"}, "soybean": {"previous_crop": "corn"}}
+
+
+def _numeric_targets(entry: dict) -> set:
+    return {t for t, v in entry.items() if isinstance(v, (int, float)) and not isinstance(v, bool) and v}
+
+
+def _practice_entries(table: dict):
+    for category, practices in table.items():
+        if not isinstance(practices, dict):
+            continue
+        for practice, entry in practices.items():
+            if isinstance(entry, dict) and _numeric_targets(entry) & CONSUMED_TARGETS:
+                yield category, practice
+
+
+def _derive(extractor, crop: str, overrides: dict) -> dict:
+    features = FieldFeatures(soil=SoilFeatures(), weather=WeatherFeatures(gdd_mean=2600.0), state="IA")
+    columns = feature_columns([features], [ManagementInputs(previous_crop="soybean")])
+    # Set columns directly, so practices missing from the table (the zero row) can be expressed
+    columns.update({name: np.array([value], dtype=object) for name, value in overrides.items()})
+    return derive_requirement_columns(extractor, columns, crop)
+
+
+def _changed(a: dict, b: dict) -> bool:
+    return any(not np.array_equal(a[name], b[name]) for name in a)
+
+
+def test_every_consumed_entry_changes_requirements(extractor):
+    entries = list(_practice_entries(extractor.management_modifiers))
+    assert ("fungicide_program", "routine") in entries
+    assert ("irrigation", "pivot") in entries
+    
+    for category, practice in entries:
+        if category == ROTATION:
+            crops = [ROTATION_HISTORY[practice][0]]
+            practiced, baseline = ROTATION_HISTORY[practice][1], ROTATION_BASELINE[crops[0]]
+        elif extractor.modifiers.levels[category] is not None:
+            crops = ["corn", "soybean"]
+            practiced, baseline = {category: float(practice.split("_")[0])}, {category: None}
+        else:
+            crops = ["corn", "soybean"]
+            practiced, baseline = {category: practice}, {category: "unlisted"}
+        assert any(
+            _changed(_derive(extractor, crop, practiced), _derive(extractor, crop, baseline)) for crop in crops
+        ), f"{category}={practice} has no effect on derived requirements"
+
+
+def test_fungicide_program_weights_disease_component(extractor):
+    derived = {p: _derive(extractor, "corn", {"fungicide_program": p}) for p in ("none", "as_needed", "routine")}
+    weights = {p: d["disease_weight"][0] for p, d in derived.items()}
+    assert weights == pytest.approx({"none": 1.2, "as_needed": 0.9, "routine": 0.7})
+    # A program changes how much disease tolerance counts, not the risks themselves
+    assert derived["none"]["gls_risk"][0] == derived["routine"]["gls_risk"][0]
+
+
+@pytest.mark.parametrize("irrigation, expected", [("none", 0.8), ("pivot", 0.3), ("drip", 0.4), ("flood", 0.8)])
+def test_irrigation_offsets_drought_risk(extractor, irrigation, expected):
+    soil = SoilFeatures(aws_0_100=10.0)
+    weather = WeatherFeatures(gdd_mean=2600.0, growing_season_precip_mm=400.0, precip_cv=0.4)
+    assert extractor.derive_drought_risk(soil, weather, irrigation) == pytest.approx(expected)
+    
+    management = ManagementInputs(previous_crop="soybean", irrigation=irrigation)
+    requirements = extractor.derive_field_requirements(FieldFeatures(soil=soil, weather=weather, state="IA"),
+                                                       management, "corn")
+    assert requirements.drought_risk == pytest.approx(expected)
+
+
+def test_unconsumed_targets_are_logged_at_debug(caplog):
+    table = {"tillage": {"no-till": {"gls_risk": 0.1, "soil_crusting": 0.2, "erosion_risk": -0.3}}}
+    with caplog.at_level(logging.DEBUG, logger="backend.app.services.modifiers"):
+        modifiers = ManagementModifiers(table)
+    assert modifiers.unused_targets == ["erosion_risk", "soil_crusting"]
+    assert [r.levelno for r in caplog.records] == [logging.DEBUG]
+    assert "soil_crusting" in caplog.text and "erosion_risk" not in caplog.text
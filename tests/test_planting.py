@@ -0,0 +1,81 @@
+"""Planting date optimizer against a brute-force loop over dates, years and products."""
+import numpy as np
+import pytest
+from backend.app.services.climate import MAY_1, OCT_1, daily_gdd
+from backend.app.services.planting import optimize_planting
+from .helpers import REQUIREMENTS, daily_normals
+
+# Every 9 days from April 11 to June 12, plus one on the earliest season end below
+PLANTING_DAYS = np.array([*range(MAY_1 - 20, MAY_1 + 43, 9), MAY_1 + 30])
+
+
+def _stack(n_fields: int) -> tuple[np.ndarray, np.ndarray]:
+    """(year, day, field) temperatures: three years of seeded normals plus day-to-day noise."""
+    rng = np.random.default_rng(7)
+    years = [daily_normals(n_fields, seed=year) for year in range(3)]
+    tmax = np.stack([t for t, _ in years]) + rng.normal(0, 4, (3, 365, n_fields))
+    tmin = np.stack([t for _, t in years]) + rng.normal(0, 4, (3, 365, n_fields))
+    return tmax, tmin
+
+
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_surface_matches_brute_force(extractor, engine, crop, products, catalog, interpolate):
+    lookup = extractor.maturity_lookups[crop]
+    requirements = REQUIREMENTS[crop]()
+    n_fields = len(requirements)
+    tmax, tmin = _stack(n_fields)
+    # Includes a season ending before the last planting dates
+    season_end = np.array([OCT_1, OCT_1 - 20, MAY_1 + 30, OCT_1 + 15, OCT_1 - 5][:n_fields])
+    current_days = np.array([MAY_1, np.nan, MAY_1 - 13, 300, MAY_1 + 2][:n_fields])
+    surface = optimize_planting(lookup, catalog, tmax, tmin, season_end, PLANTING_DAYS, interpolate=interpolate,
+                                engine=engine, requirements=requirements, current_days=current_days)
+    maturity_only = optimize_planting(lookup, catalog, tmax, tmin, season_end, PLANTING_DAYS,
+                                      interpolate=interpolate)
+    
+    gdd = daily_gdd(tmax, tmin)
+    required = lookup.required_gdd_array(catalog.maturity)
+    for f in range(n_fields):
+        for d, planting in enumerate(PLANTING_DAYS):
+            yearly = [sum(gdd[y, day, f] for day in range(planting, season_end[f])) for y in range(3)]
+            available = sum(yearly) / 3
+            assert abs(surface.available_gdd[f, d] - available) < 1e-6
+            
+            optimal = lookup.optimal(available - lookup.safety_margin, interpolate)
+            window = (optimal - lookup.below, optimal, optimal + lookup.above)
+            np.testing.assert_allclose(surface.windows[f, d], window)
+            for p, product in enumerate(products):
+                assert surface.feasible[f, d, p] == (required[p] + lookup.safety_margin <= available)
+                fit = engine.score_maturity_fit(catalog.maturity[p], window) * 100
+                assert abs(maturity_only.scores[f, d, p] - fit) < 1e-9
+                
+                dated = requirements[f].model_copy(update={"target_maturity_range": window})
+                composite, _ = engine.calculate_composite_score(product, dated, crop)
+                assert abs(surface.scores[f, d, p] - composite) < 1e-6
+    
+    assert surface.feasible.any() and not surface.feasible.all()
+    assert not surface.feasible[2, -2].any()
+    expected_current = [-1 if np.isnan(day) else int(np.abs(PLANTING_DAYS - day).argmin()) for day in current_days]
+    assert surface.current.tolist() == expected_current
+
+
+def test_best_and_latest_dates_match_brute_force(extractor, engine, crop, catalog):
+    lookup = extractor.maturity_lookups[crop]
+    requirements = REQUIREMENTS[crop]()
+    n_fields = len(requirements)
+    tmax, tmin = _stack(n_fields)
+    season_end = np.full(n_fields, OCT_1 - 25)
+    surface = optimize_planting(lookup, catalog, tmax, tmin, season_end, PLANTING_DAYS,
+                                engine=engine, requirements=requirements)
+    best, latest = surface.best_dates(), surface.latest_feasible()
+    
+    for f in range(n_fields):
+        for p in range(len(catalog)):
+            feasible = [d for d in range(len(PLANTING_DAYS)) if surface.feasible[f, d, p]]
+            if not feasible:
+                assert best[f, p] == latest[f, p] == -1
+                continue
+            top = max(surface.scores[f, d, p] for d in feasible)
+            first_top = next(d for d in feasible if surface.scores[f, d, p] == top)
+            assert best[f, p] == first_top
+            assert latest[f, p] == feasible[-1]
+    assert (best == -1).any() and (best >= 0).any()
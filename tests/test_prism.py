@@ -0,0 +1,76 @@
+"""PRISMSampler block-grouped and memory-mapped sampling."""
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from backend.app.services.feature_extraction import FeatureExtractor
+from backend.app.services.prism import PRISMSampler
+
+HEIGHT, WIDTH = 150, 260
+TRANSFORM = from_origin(-100.0, 45.0, 0.04, 0.04)
+NODATA = -9999.0
+
+
+def _write(path, data, **options):
+    driver = "EHdr" if path.suffix == ".bil" else "GTiff"
+    with rasterio.open(path, "w", driver=driver, height=HEIGHT, width=WIDTH, count=1, dtype="float32",
+                       crs="EPSG:4269", transform=TRANSFORM, nodata=NODATA, **options) as dst:
+        dst.write(data, 1)
+
+
+@pytest.fixture
+def mixed_grids(tmp_path):
+    """Strip-layout BIL for 2001, 64 x 64 tiled GeoTIFF for 2002 and 2003."""
+    rng = np.random.default_rng(0)
+    data = {}
+    for year in (2001, 2002, 2003):
+        values = rng.uniform(2000, 3300, (HEIGHT, WIDTH)).astype("float32")
+        values[:4, :4] = NODATA
+        data[year] = values
+        if year == 2001:
+            _write(tmp_path / f"gdd_{year}.bil", values)
+        else:
+            _write(tmp_path / f"gdd_{year}.tif", values, tiled=True, blockxsize=64, blockysize=64)
+    return tmp_path, data
+
+
+def test_mixed_block_layouts(mixed_grids):
+    directory, data = mixed_grids
+    sampler = PRISMSampler(directory)
+    try:
+        shapes = {grid.dataset.block_shapes[0] for grid in sampler.grids["gdd"].values()}
+        assert len(shapes) == 2
+        
+        rng = np.random.default_rng(1)
+        lat = rng.uniform(38.9, 45.1, 3000)
+        lon = rng.uniform(-100.1, -89.5, 3000)
+        lat[0], lon[0] = 44.99, -99.99  # nodata corner
+        sampled = sampler.sample(np.column_stack([lat, lon]))["gdd"]
+        
+        rows = np.floor((45.0 - lat) / 0.04).astype(int)
+        cols = np.floor((lon + 100.0) / 0.04).astype(int)
+        inside = (rows >= 0) & (rows < HEIGHT) & (cols >= 0) & (cols < WIDTH)
+        for j, year in enumerate(sampler.years):
+            expected = np.full(len(lat), np.nan)
+            expected[inside] = data[year][rows[inside], cols[inside]]
+            expected[expected == NODATA] = np.nan
+            np.testing.assert_allclose(sampled[:, j], expected, equal_nan=True)
+        assert np.isnan(sampled[0]).all()
+    finally:
+        sampler.close()
+
+
+def test_extractor_ignores_directory_without_grids(tmp_path):
+    (tmp_path / "README.txt").write_text("PRISM grids go here")
+    (tmp_path / "gdd.hdr").write_text("")
+    extractor = FeatureExtractor(prism_dir=tmp_path)
+    assert extractor.prism is None and extractor.weather_source_version == "placeholder"
+    assert extractor.extract_weather_features((42.0, -93.5), "IA").gdd_mean is not None
+
+
+def test_extractor_samples_matching_grids(mixed_grids):
+    directory, _ = mixed_grids
+    (directory / "README.txt").write_text("PRISM grids go here")
+    extractor = FeatureExtractor(prism_dir=directory)
+    assert extractor.prism is not None and extractor.weather_source_version.startswith("prism:")
+    extractor.prism.close()
@@ -0,0 +1,190 @@
+"""Compiled ProductCatalog: columns, JSON shapes, versions, the maturity index and trait bitmasks."""
+from itertools import chain, combinations
+import json
+import math
+import random
+import numpy as np
+import pytest
+from backend.app.cli import DATA_DIR
+from backend.app.models.fields import FieldRequirements
+from backend.app.models.management import (BT_TRAIT_FIELDS, HERBICIDE_SYSTEM_TRAITS, HerbicideSystem,
+                                           ManagementInputs)
+from backend.app.models.products import MaturityIndex, ProductCatalog
+from backend.app.services import ScoringEngine
+
+# Seed guide shape: display name under "name", ratings nested under
+# "traits", Bt traits under "technology" and a numeric list column
+GUIDE_RECORDS = [
+    {"brand": "DeKalb", "name": "DKC62-44", "relative_maturity": 112,
+     "traits": {"drought_tolerance": 7, "tar_spot": 5}, "technology": ["VT2P", "RIB"],
+     "herbicide_traits": ["RR2", "LL"], "population_range": [32000, 36000]},
+    {"brand": "Pioneer", "name": "P1185AM", "relative_maturity": 111, "traits": {"drought_tolerance": None},
+     "technology": ["AM"], "herbicide_traits": [], "population_range": None},
+    {"brand": "DeKalb", "name": "DKC55-65", "relative_maturity": 105, "traits": {"tar_spot": 8},
+     "herbicide_traits": ["RR2"], "population_range": [30000]},
+]
+
+
+def test_missing_ratings_are_nan(crop, products, catalog):
+    assert len(catalog) == len(products)
+    assert catalog.names == [p.hybrid_name if crop == "corn" else p.variety_name for p in products]
+    for name in ("drought_tolerance", "emergence_vigor", "yield_potential"):
+        expected = [math.nan if getattr(p, name) is None else getattr(p, name) for p in products]
+        np.testing.assert_array_equal(catalog.column(name), expected)
+    assert np.isnan(catalog.column("not_a_rating")).all() and len(catalog.column("not_a_rating")) == len(products)
+    assert catalog[1] is products[1]
+
+
+def test_guide_records_are_flattened():
+    catalog = ProductCatalog.from_records(GUIDE_RECORDS, "corn")
+    assert catalog.names == ["DKC62-44", "P1185AM", "DKC55-65"]
+    np.testing.assert_array_equal(catalog.column("drought_tolerance"), [7, np.nan, np.nan])
+    np.testing.assert_array_equal(catalog.column("tar_spot"), [5, np.nan, 8])
+    np.testing.assert_array_equal(catalog.maturity, [112, 111, 105])
+    np.testing.assert_array_equal(catalog.column("population_range"),
+                                  [[32000, 36000], [np.nan, np.nan], [30000, np.nan]])
+    assert catalog.brands == ["DeKalb", "Pioneer"]
+    assert catalog.brand_codes.tolist() == [0, 1, 0]
+    table, codes = catalog.categorical("ear_type")
+    assert table == [None] and codes.tolist() == [0, 0, 0]
+    assert catalog.trait_vocab["technology"] == ["VT2P", "RIB", "AM"]
+    assert catalog.trait_masks["technology"].tolist() == [0b011, 0b100, 0]
+
+
+@pytest.mark.parametrize("crop, key", [("corn", "hybrids"), ("soybean", "varieties")])
+def test_json_shapes_load_alike(tmp_path, crop, key, products):
+    records = [p.model_dump(mode="json") for p in products]
+    (tmp_path / "bare.json").write_text(json.dumps(records))
+    (tmp_path / "wrapped.json").write_text(json.dumps({"version": 2, key: records}))
+    
+    bare = ProductCatalog.from_json(tmp_path / "bare.json")
+    wrapped = ProductCatalog.from_json(tmp_path / "wrapped.json")
+    assert bare.crop == wrapped.crop == crop
+    assert bare.version == wrapped.version == ProductCatalog.from_products(products).version
+    assert bare.names == wrapped.names
+    assert bare.columns.keys() == wrapped.columns.keys()
+    for name, column in bare.columns.items():
+        np.testing.assert_array_equal(column, wrapped.columns[name])
+    
+    (tmp_path / "other.json").write_text(json.dumps({"products": records}))
+    with pytest.raises(ValueError, match="other.json"):
+        ProductCatalog.from_json(tmp_path / "other.json")
+
+
+@pytest.mark.parametrize("name, crop", [("corn_hybrids.json", "corn"), ("corn_hybrids_sample.json", "corn"),
+                                        ("soybean_varieties.json", "soybean"),
+                                        ("soybean_varieties_sample.json", "soybean")])
+def test_shipped_product_files_load(name, crop):
+    catalog = ProductCatalog.from_json(DATA_DIR / "products" / name)
+    assert catalog.crop == crop and len(catalog) > 0
+    assert not np.isnan(catalog.maturity).any()
+    assert all(catalog.names)
+
+
+def test_version_hashes_content():
+    version = ProductCatalog.from_records(GUIDE_RECORDS, "corn").version
+    reordered_keys = [dict(reversed(list(r.items()))) for r in GUIDE_RECORDS]
+    assert ProductCatalog.from_records(reordered_keys, "corn").version == version
+    
+    edited = json.loads(json.dumps(GUIDE_RECORDS))
+    edited[1]["traits"]["drought_tolerance"] = 6
+    assert ProductCatalog.from_records(edited, "corn").version != version
+    assert ProductCatalog.from_records(GUIDE_RECORDS[::-1], "corn").version != version
+    assert len(version) == 16
+
+
+def test_subset_shares_tables_and_has_its_own_version():
+    catalog = ProductCatalog.from_records(GUIDE_RECORDS, "corn")
+    subset = catalog.subset(np.array([2, 0]))
+    assert subset.names == ["DKC55-65", "DKC62-44"]
+    np.testing.assert_array_equal(subset.column("tar_spot"), [8, 5])
+    assert subset.brands is catalog.brands and subset.brand_codes.tolist() == [0, 0]
+    assert subset.trait_masks["technology"].tolist() == [0, 0b011]
+    assert subset.version not in (catalog.version, catalog.subset(np.array([0, 2])).version)
+    assert subset.version == catalog.subset(np.array([2, 0])).version
+
+
+def test_maturity_index_matches_mask():
+    rng = np.random.default_rng(3)
+    maturity = rng.integers(85, 120, 300).astype(float)
+    maturity[rng.random(300) < 0.1] = np.nan
+    index = MaturityIndex(maturity)
+    bounds = [(100, 105), (105, 100), (84, 85), (119, 200), (-np.inf, np.inf), (102.5, 102.5), (110, 110)]
+    bounds += [tuple(sorted(rng.uniform(80, 125, 2))) for _ in range(50)]
+    for low, high in bounds:
+        expected = np.flatnonzero((maturity >= low) & (maturity <= high))
+        np.testing.assert_array_equal(index.range(low, high), expected)
+        assert index.count(low, high) == len(expected)
+    assert index.count(-np.inf, np.inf) == np.count_nonzero(~np.isnan(maturity))
+
+
+def test_catalog_maturity_index(crop, catalog):
+    index = catalog.maturity_index
+    assert catalog.maturity_index is index
+    np.testing.assert_array_equal(index.values, np.sort(catalog.maturity))
+    low, high = (102, 110) if crop == "corn" else (2.5, 3.0)
+    expected = [i for i, m in enumerate(catalog.maturity) if low <= m <= high]
+    assert index.range(low, high).tolist() == expected
+    subset = catalog.subset(np.array(expected))
+    assert subset.maturity_index.range(low, high).tolist() == list(range(len(expected)))
+
+
+HERBICIDE_TRAITS = ["RR", "RR2", "LL", "Enlist", "E3", "Enlist E3", "XtendFlex", "RR2X", "STS"]
+BT_TRAITS = ["VT2P", "SmartStax", "Qrome", "AM", "RIB", "Trecepta"]
+WINDOW = FieldRequirements(target_maturity_range=(105, 108, 110))
+
+
+def _trait_records(n: int, seed: int = 0) -> list[dict]:
+    """Products with random trait lists, some empty or missing, and Bt traits under either field."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        record = {"name": f"P{i}", "relative_maturity": 100 + i % 20}
+        if rng.random() < 0.9:
+            record["herbicide_traits"] = rng.sample(HERBICIDE_TRAITS, rng.randint(0, 3))
+        record[rng.choice(BT_TRAIT_FIELDS)] = rng.sample(BT_TRAITS, rng.randint(0, 2))
+        records.append(record)
+    return records
+
+
+def test_trait_masks_match_list_membership():
+    records = _trait_records(200)
+    catalog = ProductCatalog.from_records(records, "corn")
+    queries = chain(combinations(HERBICIDE_TRAITS, 1), combinations(HERBICIDE_TRAITS, 2),
+                    [(), ("RR", "Unknown"), ("Unknown",)])
+    for traits in queries:
+        lists = [r.get("herbicide_traits") or [] for r in records]
+        expected_all = [all(t in have for t in traits) for have in lists]
+        expected_any = [any(t in have for t in traits) for have in lists]
+        assert catalog.has_traits("herbicide_traits", traits).tolist() == expected_all
+        assert catalog.has_any_traits("herbicide_traits", traits).tolist() == expected_any
+    assert catalog.trait_mask("herbicide_traits", ["Unknown"]) is None
+    assert not catalog.has_any_traits("no_such_field", ["RR"]).any()
+    assert not catalog.has_traits("no_such_field", ["RR"]).any()
+
+
+@pytest.mark.parametrize("bt_requirement", [None, "VT2P", "AM", "Trecepta", "Duracade"])
+def test_trait_filter_matches_list_filter(bt_requirement):
+    records = _trait_records(300, seed=1)
+    catalog = ProductCatalog.from_records(records, "corn")
+    engine = ScoringEngine()
+    for system in HerbicideSystem:
+        management = ManagementInputs(previous_crop="soybean", herbicide_system=system,
+                                      bt_requirement=bt_requirement)
+        allowed = HERBICIDE_SYSTEM_TRAITS[system]
+        expected = [
+            (not allowed or any(t in (r.get("herbicide_traits") or []) for t in allowed)) and
+            (bt_requirement is None or any(bt_requirement in r.get(f, []) for f in BT_TRAIT_FIELDS))
+            for r in records
+        ]
+        assert engine.trait_filter(catalog, management).tolist() == expected
+        
+        window = [i for i, r in enumerate(records) if 105 <= r["relative_maturity"] <= 110 and expected[i]]
+        assert engine.candidate_indices(catalog, WINDOW, management).tolist() == window
+
+
+def test_trait_vocab_is_limited_to_64():
+    records = [{"name": f"P{i}", "relative_maturity": 100, "herbicide_traits": [f"T{i}"]} for i in range(65)]
+    with pytest.raises(ValueError, match="herbicide_traits"):
+        ProductCatalog.from_records(records, "corn")
+    assert len(ProductCatalog.from_records(records[:64], "corn").trait_vocab["herbicide_traits"]) == 64
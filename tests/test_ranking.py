@@ -0,0 +1,43 @@
+"""Top-k ranking against a full stable sort of every composite."""
+import numpy as np
+import pytest
+from backend.app.models.management import ManagementInputs
+from backend.app.models.products import ProductCatalog
+from backend.app.services.ranking import rank_top_k, top_k
+from backend.app.services.recommendations import recommend_field
+
+
+def _full_sort(scores: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-scores, kind="stable")[:k]
+
+
+def test_top_k_breaks_ties_by_index():
+    scores = np.array([3.0, 5.0, 3.0, 5.0, 1.0, 3.0])
+    for k in range(len(scores) + 3):
+        np.testing.assert_array_equal(top_k(scores, k), _full_sort(scores, k))
+
+
+@pytest.mark.parametrize("k", [1, 3, 8, 50])
+@pytest.mark.parametrize("block_size", [1, 2, 256])
+def test_rank_top_k_matches_full_sort(engine, crop, products, requirements, k, block_size):
+    # Every product twice, so equal composites tie across blocks
+    catalog = ProductCatalog.from_products(products + products, crop)
+    for field in requirements:
+        scores = engine.score_matrix(catalog, [field], crop)["composite"][0]
+        expected = _full_sort(scores, k)
+        for prune in (True, False):
+            best, best_scores = rank_top_k(engine, catalog, field, crop, k, prune=prune, block_size=block_size)
+            np.testing.assert_array_equal(best, expected)
+            np.testing.assert_array_equal(best_scores, scores[expected])
+
+
+def test_recommend_field_matches_full_sort(engine, crop, catalog, requirements):
+    management = ManagementInputs(previous_crop="wheat", herbicide_system="conventional")
+    for field in requirements:
+        indices, scores = engine.score_candidates(catalog, field, crop, management)
+        expected = indices[_full_sort(scores["composite"], 3)]
+        result = recommend_field(engine, catalog, field, management, crop, "f", "F", top_n=3)
+        assert [r.product_name for r in result.recommendations] == [catalog.names[i] for i in expected]
+        assert result.products_evaluated == len(indices)
+        for r, i in zip(result.recommendations, expected):
+            assert r.composite_score == pytest.approx(min(100.0, max(0.0, scores["composite"][indices == i][0])))
@@ -0,0 +1,130 @@
+"""Reference registry: hot reload, frozen data and sharing with worker processes."""
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+import pickle
+import numpy as np
+import pytest
+from backend.app.services import reference_data
+from backend.app.services.reference_data import (MISSING_VERSION, FrozenDict, FrozenList, ReferenceRegistry,
+                                                 get_registry)
+
+PRODUCTS = {"hybrids": [
+    {"brand": "A", "name": "H100", "relative_maturity": 100, "traits": {"drought_tolerance": 6},
+     "herbicide_traits": ["RR2"]},
+    {"brand": "B", "name": "H95", "relative_maturity": 95, "traits": {"drought_tolerance": 8},
+     "herbicide_traits": ["RR2", "LL"]},
+]}
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(reference_data.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_reload_after_check_interval(tmp_path, clock):
+    _write(tmp_path / "table.json", {"a": 1})
+    registry = ReferenceRegistry(tmp_path, check_interval=5.0)
+    first = registry.entry("table.json")
+    assert first.data == {"a": 1}
+    
+    _write(tmp_path / "table.json", {"a": 22})
+    clock[0] += 4.9
+    assert registry.get("table.json") == {"a": 1}
+    clock[0] += 0.1
+    assert registry.get("table.json") == {"a": 22}
+    assert registry.version("table.json") != first.version
+    assert registry.versions() == {"table.json": registry.version("table.json")}
+
+
+def test_unchanged_content_keeps_version_and_derived(tmp_path, clock):
+    _write(tmp_path / "table.json", {"a": 1})
+    registry = ReferenceRegistry(tmp_path, check_interval=0.0)
+    builds = []
+    build = lambda data: builds.append(data) or len(builds)
+    assert registry.derived("table.json", "count", build) == 1
+    first = registry.entry("table.json")
+    
+    # Rewritten with the same bytes: new mtime, same hash, same parsed object
+    os.utime(tmp_path / "table.json", ns=(first.mtime_ns + 10**9,) * 2)
+    clock[0] += 1
+    entry = registry.entry("table.json")
+    assert entry.version == first.version and entry.data is first.data
+    assert registry.derived("table.json", "count", build) == 1
+    
+    _write(tmp_path / "table.json", {"a": 2, "b": 3})
+    clock[0] += 1
+    assert registry.derived("table.json", "count", build) == 2
+    assert builds[-1] == {"a": 2, "b": 3}
+
+
+def test_missing_file_loads_once_created(tmp_path, clock):
+    registry = ReferenceRegistry(tmp_path, check_interval=1.0)
+    assert registry.get("late.json") == {} and registry.version("late.json") == MISSING_VERSION
+    _write(tmp_path / "late.json", [1, 2])
+    clock[0] += 1
+    assert registry.get("late.json") == [1, 2]
+
+
+def test_parsed_data_is_read_only(tmp_path):
+    _write(tmp_path / "table.json", {"by_state": {"IA": [0.1, 0.2]}})
+    data = ReferenceRegistry(tmp_path).get("table.json")
+    assert isinstance(data, FrozenDict) and isinstance(data["by_state"]["IA"], FrozenList)
+    mutations = [
+        lambda: data.__setitem__("x", 1), lambda: data.pop("by_state"), lambda: data.update(x=1),
+        lambda: data["by_state"].setdefault("MN", []), lambda: data["by_state"]["IA"].append(0.3),
+        lambda: data["by_state"]["IA"].__setitem__(0, 0.9), lambda: data["by_state"]["IA"].sort(),
+    ]
+    for mutate in mutations:
+        with pytest.raises(TypeError):
+            mutate()
+    assert data == {"by_state": {"IA": [0.1, 0.2]}}
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_catalog_arrays_are_read_only(tmp_path):
+    _write(tmp_path / "corn.json", PRODUCTS)
+    registry = ReferenceRegistry(tmp_path)
+    catalog = registry.catalog("corn.json", "corn")
+    assert registry.catalog("corn.json", "corn") is catalog
+    with pytest.raises(ValueError):
+        catalog.column("drought_tolerance")[0] = 1.0
+    with pytest.raises(ValueError):
+        catalog.trait_masks["herbicide_traits"][0] = 0
+    with pytest.raises(ValueError):
+        catalog.maturity_index.order[0] = 1
+    # Subsets are the caller's own copies
+    subset = catalog.subset(np.array([1]))
+    subset.column("drought_tolerance")[0] = 1.0
+    assert catalog.column("drought_tolerance")[1] == 8.0
+
+
+def _worker_view(args):
+    data, catalog, data_dir = args
+    try:
+        data["x"] = 1
+        frozen = False
+    except TypeError:
+        frozen = True
+    return (type(data).__name__, frozen, dict(data), list(catalog.names), float(np.nansum(catalog.maturity)),
+            get_registry(data_dir).version("table.json"))
+
+
+@pytest.mark.parametrize("method", [m for m in ("fork", "spawn") if m in multiprocessing.get_all_start_methods()])
+def test_frozen_data_reaches_worker_processes(tmp_path, method):
+    _write(tmp_path / "table.json", {"a": [1, 2]})
+    _write(tmp_path / "corn.json", PRODUCTS)
+    registry = get_registry(tmp_path)
+    data, catalog = registry.get("table.json"), registry.catalog("corn.json", "corn")
+    assert pickle.loads(pickle.dumps(data)) == data
+    
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context(method)) as pool:
+        result = pool.submit(_worker_view, (data, catalog, tmp_path)).result()
+    assert result == ("FrozenDict", True, {"a": [1, 2]}, ["H100", "H95"], 195.0, registry.version("table.json"))
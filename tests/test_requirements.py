@@ -0,0 +1,36 @@
+"""Columnar requirement derivation against the per-field path."""
+import numpy as np
+import pandas as pd
+import pytest
+from backend.app.services.requirements import (derive_requirement_columns, distinct_requirement_rows,
+                                               feature_columns, requirements_from_columns)
+from .helpers import field_batch
+
+
+def _fields(extractor, n: int, seed: int = 0):
+    states = list(extractor.disease_baselines["corn"]["gray_leaf_spot"]["by_state"]) + ["ZZ"]
+    return field_batch(states, n, seed)
+
+
+@pytest.mark.parametrize("crop", ["corn", "soybean"])
+def test_batch_requirements_match_per_field(extractor, crop):
+    features, managements = _fields(extractor, 400)
+    expected = [extractor.derive_field_requirements(f, m, crop) for f, m in zip(features, managements)]
+    assert extractor.derive_field_requirements_many(features, managements, crop) == expected
+    
+    columns = feature_columns(features, managements)
+    frame = pd.DataFrame({name: list(values) for name, values in columns.items()})
+    derived = derive_requirement_columns(extractor, frame, crop)
+    assert requirements_from_columns(derived, list(frame["scn_source_history"])) == expected
+
+
+def test_distinct_rows_round_trip(extractor):
+    features, managements = _fields(extractor, 50, seed=1)
+    features, managements = features * 3, managements * 3
+    derived = derive_requirement_columns(extractor, feature_columns(features, managements), "corn")
+    histories = [m.scn_source_history for m in managements]
+    first, index = distinct_requirement_rows(derived, histories)
+    
+    assert len(first) <= 50
+    for name, values in derived.items():
+        np.testing.assert_array_equal(values[first][index], values)
@@ -0,0 +1,44 @@
+"""Management scenario sweeps."""
+import numpy as np
+from backend.app.models.fields import FieldFeatures, SoilFeatures, WeatherFeatures
+from backend.app.models.management import ManagementInputs
+from backend.app.models.products import ProductCatalog
+from backend.app.services.scenarios import sweep_scenarios
+from backend.app.services.scoring import ScoringEngine
+from .helpers import CORN_PRODUCTS
+
+FEATURES = FieldFeatures(
+    soil=SoilFeatures(clay_pct=30.0, om_pct=3.5, ph=6.5, drainage_class="Poorly drained"),
+    weather=WeatherFeatures(gdd_mean=2700.0, growing_season_precip_mm=520.0),
+    state="IA",
+)
+PROGRAMS = ["none", "as_needed", "routine"]
+
+
+def test_fungicide_programs_change_scores(extractor, crop, catalog):
+    cube = sweep_scenarios(extractor, ScoringEngine(), catalog, FEATURES, ManagementInputs(previous_crop="corn"),
+                           {"fungicide_program": PROGRAMS})
+    
+    assert len(set(cube.requirement_index.tolist())) == len(PROGRAMS)
+    # Programs re-weight the disease component rather than the risks behind it
+    disease = cube.scores["disease_tolerance"]
+    composite = cube.scores["composite"]
+    for a in range(len(PROGRAMS)):
+        for b in range(a + 1, len(PROGRAMS)):
+            np.testing.assert_array_equal(disease[a], disease[b])
+            assert not np.allclose(composite[a], composite[b]), (PROGRAMS[a], PROGRAMS[b])
+
+
+def test_sweep_matches_per_scenario_scoring(extractor):
+    engine = ScoringEngine()
+    products = CORN_PRODUCTS
+    catalog = ProductCatalog.from_products(products, "corn")
+    options = {"tillage": ["no-till", "conventional"], "fungicide_program": ["none", "routine"],
+               "irrigation": ["none", "pivot"]}
+    cube = sweep_scenarios(extractor, engine, catalog, FEATURES, ManagementInputs(previous_crop="corn"), options)
+    
+    assert cube.scores["composite"].shape == (8, len(products))
+    for i, management in enumerate(cube.scenarios):
+        requirements = extractor.derive_field_requirements(FEATURES, management, "corn")
+        expected = engine.score_matrix(catalog, [requirements], "corn")["composite"][0]
+        np.testing.assert_allclose(cube.scores["composite"][i], expected, atol=1e-9)
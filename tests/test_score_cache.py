@@ -0,0 +1,84 @@
+"""Component score cache: hits, keys, LRU eviction and re-ranking under new weights."""
+import numpy as np
+import pytest
+from backend.app.services import ComponentScoreCache
+from backend.app.services.score_cache import COMPONENTS
+
+
+@pytest.fixture
+def cache(engine, monkeypatch) -> ComponentScoreCache:
+    cache = ComponentScoreCache(engine, max_entries=3)
+    cache.calls = 0
+    score_matrix = engine.score_matrix
+    
+    def counted(*args, **kwargs):
+        cache.calls += 1
+        return score_matrix(*args, **kwargs)
+    
+    monkeypatch.setattr(engine, "score_matrix", counted)
+    return cache
+
+
+def test_components_match_score_matrix(engine, crop, catalog, requirements, cache):
+    expected = engine.score_matrix(catalog, requirements, crop)
+    for i, field in enumerate(requirements):
+        matrix = cache.components(catalog, field, crop)
+        np.testing.assert_array_equal(matrix, np.stack([expected[name][i] for name in COMPONENTS], axis=1))
+        np.testing.assert_allclose(cache.composite(catalog, field, crop), expected["composite"][i])
+        assert not matrix.flags.writeable
+        
+        ranked = cache.rank(catalog, field, crop)
+        assert ranked.tolist() == sorted(range(len(catalog)), key=lambda p: -expected["composite"][i][p])
+
+
+def test_entries_are_keyed_on_requirements_catalog_and_crop(crop, catalog, requirements, cache):
+    field = requirements[0]
+    first = cache.components(catalog, field, crop)
+    calls = cache.calls
+    assert cache.components(catalog, field.model_copy(), crop) is first
+    assert cache.calls == calls and len(cache) == 1
+    
+    cache.components(catalog, field.model_copy(update={"drought_risk": 0.95}), crop)
+    cache.components(catalog.subset(np.arange(len(catalog) - 1)), field, crop)
+    assert len(cache) == 3 and cache.calls == calls + 2
+    
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.components(catalog, field, crop) is not first
+
+
+def test_least_recently_used_entry_is_evicted(crop, catalog, requirements, cache):
+    first, second, third, fourth = requirements[:4]
+    for field in (first, second, third):
+        cache.components(catalog, field, crop)
+    cache.components(catalog, first, crop)
+    cache.components(catalog, fourth, crop)
+    calls = cache.calls
+    
+    for field in (first, third, fourth):
+        cache.components(catalog, field, crop)
+    assert cache.calls == calls
+    cache.components(catalog, second, crop)
+    assert cache.calls == calls + 1 and len(cache) == 3
+
+
+def test_weight_changes_rerank_without_rescoring(engine, crop, catalog, requirements, cache):
+    field = requirements[1]
+    default = cache.composite(catalog, field, crop)
+    calls = cache.calls
+    
+    weights = {"maturity": 0.1, "yield": 0.6, "stress": 0.1, "disease": 0.1, "agronomic": 0.1}
+    reweighted = cache.composite(catalog, field, crop, weights)
+    assert not np.allclose(reweighted, default)
+    rescored = ComponentScoreCache().composite(catalog, field, crop, weights)
+    np.testing.assert_allclose(reweighted, rescored)
+    
+    # Edited engine defaults apply to cached components too
+    engine.default_weights[crop] = weights
+    np.testing.assert_allclose(cache.composite(catalog, field, crop), reweighted)
+    assert cache.rank(catalog, field, crop).tolist() == np.argsort(-reweighted, kind="stable").tolist()
+    assert cache.calls == calls
+    
+    heavier = field.model_copy(update={"disease_weight": 1.5})
+    expected = engine.score_matrix(catalog, [heavier], crop)["composite"][0]
+    np.testing.assert_allclose(cache.composite(catalog, heavier, crop), expected)
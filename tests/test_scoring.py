@@ -0,0 +1,46 @@
+"""Vectorized score_matrix against the scalar per-product scorer."""
+import numpy as np
+import pytest
+
+
+def test_score_matrix_matches_scalar_scorer(engine, crop, products, catalog, requirements):
+    matrix = engine.score_matrix(catalog, requirements, crop)
+    
+    for i, field in enumerate(requirements):
+        for j, product in enumerate(products):
+            composite, components = engine.calculate_composite_score(product, field, crop)
+            assert matrix["composite"][i, j] == pytest.approx(composite, abs=1e-9)
+            for name, value in components.model_dump().items():
+                assert matrix[name][i, j] == pytest.approx(value, abs=1e-9), name
+
+
+def test_score_matrix_accepts_product_lists(engine, crop, products, catalog, requirements):
+    from_list = engine.score_matrix(products, requirements, crop)
+    from_catalog = engine.score_matrix(catalog, requirements, crop)
+    np.testing.assert_array_equal(from_list["composite"], from_catalog["composite"])
+
+
+def test_maturity_fit_matrix_matches_scalar(engine, crop, products, catalog, requirements):
+    fit = engine.maturity_fit_matrix(catalog, requirements, crop)
+    attr = "relative_maturity" if crop == "corn" else "maturity_group"
+    expected = np.array([
+        [engine.score_maturity_fit(getattr(p, attr), r.target_maturity_range) for p in products]
+        for r in requirements
+    ])
+    np.testing.assert_allclose(fit, expected, atol=1e-12)
+
+
+def test_disease_weight_rescales_composite_weights(engine, crop, products, catalog, requirements):
+    weights = engine.composite_weights(crop, 1.2)
+    assert sum(weights.values()) == pytest.approx(sum(engine.default_weights[crop].values()))
+    assert weights["disease"] / weights["yield"] == pytest.approx(
+        1.2 * engine.default_weights[crop]["disease"] / engine.default_weights[crop]["yield"])
+    
+    heavier = [r.model_copy(update={"disease_weight": 1.2}) for r in requirements]
+    plain = engine.score_matrix(catalog, requirements, crop)
+    scores = engine.score_matrix(catalog, heavier, crop)
+    np.testing.assert_array_equal(plain["disease_tolerance"], scores["disease_tolerance"])
+    expected = sum(weights[key] * scores[name] for key, name in (
+        ("maturity", "maturity_fit"), ("yield", "yield_potential"), ("stress", "stress_tolerance"),
+        ("disease", "disease_tolerance"), ("agronomic", "agronomics")))
+    np.testing.assert_allclose(scores["composite"], expected, atol=1e-9)
@@ -0,0 +1,53 @@
+"""Economic optimum seeding rates against a brute-force rate grid."""
+import numpy as np
+import pytest
+from backend.app.services.seeding_rate import (RATE_BOUNDS, cubic, economic_optimum, quadratic_plateau,
+                                               seeding_rate_table)
+
+SEED_COSTS = [2.5, 3.5, 4.5, 6.0]
+GRAIN_PRICES = [3.5, 4.5, 6.0, 12.0]
+
+
+def _brute_force(curves, bounds, step=1e-4):
+    rates = np.arange(bounds[0], bounds[1] + step / 2, step)
+    yields = curves.yield_at(np.broadcast_to(rates, curves.plateau.shape + rates.shape))
+    costs = np.asarray(SEED_COSTS)[:, None, None]
+    prices = np.asarray(GRAIN_PRICES)[None, :, None]
+    best = np.empty(curves.plateau.shape + (len(SEED_COSTS), len(GRAIN_PRICES)))
+    for idx in np.ndindex(curves.plateau.shape):
+        best[idx] = (prices * yields[idx] - costs * rates).max(axis=-1)
+    return best
+
+
+def test_quadratic_plateau_matches_grid_search():
+    rng = np.random.default_rng(0)
+    shape = (6, 5)
+    curves = quadratic_plateau(rng.uniform(150, 250, shape), rng.uniform(26, 38, shape), rng.uniform(0.4, 1.0, shape))
+    table = economic_optimum(curves, SEED_COSTS, GRAIN_PRICES, RATE_BOUNDS["corn"])
+    brute = _brute_force(curves, RATE_BOUNDS["corn"])
+    # The closed form can only beat the grid, and by no more than the grid spacing costs
+    assert (table.net_return >= brute - 1e-9).all() and (table.net_return - brute < 1e-3).all()
+    low, high = RATE_BOUNDS["corn"]
+    assert ((table.rate >= low * 1000) & (table.rate <= high * 1000)).all()
+
+
+def test_cubic_matches_grid_search():
+    rng = np.random.default_rng(1)
+    shape = (4, 3)
+    # Concave-then-convex cubics with an interior optimum and a second, non-optimal root
+    coefficients = np.stack([rng.uniform(-50, 0, shape), rng.uniform(8, 14, shape),
+                             rng.uniform(-0.3, -0.15, shape), rng.uniform(0.0005, 0.002, shape)], axis=-1)
+    curves = cubic(coefficients)
+    table = economic_optimum(curves, SEED_COSTS, GRAIN_PRICES, RATE_BOUNDS["corn"])
+    brute = _brute_force(curves, RATE_BOUNDS["corn"])
+    assert (table.net_return >= brute - 1e-9).all() and (table.net_return - brute < 1e-3).all()
+    low, high = RATE_BOUNDS["corn"]
+    assert ((table.rate > low * 1000) & (table.rate < high * 1000)).any()
+
+
+def test_rates_fall_as_seed_gets_dearer(catalog, requirements):
+    table = seeding_rate_table(catalog, requirements, SEED_COSTS, GRAIN_PRICES)
+    assert table.rate.shape == (len(requirements), len(catalog), len(SEED_COSTS), len(GRAIN_PRICES))
+    assert (np.diff(table.rate, axis=2) <= 1e-6).all()
+    assert (np.diff(table.rate, axis=3) >= -1e-6).all()
+    assert table.table(0, 0).shape == (len(SEED_COSTS), len(GRAIN_PRICES))
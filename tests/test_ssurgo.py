@@ -0,0 +1,138 @@
+"""SSURGOExtractor on a small hand-built GeoPackage with hand-computed expectations."""
+import sqlite3
+import struct
+import pytest
+import shapely
+from shapely.geometry import box, mapping
+from backend.app.services.ssurgo import SSURGOExtractor
+
+# fid -> (mukey, polygon); mukey 999 has no attribute rows, fid 5 is far from every field
+POLYGONS = {
+    1: ("100", box(-93.00, 42.00, -92.99, 42.01)),
+    2: ("200", box(-92.99, 42.00, -92.98, 42.01)),
+    3: ("300", box(-93.00, 42.01, -92.98, 42.02)),
+    4: ("999", box(-92.98, 42.01, -92.97, 42.02)),
+    5: ("100", box(-90.00, 40.00, -89.99, 40.01)),
+}
+# (cokey, mukey, comppct_r, sand, silt, clay, om, ph, cec, surface texture); map unit 300 has no components
+COMPONENTS = [
+    ("100-1", "100", 60, 20.0, 50.0, 30.0, 3.0, 6.0, 20.0, "Silt loam"),
+    ("100-2", "100", 40, 50.0, 40.0, 10.0, 1.0, None, 10.0, "Sandy loam"),
+    ("200-1", "200", 100, 80.0, 15.0, 5.0, 1.0, 7.5, 5.0, "Sand"),
+]
+# mukey, drainage, hydrologic group, aws 0-100, flood frequency, slope
+MUAGGATT = [
+    ("100", "Well drained", "B", 20.0, "None", 2.0),
+    ("200", "Poorly drained", "A", 10.0, "Occasional", 4.0),
+    ("300", "Poorly drained", "C", 30.0, "Rare", None),
+]
+
+
+def _gpkg_blob(geometry) -> bytes:
+    minx, miny, maxx, maxy = geometry.bounds
+    # "GP", version 0, little-endian with an xy envelope, srs id, envelope
+    return b"GP" + bytes([0, 0b011]) + struct.pack("<i4d", 4326, minx, maxx, miny, maxy) + shapely.to_wkb(geometry)
+
+
+def _write_gpkg(path, rtree: bool = True):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT, srs_id INTEGER PRIMARY KEY, organization TEXT,
+                                           organization_coordsys_id INTEGER, definition TEXT);
+        INSERT INTO gpkg_spatial_ref_sys VALUES ('WGS 84', 4326, 'EPSG', 4326, '');
+        CREATE TABLE gpkg_geometry_columns (table_name TEXT, column_name TEXT, geometry_type_name TEXT,
+                                            srs_id INTEGER, z INTEGER, m INTEGER);
+        INSERT INTO gpkg_geometry_columns VALUES ('MUPOLYGON', 'Shape', 'MULTIPOLYGON', 4326, 0, 0);
+        CREATE TABLE MUPOLYGON (OBJECTID INTEGER PRIMARY KEY, MUKEY TEXT, Shape BLOB);
+        CREATE TABLE component (cokey TEXT, mukey TEXT, comppct_r REAL);
+        CREATE TABLE chorizon (chkey TEXT, cokey TEXT, hzdept_r REAL, sandtotal_r REAL, silttotal_r REAL,
+                               claytotal_r REAL, om_r REAL, ph1to1h2o_r REAL, cec7_r REAL);
+        CREATE TABLE chtexturegrp (chkey TEXT, texdesc TEXT, rvindicator TEXT);
+        CREATE TABLE muaggatt (mukey TEXT, drclassdcd TEXT, hydgrpdcd TEXT, aws0100wta REAL,
+                               flodfreqdcd TEXT, slopegradwta REAL);
+    """)
+    if rtree:
+        conn.execute("CREATE VIRTUAL TABLE rtree_MUPOLYGON_Shape USING rtree(id, minx, maxx, miny, maxy)")
+    for fid, (mukey, geometry) in POLYGONS.items():
+        conn.execute("INSERT INTO MUPOLYGON VALUES (?, ?, ?)", (fid, mukey, _gpkg_blob(geometry)))
+        if rtree:
+            minx, miny, maxx, maxy = geometry.bounds
+            conn.execute("INSERT INTO rtree_MUPOLYGON_Shape VALUES (?, ?, ?, ?, ?)", (fid, minx, maxx, miny, maxy))
+    for cokey, mukey, pct, *values, texture in COMPONENTS:
+        conn.execute("INSERT INTO component VALUES (?, ?, ?)", (cokey, mukey, pct))
+        conn.execute("INSERT INTO chorizon VALUES (?, ?, 0, ?, ?, ?, ?, ?, ?)", (f"{cokey}-0", cokey, *values))
+        # Subsurface horizons are ignored
+        conn.execute("INSERT INTO chorizon VALUES (?, ?, 30, 99, 99, 99, 99, 99, 99)", (f"{cokey}-30", cokey))
+        conn.execute("INSERT INTO chtexturegrp VALUES (?, ?, 'Yes')", (f"{cokey}-0", texture))
+    conn.executemany("INSERT INTO muaggatt VALUES (?, ?, ?, ?, ?, ?)", MUAGGATT)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture(params=[True, False], ids=["rtree", "strtree"])
+def extractor(request, tmp_path):
+    extractor = SSURGOExtractor(_write_gpkg(tmp_path / "soils.gpkg", rtree=request.param))
+    yield extractor
+    extractor.conn.close()
+
+
+def test_map_unit_properties_are_component_weighted(extractor):
+    row = extractor.mukey_index["100"]
+    sand, silt, clay, om, ph, cec = extractor.numeric[row, :6]
+    assert (sand, silt, clay, om, cec) == pytest.approx((32.0, 46.0, 22.0, 2.2, 16.0))
+    # The second component has no pH, so only the first counts
+    assert ph == pytest.approx(6.0)
+
+
+def test_area_weighted_means_and_modes(extractor):
+    # 60% on map unit 100, 40% on 200
+    soil = extractor.extract(mapping(box(-92.996, 42.0, -92.986, 42.01)))
+    assert soil.sand_pct == pytest.approx(0.6 * 32 + 0.4 * 80)
+    assert soil.clay_pct == pytest.approx(0.6 * 22 + 0.4 * 5)
+    assert soil.ph == pytest.approx(0.6 * 6.0 + 0.4 * 7.5)
+    assert soil.aws_0_100 == pytest.approx(0.6 * 20 + 0.4 * 10)
+    assert soil.slope_pct == pytest.approx(0.6 * 2 + 0.4 * 4)
+    assert (soil.drainage_class, soil.hydro_group) == ("Well drained", "B")
+    # Texture is the dominant component's, then the dominant map unit's
+    assert soil.texture_class == "Silt loam"
+
+
+def test_mode_follows_the_larger_area(extractor):
+    # 30% on map unit 100, 70% on 300
+    soil = extractor.extract(mapping(box(-93.0, 42.007, -92.99, 42.017)))
+    assert (soil.drainage_class, soil.hydro_group) == ("Poorly drained", "C")
+    # 300 has no components, so horizon means come from 100 alone; slope likewise
+    assert soil.sand_pct == pytest.approx(32.0) and soil.slope_pct == pytest.approx(2.0)
+    assert soil.aws_0_100 == pytest.approx(0.3 * 20 + 0.7 * 30)
+
+
+def test_flood_frequency_is_the_worst_overlapped(extractor):
+    assert extractor.extract(mapping(box(-92.996, 42.0, -92.986, 42.01))).flood_freq == "Occasional"
+    assert extractor.extract(mapping(box(-93.0, 42.0, -92.995, 42.015))).flood_freq == "Rare"
+    assert extractor.extract(mapping(box(-93.0, 42.0, -92.995, 42.005))).flood_freq == "None"
+
+
+def test_unmapped_and_unattributed_overlap(extractor):
+    nowhere, unattributed, partial = extractor.extract_many([
+        mapping(box(-80.0, 30.0, -79.99, 30.01)),
+        mapping(box(-92.979, 42.011, -92.971, 42.019)),
+        # Map unit 300 plus the unattributed 999, which must not dilute the means
+        mapping(box(-93.0, 42.01, -92.975, 42.02)),
+    ])
+    for soil in (nowhere, unattributed):
+        assert soil.model_dump(exclude_none=True) == {}
+    assert partial.aws_0_100 == pytest.approx(30.0) and partial.flood_freq == "Rare"
+    assert partial.sand_pct is None
+
+
+def test_rtree_reads_only_nearby_polygons(tmp_path):
+    extractor = SSURGOExtractor(_write_gpkg(tmp_path / "soils.gpkg"))
+    try:
+        # Bounding boxes clear of map unit 300 (fid 3) above and the distant fid 5
+        extractor.extract_many([mapping(box(-92.996, 42.0, -92.986, 42.009)), mapping(box(-80.0, 30.0, -79.9, 30.1))])
+        assert set(extractor._polygons) == {1, 2}
+        extractor.extract(mapping(box(-92.9995, 42.0005, -92.9985, 42.0015)))
+        assert set(extractor._polygons) == {1, 2}
+    finally:
+        extractor.conn.close()
@@ -0,0 +1,85 @@
+"""JSONL field pipeline: parsing, bad lines and records, ordered rows and lazy reading."""
+import io
+import json
+import pydantic
+import pytest
+from backend.app.models.management import ManagementInputs
+from backend.app.models.products import ProductCatalog
+from backend.app.services.streaming import (iter_rows, parse_field_record, read_jsonl, stream_recommendations,
+                                            write_jsonl)
+from .helpers import CORN_PRODUCTS, corn_requirements
+
+MANAGEMENT = ManagementInputs(previous_crop="soybean")
+
+
+@pytest.fixture
+def catalog() -> ProductCatalog:
+    return ProductCatalog.from_products(CORN_PRODUCTS, "corn")
+
+
+def _record(i: int, **overrides) -> dict:
+    requirements = corn_requirements()
+    record = {"id": f"F{i}", "name": f"Field {i}", "acres": 40, "state": "IA",
+              "requirements": requirements[i % len(requirements)].model_dump(mode="json")}
+    record.update(overrides)
+    return record
+
+
+def test_read_jsonl_skips_blank_lines_and_reports_bad_ones(tmp_path):
+    path = tmp_path / "fields.jsonl"
+    path.write_text('{"id": 1}\n\n   \n{"id": 2}\n')
+    assert list(read_jsonl(path)) == [{"id": 1}, {"id": 2}]
+    
+    records = read_jsonl(io.StringIO('{"id": 1}\n\n{"id": \n{"id": 3}\n'))
+    assert next(records) == {"id": 1}
+    with pytest.raises(ValueError, match="line 3"):
+        next(records)
+
+
+def test_parse_field_record_management():
+    field, management = parse_field_record(_record(0), MANAGEMENT)
+    assert field.id == "F0" and management is MANAGEMENT
+    record = _record(1, management={"previous_crop": "corn", "irrigation": "pivot"})
+    field, management = parse_field_record(record, MANAGEMENT)
+    assert management.previous_crop == "corn" and management.irrigation == "pivot"
+    assert "management" in record
+
+
+def test_rows_follow_input_order(tmp_path, catalog):
+    path = tmp_path / "fields.jsonl"
+    path.write_text("".join(json.dumps(_record(i)) + "\n" for i in range(17)))
+    output = io.StringIO()
+    sets = stream_recommendations(read_jsonl(path), catalog, MANAGEMENT, workers=2, chunk_size=3, top_n=2)
+    count = write_jsonl(iter_rows(sets), output)
+    
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    serial = list(stream_recommendations(read_jsonl(path), catalog, MANAGEMENT, top_n=2))
+    assert [s.field_id for s in serial] == [f"F{i}" for i in range(17)]
+    assert count == len(rows) == sum(len(s.recommendations) for s in serial) > 17
+    assert rows == json.loads(json.dumps(list(iter_rows(serial))))
+
+
+def test_invalid_record_raises_after_earlier_rows(catalog):
+    records = [_record(0), _record(1), _record(2, acres="many"), _record(3)]
+    fields = []
+    with pytest.raises(pydantic.ValidationError, match="acres"):
+        for recommendation_set in stream_recommendations(records, catalog, MANAGEMENT):
+            fields.append(recommendation_set.field_id)
+    assert fields == ["F0", "F1"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_records_are_read_lazily(catalog, workers):
+    pulled = []
+    
+    def records():
+        for i in range(50):
+            pulled.append(i)
+            yield _record(i)
+    
+    stream = stream_recommendations(records(), catalog, MANAGEMENT, workers=workers, chunk_size=4, max_pending=2)
+    assert next(stream).field_id == "F0"
+    # Serially one record is read per result; in parallel at most max_pending chunks
+    assert len(pulled) == (1 if workers == 1 else 4 * 2)
+    assert [s.field_id for s in stream] == [f"F{i}" for i in range(1, 50)]
+    assert len(pulled) == 50
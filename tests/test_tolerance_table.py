@@ -0,0 +1,39 @@
+"""ToleranceRiskTable accuracy against the exact tolerance/risk match."""
+import numpy as np
+import pytest
+from backend.app.services.scoring import ScoringEngine, ToleranceRiskTable, match_tolerance_to_risk_array
+
+
+@pytest.mark.parametrize("steps", [10, 50, 1000])
+def test_table_error_within_bound(steps):
+    table = ToleranceRiskTable(steps)
+    ratings = np.arange(0, 10, dtype=float)[:, None]
+    rng = np.random.default_rng(steps)
+    thresholds = [0.3, 0.7, np.nextafter(0.3, 0), np.nextafter(0.7, 0)]
+    risk = np.concatenate([np.linspace(0, 1, 20001), rng.random(20000), thresholds])[None, :]
+    error = np.abs(table.lookup_array(ratings, risk) - match_tolerance_to_risk_array(ratings, risk))
+    assert error.max() <= table.error_bound + 1e-12
+
+
+def test_scalar_lookup_matches_array_lookup():
+    table = ToleranceRiskTable()
+    rng = np.random.default_rng(0)
+    ratings = rng.integers(0, 10, 2000).astype(float)
+    risk = rng.random(2000)
+    scalar = [table.lookup(int(t), r) for t, r in zip(ratings, risk)]
+    np.testing.assert_allclose(scalar, table.lookup_array(ratings, risk), atol=1e-12)
+
+
+def test_unknown_and_out_of_range_fall_back_to_exact():
+    table = ToleranceRiskTable()
+    engine = ScoringEngine()
+    assert table.lookup(None, 0.5) == 0.5
+    assert table.lookup(5, 1.2) == pytest.approx(engine.match_tolerance_to_risk(5, 1.2))
+    values = table.lookup_array([np.nan, 4.5, 12.0], [0.5, 0.5, 0.5])
+    np.testing.assert_allclose(values, match_tolerance_to_risk_array([np.nan, 4.5, 12.0], 0.5))
+
+
+@pytest.mark.parametrize("steps", [0, 15, 999])
+def test_steps_must_put_thresholds_on_nodes(steps):
+    with pytest.raises(ValueError):
+        ToleranceRiskTable(steps)
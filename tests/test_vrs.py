@@ -0,0 +1,72 @@
+"""Variable rate seeding rasters and prescriptions."""
+import numpy as np
+import pytest
+from rasterio.crs import CRS
+from rasterio.transform import from_origin
+from backend.app.services.seeding_rate import POPULATION_CURVE
+from backend.app.services.vrs import (
+    MODERATE, NO_STABILITY, POPULATION_LIMITS, POPULATION_NODATA, STABLE_HIGH, STABLE_LOW, VARIABLE,
+    Forecast, RasterSource, build_prescription, yield_layer,
+)
+
+WGS84 = CRS.from_epsg(4326)
+BOUNDARY = {"type": "Polygon", "coordinates": [[
+    [-93.98, 42.05], [-93.963, 42.05], [-93.963, 42.063], [-93.977, 42.064], [-93.98, 42.05],
+]]}
+
+
+def _source(values, pixel):
+    return RasterSource(values.astype(np.float32), from_origin(-94.0, 42.2, pixel, pixel), WGS84, -9999.0)
+
+
+@pytest.fixture
+def layers():
+    rng = np.random.default_rng(0)
+    yields = {year: _source(180 + 20 * rng.standard_normal((2000, 2000)), 0.0001) for year in range(2019, 2024)}
+    twi = _source(rng.uniform(2, 14, (3000, 3000)), 0.00007)
+    nccpi = _source(rng.uniform(0.4, 0.9, (500, 500)), 0.0004)
+    return yields, twi, nccpi
+
+
+def test_stability_classes():
+    # Cells: stable high, stable low, moderate (CV 0.15), variable (CV 0.3), no data
+    yields = {
+        2020: np.array([[210.0, 190.0, 170.0, 140.0, np.nan]]),
+        2021: np.array([[210.0, 190.0, 230.0, 260.0, np.nan]]),
+        2022: np.array([[210.0, 190.0, 200.0, 200.0, np.nan]]),
+    }
+    layer = yield_layer(yields)
+    assert 0.10 <= layer.yield_cv[0, 2] <= 0.20 and layer.yield_cv[0, 3] > 0.20
+    assert layer.stability.tolist() == [[STABLE_HIGH, STABLE_LOW, MODERATE, VARIABLE, NO_STABILITY]]
+
+
+def test_prescription_bounds_and_nodata(layers):
+    yields, twi, _ = layers
+    rx = build_prescription("F1", BOUNDARY, "corn", yields=yields, twi=twi, forecast=Forecast("below_normal", 0.6))
+    inside = rx.grid.mask
+    low, high = POPULATION_LIMITS["corn"]
+    assert inside.any() and (~inside).any()
+    assert (rx.population[~inside] == POPULATION_NODATA).all()
+    assert ((rx.population[inside] >= low) & (rx.population[inside] <= high)).all()
+    assert (rx.population[inside] % 100 == 0).all()
+    assert np.isnan(rx.productivity[~inside]).all()
+    assert np.nanmin(rx.productivity) >= 0 and np.nanmax(rx.productivity) <= 1
+    assert rx.layers_used == ["yield_history", "twi", "forecast"]
+
+
+def test_curve_accepts_arrays(layers):
+    yields, twi, _ = layers
+    from_tuple = build_prescription("F1", BOUNDARY, "corn", yields=yields, twi=twi, curve=POPULATION_CURVE)
+    from_array = build_prescription("F1", BOUNDARY, "corn", yields=yields, twi=twi, curve=np.array(POPULATION_CURVE))
+    np.testing.assert_array_equal(from_tuple.population, from_array.population)
+
+
+def test_nccpi_fallback(layers):
+    _, twi, nccpi = layers
+    rx = build_prescription("F2", BOUNDARY, "soybean", nccpi=nccpi, twi=twi, base_population=140000)
+    low, high = POPULATION_LIMITS["soybean"]
+    values = rx.population[rx.grid.mask]
+    assert rx.layers_used == ["nccpi3soy", "twi"]
+    assert ((values >= low) & (values <= high)).all() and (values % 500 == 0).all()
+    with pytest.raises(ValueError):
+        build_prescription("F3", BOUNDARY, "soybean", twi=twi, base_population=140000)
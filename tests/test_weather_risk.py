@@ -0,0 +1,42 @@
+"""nan_percentile against np.nanpercentile."""
+import warnings
+import numpy as np
+import pytest
+from backend.app.services.weather_risk import nan_percentile
+
+NAN = np.nan
+ROWS = np.array([
+    [NAN, NAN, NAN, NAN, NAN],
+    [NAN, 7.0, NAN, NAN, NAN],
+    [4.0, NAN, 2.0, NAN, NAN],
+    [1.0, NAN, 3.0, 2.0, NAN],
+    [5.0, 1.0, 4.0, 2.0, 3.0],
+    [2.0, 2.0, NAN, 2.0, -1.0],
+])
+
+
+def _reference(values: np.ndarray, q: float) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        return np.nanpercentile(values, q, axis=1)
+
+
+@pytest.mark.parametrize("q", [0, 10, 25, 33.3, 50, 90, 99.9, 100])
+def test_matches_nanpercentile(q):
+    np.testing.assert_allclose(nan_percentile(ROWS, q), _reference(ROWS, q), rtol=1e-12, atol=0)
+
+
+def test_hand_computed_values():
+    # Row 3 sorts to (1, 2, 3): the 25th percentile sits halfway between 1 and 2
+    result = nan_percentile(ROWS, 25)
+    assert np.isnan(result[0])
+    np.testing.assert_array_equal(result[1:4], [7.0, 2.5, 1.5])
+
+
+def test_random_rows_with_missing_years():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 30, (200, 31))
+    values[rng.random(values.shape) < 0.3] = NAN
+    values[:5] = NAN
+    for q in (5, 10, 50, 95):
+        np.testing.assert_allclose(nan_percentile(values, q), _reference(values, q), rtol=1e-12)